@@ -1,6 +1,6 @@
 import argparse
 from viewplanning.configuration import ConfigurationFactory
-from viewplanning.cli import RunExperiments, Create, TestExperiments, View
+from viewplanning.cli import RunExperiments, Create, TestExperiments, View, VerifyResults
 import logging
 from logging.handlers import RotatingFileHandler
 import sys
@@ -12,7 +12,8 @@ def main():
         RunExperiments(),
         Create(),
         TestExperiments(),
-        View()
+        View(),
+        VerifyResults()
     ]
     parser = argparse.ArgumentParser(
         prog='viewplanning',
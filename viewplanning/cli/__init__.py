@@ -2,4 +2,5 @@ from .run import RunExperiments
 from .create import Create
 from .test import TestExperiments
 from .view import View
+from .verify import VerifyResults
 from .subapplication import Subapplication
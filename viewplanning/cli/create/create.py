@@ -4,6 +4,9 @@ from .viewVolumes import ViewVolumes
 from .montecarloExperiments import MonteCarloExperiments
 from .fixViewVolumes import FixViewVolumes
 from .fromjson import FromJson
+from .sidecars import Sidecars
+from .precompute import Precompute
+from .intersections import Intersections
 
 
 class Create(Subapplication):
@@ -17,7 +20,10 @@ class Create(Subapplication):
             ViewVolumes(),
             MonteCarloExperiments(),
             FixViewVolumes(),
-            FromJson()
+            FromJson(),
+            Sidecars(),
+            Precompute(),
+            Intersections()
         ]
         self.description = 'Create view volumes or experiments.'
 
@@ -0,0 +1,135 @@
+from viewplanning.cli.subapplication import Subapplication
+from argparse import ArgumentParser
+from viewplanning.configuration import ConfigurationFactory
+from viewplanning.store import CollectionStoreFactory, DriveIntersectionStore, IntersectionPool, MeshRef
+from viewplanning.store.intersectionPool import WORKERS, TIMEOUT
+from viewplanning.models import Experiment, SampleStrategyIntersection
+from viewplanning.sampling.multi.helpers import findCliques
+from viewplanning.solvers.solverFactory import makeHeadingStrategy
+from datetime import datetime
+import pyvista as pv
+import numpy as np
+import logging
+import json
+import os
+import tqdm
+
+
+class Intersections(Subapplication):
+    '''
+    intersects the cliques of the brute intersection experiments of a group ahead of time and writes them to the folder
+    the drive intersection store reads
+    '''
+
+    def __init__(self):
+        super().__init__('intersections')
+        self.description = 'Precompute the clique intersections of brute intersection experiments for the drive intersection store.'
+
+    def modifyParser(self, parser: ArgumentParser):
+        parser.add_argument('--group', dest='group', required=True, type=str, help='group of experiments to precompute')
+        parser.add_argument('--folder', dest='folder', default='', type=str, help='folder of the intersections, intersection.folder in the configuration by default')
+        parser.add_argument('--workers', dest='workers', default=WORKERS, type=int, help='number of processes')
+        parser.add_argument('--timeout', dest='timeout', default=0, type=float, help='seconds an intersection can take, intersection.timeout in the configuration by default')
+        parser.add_argument('--force', dest='force', action='store_true', help='recompute intersections that are in the folder')
+        super().modifyParser(parser)
+
+    def run(self, args):
+        config = ConfigurationFactory.getInstance()
+        config = {} if config is None else config.get('intersection', {})
+        folder = args.folder or config.get('folder', '')
+        if not folder:
+            logging.error('no folder for the intersections, set intersection.folder in the configuration or pass --folder')
+            return
+        folder = os.path.join(folder, '')
+        store = DriveIntersectionStore(folder)
+
+        storeFactory = CollectionStoreFactory()
+        experimentStore = storeFactory.getStore('experiments', Experiment.from_dict)
+        experiments = [
+            experiment for experiment in experimentStore.getItemsIterator(search={'group': args.group})
+            if experiment.sampleStrategy.intersection.type == SampleStrategyIntersection.BRUTE_INTERSECTION
+        ]
+        experimentStore.close()
+
+        # every clique once by the ids of its intersection, with the regions its indices are into
+        cliques: 'dict[tuple[str, str], tuple[list, tuple[int, ...]]]' = {}
+        settings = {}
+        for experiment in tqdm.tqdm(experiments):
+            record = experiment.sampleStrategy
+            # the dwell distance the experiment filters its cliques with comes from its heading strategy
+            heading = makeHeadingStrategy(record)
+            setting = (record.intersection.cliqueRadius, record.intersection.cliqueLimit, heading.dwellDistance, heading.multiplyDwell)
+            key = tuple((region.file, np.asarray(region.rotationMatrix, dtype=float).tobytes()) for region in experiment.regions) + setting
+            if key in settings:
+                continue
+            settings[key] = setting
+            regions = experiment.regions
+            for clique in findCliques(regions, setting[0], clique_limit=setting[1], dwell=setting[2], multDwell=setting[3]):
+                if len(clique) > 1:
+                    cliques.setdefault(store.groupKey(clique, regions), (regions, tuple(clique)))
+        logging.info(f'{len(cliques)} cliques in {len(experiments)} experiments of {args.group}')
+
+        pool = IntersectionPool(args.workers, args.timeout or config.get('timeout', TIMEOUT))
+        results: 'dict[tuple[str, str], pv.PolyData]' = {}
+        status: 'dict[str, str]' = {}
+        try:
+            for size in sorted({len(clique) for _, clique in cliques.values()}):
+                jobs = []
+                level = []
+                for ids, (regions, clique) in cliques.items():
+                    if len(clique) != size:
+                        continue
+                    file = store.transformIds(*ids)
+                    if size == 2:
+                        job = [MeshRef.fromRegion(regions[clique[0]]), MeshRef.fromRegion(regions[clique[1]])]
+                    else:
+                        # a clique whose prefix is empty is empty, the sampler skips it the same way. It is only
+                        # skipped when the prefix failed, a later run may still find it
+                        prefixIds = store.groupKey(clique[:-1], regions)
+                        prefix = results.get(prefixIds)
+                        if prefix is None:
+                            prefixFailed = status.get(store.transformIds(*prefixIds)) in ('failed', 'skipped')
+                            status[file] = 'skipped' if prefixFailed else 'empty'
+                            continue
+                        job = [prefix, MeshRef.fromRegion(regions[clique[-1]])]
+                    path = store.path(*ids)
+                    if path is not None and not args.force:
+                        results[ids] = pv.read(path)
+                        status[file] = 'cached'
+                        continue
+                    jobs.append(job)
+                    level.append(ids)
+                logging.info(f'intersecting {len(jobs)} cliques of size {size}')
+                intersections = pool.map(jobs)
+                failed = set(pool.failed)
+                for i, (ids, intersection) in enumerate(zip(level, intersections)):
+                    file = store.transformIds(*ids)
+                    if intersection is not None and intersection.n_cells > 0:
+                        store.put(*ids, intersection)
+                        results[ids] = intersection
+                        status[file] = 'written'
+                    else:
+                        status[file] = 'failed' if i in failed else 'empty'
+        finally:
+            pool.close()
+
+        counts = {name: sum(1 for value in status.values() if value == name) for name in ['written', 'cached', 'empty', 'failed', 'skipped']}
+        manifest = {
+            'group': args.group,
+            'created': datetime.now().isoformat(),
+            'experiments': len(experiments),
+            'settings': [
+                dict(zip(['cliqueRadius', 'cliqueLimit', 'dwellDistance', 'multiplyDwell'], setting))
+                for setting in sorted(set(settings.values()))
+            ],
+            'timeout': pool.timeout,
+            'counts': counts,
+            'cliques': status
+        }
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f'manifest_{args.group.replace(os.sep, "_")}.json')
+        temp = f'{path}.{os.getpid()}.tmp'
+        with open(temp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp, path)
+        logging.info(f'intersections of {args.group}: {counts}, manifest {path}')
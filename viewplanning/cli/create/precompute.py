@@ -0,0 +1,134 @@
+from viewplanning.cli.subapplication import Subapplication
+from argparse import ArgumentParser
+from viewplanning.store import CollectionStoreFactory, RegionCache, MeshGeometry, readObj
+from viewplanning.store.regionCache import CACHE_VERSION
+from viewplanning.models import RegionGroup
+from viewplanning.sampling.slicing import sliceMany, APPROX_ZERO
+from viewplanning.sampling.single.bodySampleStrategy import bodyLevels, LEVELS
+from viewplanning.sampling.multi.helpers import overlapExtents, OVERLAP_LEVELS
+from multiprocessing import Pool
+from datetime import datetime
+import numpy as np
+import logging
+import os
+import tqdm
+
+
+class Precompute(Subapplication):
+    '''
+    computes the per region artifacts of a region group once so experiments read them instead of computing them
+    '''
+
+    def __init__(self):
+        super().__init__('precompute')
+        self.description = 'Precompute the meshes, geometry, slices and pair overlaps of a region group.'
+
+    def modifyParser(self, parser: ArgumentParser):
+        parser.add_argument('--group', dest='group', required=True, type=str, help='region group to precompute')
+        parser.add_argument('--cache', dest='cache', default='', type=str, help='folder of the artifacts, regions.cache in the configuration by default')
+        parser.add_argument('--workers', dest='workers', default=max(1, (os.cpu_count() or 2) // 2), type=int, help='number of processes')
+        parser.add_argument('--force', dest='force', action='store_true', help='recompute artifacts that are current')
+        super().modifyParser(parser)
+
+    def run(self, args):
+        cache = RegionCache(args.cache) if args.cache else RegionCache.getInstance()
+        if cache is None:
+            logging.error('no folder for the artifacts, set regions.cache in the configuration or pass --cache')
+            return
+        storeFactory = CollectionStoreFactory()
+        store = storeFactory.getStore('regions', RegionGroup.from_dict)
+        groups = [group for group in store.getItems() if group.group == args.group]
+        store.close()
+        regions = {}
+        for group in groups:
+            for region in group.regions:
+                if region.file and os.path.exists(region.file):
+                    regions[_key(region)] = region
+        logging.info(f'{len(regions)} regions in {len(groups)} region groups of {args.group}')
+
+        # only regions whose file or rotation changed are computed again
+        stale = [region for region in regions.values() if args.force or not cache.isCurrent(region.file, region.rotationMatrix)]
+        with Pool(args.workers) as pool:
+            jobs = [(cache.root, region.file, region.rotationMatrix) for region in stale]
+            for file, error in tqdm.tqdm(pool.imap_unordered(_precomputeRegion, jobs), total=len(jobs)):
+                if error is not None:
+                    logging.warning(f'failed to precompute {file}: {error}')
+
+            meshes = {key: cache.getMesh(region.file, region.rotationMatrix) for key, region in regions.items()}
+            digests = {key: MeshGeometry.of(mesh).digest for key, mesh in meshes.items() if mesh is not None}
+            # the overlap of every pair of regions in a region group whose bounding boxes overlap
+            pairs = {}
+            for group in groups:
+                keys = [_key(region) for region in group.regions if _key(region) in digests]
+                for i, j in _overlappingBoxes([MeshGeometry.of(meshes[key]).aabb for key in keys]):
+                    pair = tuple(sorted([digests[keys[i]], digests[keys[j]]]))
+                    pairs[pair] = (regions[keys[i]], regions[keys[j]])
+            extents = {}
+            jobs = []
+            for pair, (a, b) in pairs.items():
+                extent = None if args.force else cache.extent(pair[0], pair[1], OVERLAP_LEVELS)
+                if extent is None:
+                    jobs.append((cache.root, pair, a.file, a.rotationMatrix, b.file, b.rotationMatrix))
+                else:
+                    extents[pair] = extent
+            for pair, extent in tqdm.tqdm(pool.imap_unordered(_precomputeExtent, jobs, chunksize=8), total=len(jobs)):
+                extents[pair] = extent
+        cache.putExtents(args.group, list(extents.keys()), list(extents.values()), OVERLAP_LEVELS)
+
+        cache.putManifest(args.group, {
+            'group': args.group,
+            'version': CACHE_VERSION,
+            'created': datetime.now().isoformat(),
+            'sliceLevels': LEVELS,
+            'overlapLevels': OVERLAP_LEVELS,
+            'regions': [
+                {
+                    'file': region.file,
+                    'rotation': np.asarray(region.rotationMatrix, dtype=float).tolist(),
+                    'entry': cache.entry(region.file, region.rotationMatrix),
+                    'digest': digests.get(key, ''),
+                    'center': list(region.points[0]) if len(region.points) > 0 else [],
+                    'aabb': MeshGeometry.of(meshes[key]).aabb.tolist() if meshes[key] is not None else []
+                }
+                for key, region in regions.items()
+            ],
+            'pairs': len(extents),
+            'computed': {'regions': len(stale), 'pairs': len(jobs)}
+        })
+        logging.info(f'computed {len(stale)} of {len(regions)} regions and {len(jobs)} of {len(extents)} pairs for {args.group}')
+
+
+def _key(region) -> tuple:
+    return (os.path.abspath(region.file), np.asarray(region.rotationMatrix, dtype=float).tobytes())
+
+
+def _overlappingBoxes(aabbs: 'list[np.ndarray]') -> np.ndarray:
+    if len(aabbs) < 2:
+        return np.zeros([0, 2], dtype=int)
+    aabbs = np.asarray(aabbs)
+    i, j = np.triu_indices(len(aabbs), 1)
+    a, b = aabbs[i], aabbs[j]
+    overlap = np.all((b[:, 0::2] <= a[:, 1::2]) & (b[:, 1::2] >= a[:, 0::2]), axis=1)
+    return np.column_stack([i[overlap], j[overlap]])
+
+
+def _precomputeRegion(job: tuple) -> 'tuple[str, str]':
+    root, file, rotationMatrix = job
+    try:
+        # parsed like create sidecars does, the artifacts are written from the file itself
+        mesh = readObj(file, rotationMatrix, sidecar=False)
+        geometry = MeshGeometry.fromMesh(mesh)
+        # the levels BodySampleStrategy slices the interior at
+        levels = bodyLevels(mesh)
+        geometry.slices[(tuple(levels.tolist()), APPROX_ZERO)] = sliceMany(mesh, levels)
+        RegionCache(root).put(file, rotationMatrix, mesh, geometry)
+        return file, None
+    except Exception as e:
+        return file, repr(e)
+
+
+def _precomputeExtent(job: tuple) -> 'tuple[tuple[str, str], float]':
+    root, pair, aFile, aRotation, bFile, bRotation = job
+    cache = RegionCache(root)
+    meshes = [cache.getMesh(aFile, aRotation), cache.getMesh(bFile, bRotation)]
+    return pair, float(overlapExtents(np.array([[0, 1]]), meshes)[0])
@@ -0,0 +1,47 @@
+from viewplanning.cli.subapplication import Subapplication
+from argparse import ArgumentParser
+from viewplanning.store import CollectionStoreFactory, readObj, writeSidecar, readSidecarMeta
+from viewplanning.models import Experiment
+import numpy as np
+import logging
+import os
+import tqdm
+
+
+class Sidecars(Subapplication):
+    '''
+    writes the meshes of experiments as sidecars that are memory mapped instead of parsed
+    '''
+
+    def __init__(self):
+        super().__init__('sidecars')
+        self.description = 'Preprocess the region and environment meshes of experiments into binary sidecars.'
+
+    def modifyParser(self, parser: ArgumentParser):
+        parser.add_argument('--group', dest='group', required=True, type=str, help='group of experiments to preprocess')
+        parser.add_argument('--force', dest='force', action='store_true', help='rewrite sidecars that are up to date')
+        super().modifyParser(parser)
+
+    def run(self, args):
+        storeFactory = CollectionStoreFactory()
+        experimentStore = storeFactory.getStore('experiments', Experiment.from_dict)
+        # a file is written once for every rotation it is used with
+        meshes: 'dict[tuple, tuple[str, np.ndarray]]' = {}
+        for experiment in experimentStore.getItemsIterator(search={'group': args.group}):
+            for item in experiment.regions + [experiment.environment]:
+                if not item.file or not os.path.exists(item.file):
+                    continue
+                rotation = np.asarray(item.rotationMatrix, dtype=float)
+                meshes[(os.path.abspath(item.file), rotation.tobytes())] = (item.file, rotation)
+        experimentStore.close()
+
+        written = 0
+        for file, rotation in tqdm.tqdm(meshes.values()):
+            if not args.force and readSidecarMeta(file, rotation) is not None:
+                continue
+            try:
+                writeSidecar(file, rotation, readObj(file, rotation, sidecar=False))
+                written += 1
+            except Exception:
+                logging.exception(f'failed to write sidecar of {file}')
+        logging.info(f'wrote {written} sidecars for {len(meshes)} meshes')
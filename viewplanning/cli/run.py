@@ -1,5 +1,5 @@
 from multiprocessing import Process, TimeoutError, Queue
-from viewplanning.store import CollectionStoreFactory
+from viewplanning.store import CollectionStoreFactory, MeshStore, SharedMeshes, SharedMesh
 from viewplanning.models import Experiment, Solution
 from viewplanning.solvers import makeSolver, DubinsSolver
 from viewplanning.sampling import SamplingFailedException
@@ -49,7 +49,16 @@ def _run(experiment: Experiment, writeQueue: Queue, dryRun=False):
         delta = time.time() - start
         cost = sum([edge.cost for edge in edges])
         verified = solver.verify()
-        solution = Solution(cost, delta, edges, experiment, True, experiment._id, solver.vertices, verified)
+        solution = Solution(
+            cost=cost,
+            executionTime=delta,
+            experiment=experiment,
+            executed=True,
+            _id=experiment._id,
+            samples=list(solver.vertices),
+            verified=verified
+        )
+        solution.edges = edges
         logging.info(f'finished {solution._id} cost {cost} time {delta}')
         if not dryRun:
             writeQueue.put(solution)
@@ -61,6 +70,73 @@ def _run(experiment: Experiment, writeQueue: Queue, dryRun=False):
         return 0
 
 
+def _work(experiments: Queue, writeQueue: Queue, shared: 'dict[tuple, SharedMesh]' = None):
+    '''
+    run experiments from a queue until it gives None
+
+    Parameters
+    ----------
+    experiments: Queue
+        queue of experiments to run
+    writeQueue: Queue
+        queue to place the results of the experiments on
+    shared: dict[tuple, SharedMesh] | None
+        meshes the runner published in shared memory
+    '''
+    if shared is not None:
+        MeshStore.getInstance().useShared(shared)
+    _logMemory('started')
+    while True:
+        experiment = experiments.get()
+        if experiment is None:
+            return
+        _run(experiment, writeQueue)
+        _logMemory(f'after {experiment._id}')
+
+
+def _logMemory(state: str):
+    '''
+    log the resident memory of the current process and the part of it that is unique to it
+    '''
+    memory = psutil.Process().memory_full_info()
+    logging.info(f'worker pid {os.getpid()} {state} rss {memory.rss / 2 ** 20:.1f}MiB uss {memory.uss / 2 ** 20:.1f}MiB '
+                 f'shared {memory.shared / 2 ** 20:.1f}MiB')
+
+
+def _publishMeshes(experiments: 'list[Experiment]') -> SharedMeshes:
+    '''
+    put the meshes used by more than one experiment in shared memory
+
+    Parameters
+    ----------
+    experiments: list[Experiment]
+        experiments the workers will run
+
+    Returns
+    -------
+    SharedMeshes
+    '''
+    uses: 'dict[tuple, int]' = {}
+    items = {}
+    for experiment in experiments:
+        for item in experiment.regions + [experiment.environment]:
+            if not item.file or not os.path.exists(item.file):
+                continue
+            key = MeshStore.key(item.file, item.rotationMatrix)
+            uses[key] = uses.get(key, 0) + 1
+            items[key] = item
+    shared = SharedMeshes()
+    for key, count in uses.items():
+        if count < 2:
+            continue
+        try:
+            shared.publish(items[key].file, items[key].rotationMatrix)
+        except Exception:
+            logging.exception(f'failed to share mesh {items[key].file}')
+    logging.info(f'shared {len(shared.meshes)} meshes in {shared.size / 2 ** 20:.1f}MiB')
+    return shared
+
+
 class RunExperiments(Subapplication):
     '''
     Runs experiments stored in database
@@ -112,8 +188,9 @@ class RunExperiments(Subapplication):
             'group': args.group
         })
         processes = []
+        shared = SharedMeshes()
         try:
-            resultsStore = storeFactory.getStore('results', Solution)
+            resultsStore = storeFactory.getStore('results', Solution.from_dict)
             toExecute = []
             for experiment in experiments:
                 if resultsStore.getItemById(experiment._id):
@@ -128,86 +205,69 @@ class RunExperiments(Subapplication):
             logging.info(f"Starting Experiments. Running {len(toExecute)} experiments.")
             if config['process']['multithreading']:
                 cpus = min(floor(os.cpu_count() * .5), os.cpu_count() - 1, len(toExecute))  # don't take all cores
-                processes = []
+                # workers live for many experiments so their meshes, slices and intersections are reused
+                if config.get('meshes', {}).get('shared', True):
+                    shared = _publishMeshes(toExecute)
+                experimentQueue = Queue()
+                for experiment in toExecute:
+                    experimentQueue.put(experiment)
                 for i in range(cpus):
-                    experiment = toExecute.pop(0)
-                    processes.append(
-                        Process(
-                            target=_run,
-                            args=[experiment, writeQueue],
-                            name=f'expr_{experiment._id}'
-                        )
-                    )
+                    experimentQueue.put(None)
+                processes = [Process(target=_work, args=[experimentQueue, writeQueue, shared.meshes], name=f'worker_{i}') for i in range(cpus)]
                 for process in processes:
                     process.start()
-                k = 0
-                while len(toExecute) > 0:
+
+                def anyAlive(processes: 'list[Process]'):
+                    count = 0
+                    for process in processes:
+                        try:
+                            count += 1 if process.is_alive() else 0
+                        except:
+                            pass
+                    return count > 0
+
+                while anyAlive(processes):
                     for i in range(len(processes)):
-                        # check is process is finished
-                        if not processes[i].is_alive():
-                            logging.info(f'process {processes[i].name} finished')
+                        # a worker that was killed is replaced, a worker that finished took its None
+                        if not processes[i].is_alive() and processes[i].exitcode != 0:
+                            logging.info(f'worker {processes[i].name} exited with {processes[i].exitcode}, restarting')
                             processes[i].close()
-                            t = processes[i]
-                            if len(toExecute) > 0:
-                                experiment = toExecute.pop(0)
-                                processes[i] = Process(target=_run, args=[experiment, writeQueue], name=f'expr_{experiment._id}')
-                                processes[i].start()
-                            del t
-                    
-                    # cacluate all memory useage and kill highest if usage is too high
+                            processes[i] = Process(target=_work, args=[experimentQueue, writeQueue, shared.meshes], name=f'worker_{i}')
+                            processes[i].start()
+
+                    # cacluate all memory useage and kill highest if usage is too high. Only memory unique to a worker is
+                    # counted so the shared meshes aren't counted for every worker
                     memoryUsage = []
-                    for i in range(len(processes)):
+                    for process in processes:
                         try:
-                            oProcess = psutil.Process(processes[i].pid)
-                            total = oProcess.memory_percent() + sum([child.memory_percent() for child in oProcess.children(recursive=True)])
-                            memoryUsage.append((processes[i].pid, total))
-                        except psutil.NoSuchProcess:
+                            oProcess = psutil.Process(process.pid)
+                            total = oProcess.memory_percent('uss') + sum([child.memory_percent('uss') for child in oProcess.children(recursive=True)])
+                            memoryUsage.append((process.pid, total))
+                        except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
                             pass
-                        except ValueError:
-                            logging.exception('checkout process failed')
-                    
-                    i = 0
-                    while i < len(memoryUsage):
-                        if memoryUsage[i][1] < KILL_PROCESS:
-                            i += 1
-                            continue
-                        logging.info(f'killing process {processes[i].name}')
-                        kill_proc_tree(memoryUsage[i][0])
-                        processes[i].terminate()
-                        
 
+                    for pid, total in memoryUsage:
+                        if total >= KILL_PROCESS:
+                            logging.info(f'killing worker pid {pid} using {total:.1f}% memory')
+                            kill_proc_tree(pid)
 
                     total_memory = sum([m[1] for m in memoryUsage])
                     if total_memory > MEMORY_KILL:
-                        memoryUsage.sort(key=lambda x: x[1], reverse=True)
-                        process = [processes[i] for i in range(len(processes)) if processes[i].pid == memoryUsage[0][0]][0]
-                        logging.info(f'killing process {process.name}')
-                        kill_proc_tree(memoryUsage[0][0])
+                        pid, _ = max(memoryUsage, key=lambda x: x[1])
+                        logging.info(f'killing worker pid {pid} total memory {total_memory:.1f}%')
+                        kill_proc_tree(pid)
 
                     # empty write queue
                     while not writeQueue.empty():
                         solution: Solution = writeQueue.get()
                         resultsStore.insertItem(solution)
                         logging.info(f'saved solution {solution._id}')
-                    
-                    k = (k + 1) % 10
                     time.sleep(1.0)
 
-                def anyAlive(processes: 'list[Process]'):
-                    count = 0
-                    for process in processes:
-                        try:
-                            count += 1 if process.is_alive() else 0
-                        except:
-                            pass
-                    return count > 0
-
-                while anyAlive(processes):
-                    time.sleep(1.0)
-                    while not writeQueue.empty():
-                        solution: Solution = writeQueue.get()
-                        resultsStore.insertItem(solution)
-                        logging.info(f'saved solution {solution._id}')
+                while not writeQueue.empty():
+                    solution: Solution = writeQueue.get()
+                    resultsStore.insertItem(solution)
+                    logging.info(f'saved solution {solution._id}')
 
             else:
                 for exp in toExecute:
@@ -224,6 +284,7 @@ class RunExperiments(Subapplication):
             logging.fatal('Fatal error terminating')
             return
         finally:
+            shared.close()
             resultsStore.close()
         logging.info('Finished all experiments')
 
@@ -0,0 +1,112 @@
+from multiprocessing import Pool
+from functools import partial
+from argparse import ArgumentParser, Namespace
+from viewplanning.store import CollectionStoreFactory
+from viewplanning.models import Solution, VerificationType
+from viewplanning.solvers import makeVerificationStrategy
+from viewplanning.configuration import ConfigurationFactory
+from .subapplication import Subapplication
+from math import floor
+import logging
+import time
+import os
+
+
+BATCH_SIZE = 64
+REPORT_INTERVAL = 10.0
+
+# verification strategies of a worker process, reused for every solution so meshes and z-slices are only built once
+_strategies = {}
+
+
+def _verify(solution: Solution, verificationType: VerificationType = None):
+    '''
+    verify a solution in a worker process
+
+    Parameters
+    ----------
+    solution: Solution
+        solution to verify
+    verificationType: VerificationType
+        verification to run, uses the experiment's verification type if None
+
+    Returns
+    -------
+    tuple[UUID, int, int]
+        id of the solution, the stored verified value, and the new verified value
+    '''
+    if verificationType is None:
+        verificationType = solution.experiment.verificationType
+    if verificationType not in _strategies:
+        _strategies[verificationType] = makeVerificationStrategy(verificationType)
+    try:
+        verified = _strategies[verificationType].verify(
+            solution.edges,
+            solution.experiment.regions,
+            solution.experiment.edgeStrategy.radius
+        )
+    except Exception:
+        logging.exception(f'error verifying {solution._id}')
+        verified = solution.verified
+    return solution._id, solution.verified, int(verified)
+
+
+class VerifyResults(Subapplication):
+    '''
+    Re-verifies solutions stored in the database
+    '''
+
+    def __init__(self):
+        super().__init__('verify')
+        self.description = 'Re-run verification on all stored solutions of a group of experiments and update the results.'
+
+    def modifyParser(self, parser: ArgumentParser):
+        parser.add_argument('--group', required=True, type=str, help='group of experiments to verify')
+        parser.add_argument(
+            '--type',
+            default=None,
+            type=int,
+            required=False,
+            help='verification type to use instead of the type stored with each experiment'
+        )
+        parser.add_argument('--workers', default=None, type=int, required=False, help='number of worker processes')
+        return super().modifyParser(parser)
+
+    def run(self, args: Namespace):
+        config = ConfigurationFactory.getInstance()
+        verificationType = None if args.type is None else VerificationType(args.type)
+        workers = args.workers
+        if workers is None:
+            workers = max(1, min(floor(os.cpu_count() * .5), os.cpu_count() - 1))
+        if not config['process']['multithreading']:
+            workers = 1
+
+        resultsStore = CollectionStoreFactory().getStore('results', Solution.from_dict)
+        solutions = resultsStore.getItemsIterator(search={'experiment.group': args.group})
+        verify = partial(_verify, verificationType=verificationType)
+
+        updates = {}
+        count = 0
+        changed = 0
+        start = time.time()
+        lastReport = start
+        logging.info(f'verifying solutions of group {args.group} with {workers} workers')
+        try:
+            with Pool(workers) as pool:
+                for id, previous, verified in pool.imap_unordered(verify, solutions, chunksize=4):
+                    count += 1
+                    if verified != previous:
+                        changed += 1
+                    updates[id] = {'verified': verified}
+                    if len(updates) >= BATCH_SIZE:
+                        resultsStore.updateFields(updates)
+                        updates = {}
+                    now = time.time()
+                    if now - lastReport > REPORT_INTERVAL:
+                        lastReport = now
+                        logging.info(f'verified {count} solutions {count / (now - start):.2f} solutions/s {changed} changed')
+            resultsStore.updateFields(updates)
+        finally:
+            resultsStore.close()
+        delta = time.time() - start
+        logging.info(f'finished verifying {count} solutions in {delta:.1f}s {count / max(delta, 1e-9):.2f} solutions/s {changed} changed')
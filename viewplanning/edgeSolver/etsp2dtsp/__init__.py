@@ -1,4 +1,5 @@
 from .alternating import Alternating
 from .alternatingBisector import AlternatingBisector
 from .angleBisector import AngleBisector
-from .etsp2Dtsp import Etsp2Dtsp
\ No newline at end of file
+from .etsp2Dtsp import Etsp2Dtsp
+from .dynamicProgramming import DynamicProgramming
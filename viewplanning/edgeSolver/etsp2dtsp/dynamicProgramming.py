@@ -0,0 +1,131 @@
+from .etsp2Dtsp import Etsp2Dtsp
+from viewplanning.models import Vertex3D
+from viewplanning.dubins import DubinsPath, DubinsFailureException
+import numpy as np
+import logging
+import time
+
+
+class DynamicProgramming(Etsp2Dtsp):
+    '''
+    Assigns headings and pitch angles to a fixed sequence of vertices by discretizing the states of each vertex into a
+    layer and solving the shortest cycle through the layers with dynamic programming.
+    '''
+
+    def __init__(self, dubins: DubinsPath, numTheta: int = 8, numPhi: int = 1):
+        '''
+        Parameters
+        ----------
+        dubins: DubinsPath
+            Dubins airplane path planner used for the costs between layers
+        numTheta: int
+            number of headings per vertex
+        numPhi: int
+            number of pitch angles per vertex
+        '''
+        self.dubins = dubins
+        self.numTheta = numTheta
+        self.numPhi = numPhi
+        self.runtime = 0
+        self.evaluations = 0
+
+    def findHeadings(self, vertices: 'list[Vertex3D]', faMin: float, faMax: float, r: float) -> 'list[Vertex3D]':
+        start = time.time()
+        self.evaluations = 0
+        n = len(vertices)
+        if n == 0:
+            return vertices
+        states = self._states(faMin, faMax)
+        k = len(states)
+
+        # costs[i][a, b] is the cost from state a of vertex i - 1 to state b of vertex i
+        costs = [self._layerCosts(vertices[i - 1], vertices[i], states, r, faMin, faMax) for i in range(n)]
+
+        if n == 1:
+            best = np.argmin(np.diag(costs[0]))
+            path = [best]
+        else:
+            # rows of cost are the state the cycle starts in at vertex 0
+            cost = costs[1]
+            parents = np.zeros((n, k, k), dtype=int)
+            for i in range(2, n):
+                total = cost[:, :, None] + costs[i][None, :, :]
+                parents[i] = np.argmin(total, axis=1)
+                cost = np.take_along_axis(total, parents[i][:, None, :], axis=1)[:, 0, :]
+            closing = cost + costs[0].T
+            s, last = np.unravel_index(np.argmin(closing), closing.shape)
+            path = [last]
+            for i in range(n - 1, 1, -1):
+                path.append(parents[i, s, path[-1]])
+            path.append(s)
+            path.reverse()
+
+        for vertex, state in zip(vertices, path):
+            vertex.theta, vertex.phi = states[state]
+        self.runtime = time.time() - start
+        logging.info(
+            f'dynamic programming headings {n} vertices {k} states per vertex {self.evaluations} paths {self.runtime:.3f}s')
+        return vertices
+
+    def _states(self, faMin: float, faMax: float) -> np.ndarray:
+        '''
+        discrete heading and pitch angles of a vertex
+
+        Parameters
+        ----------
+        faMin: float
+            minimum pitch angle
+        faMax: float
+            maximum pitch angle
+
+        Returns
+        -------
+        np.ndarray
+            [numTheta * numPhi, 2] of (theta, phi)
+        '''
+        thetas = np.linspace(0, 2 * np.pi, self.numTheta, endpoint=False)
+        if self.numPhi > 1:
+            phis = np.linspace(faMin, faMax, self.numPhi)
+        else:
+            phis = np.array([np.clip(0, faMin, faMax)])
+        theta, phi = np.meshgrid(thetas, phis, indexing='ij')
+        return np.stack([theta.flatten(), phi.flatten()], axis=1)
+
+    def _layerCosts(self, a: Vertex3D, b: Vertex3D, states: np.ndarray, r: float, faMin: float, faMax: float) -> np.ndarray:
+        '''
+        costs between every state of two adjacent vertices
+
+        Parameters
+        ----------
+        a: Vertex3D
+            start vertex
+        b: Vertex3D
+            end vertex
+        states: np.ndarray
+            [k, 2] discrete heading and pitch angles
+        r: float
+            curvature constraint
+        faMin: float
+            minimum pitch angle
+        faMax: float
+            maximum pitch angle
+
+        Returns
+        -------
+        np.ndarray
+            [k, k] path costs, infinite where no path exists
+        '''
+        k = len(states)
+        costs = np.full((k, k), np.inf)
+        for i in range(k):
+            for j in range(k):
+                try:
+                    costs[i, j] = self.dubins.calculatePath(
+                        a.x, a.y, a.z, states[i, 0], states[i, 1],
+                        b.x, b.y, b.z, states[j, 0], states[j, 1],
+                        r, faMin, faMax
+                    ).cost
+                except DubinsFailureException:
+                    pass
+        self.evaluations += k * k
+        return costs
@@ -4,10 +4,12 @@ from .etsp2dtspType import Etsp2DtspType
 from .experiment import Experiment, makeExperiment
 from .region import Region, RegionType
 from .regionGroup import RegionGroup
-from .sampleStrategyRecord import SampleStrategyRecord, SampleStrategyType, SampleStrategyIntersection, HeadingStrategyRecord, HeadingStrategyType
+from .sampleStrategyRecord import SampleStrategyRecord, SampleStrategyType, SampleStrategyIntersection, HeadingStrategyRecord, HeadingStrategyType, RefinementStrategyRecord
 from .solution import Solution
+from .tour import Tour
 from .solverType import SolverType
 from .verificationType import VerificationType
 from .vertex import Vertex, Vertex2D, Vertex3D, VertexType, Vertex2DMulti, Vertex3DMulti, VertexMulti
+from .vertexBatch import VertexBatch
 from .environment import Environment
 from .edgeStrategyRecord import EdgeModification, EdgeStrategyRecord, EdgeStrategyType
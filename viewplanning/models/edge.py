@@ -3,6 +3,7 @@ from .vertex import Vertex, Vertex2D, Vertex3D
 from .dubinsPathType import DubinsPathType
 from enum import IntEnum
 import numpy as np
+import copy
 
 
 class EdgeType(IntEnum):
@@ -47,12 +48,94 @@ class Edge(object):
             e.start = Vertex.from_dict(item['start'])
             e.end = Vertex.from_dict(item['end'])
             e.dwellVector = np.array(e.dwellVector)
-            e.leadVector = np.array(e.dwellVector)
+            e.leadVector = np.array(e.leadVector)
             e.transitionEdge = Edge.from_dict(e.transitionEdge)
             return e
         else:
             return Edge(**item)
 
+    @staticmethod
+    def fromParameters(start: Vertex, end: Vertex, parameters: 'list[float]'):
+        '''
+        build an edge from the compact parameters made by toParameters
+
+        Parameters
+        ----------
+        start: Vertex
+            start of the edge
+        end: Vertex
+            end of the edge
+        parameters: list[float]
+            edge type, cost, and path parameters of the edge
+
+        Returns
+        -------
+        Edge
+        '''
+        type = EdgeType(int(parameters[0]))
+        cost = parameters[1]
+        if type == EdgeType.TWO_D:
+            return Edge2D(
+                start=start,
+                end=end,
+                cost=cost,
+                aParam=parameters[2],
+                bParam=parameters[3],
+                cParam=parameters[4],
+                pathType=DubinsPathType(int(parameters[5])),
+                radius=parameters[6]
+            )
+        elif type == EdgeType.THREE_D:
+            return Edge3D(
+                start=start,
+                end=end,
+                cost=cost,
+                aParam=parameters[2],
+                bParam=parameters[3],
+                cParam=parameters[4],
+                pathType=DubinsPathType(int(parameters[5])),
+                radius=parameters[6],
+                starParam=parameters[7],
+                dParam=parameters[8],
+                eParam=parameters[9],
+                fParam=parameters[10],
+                radiusSZ=parameters[11],
+                pathTypeSZ=DubinsPathType(int(parameters[12]))
+            )
+        elif type == EdgeType.DWELL_STRAIGHT:
+            dwellVector = np.array(parameters[2:5])[:len(start.asPoint()[0])]
+            transition = Edge.fromParameters(_transitionVertex(start, dwellVector), end, parameters[5:])
+            return DwellStraightEdge(start=start, end=end, cost=cost, dwellVector=dwellVector, transitionEdge=transition)
+        elif type == EdgeType.LEAD_IN_DWELL:
+            dimension = len(start.asPoint()[0])
+            dwellVector = np.array(parameters[2:5])[:dimension]
+            leadVector = np.array(parameters[5:8])[:dimension]
+            transition = Edge.fromParameters(
+                _transitionVertex(start, dwellVector),
+                _transitionVertex(end, -leadVector),
+                parameters[8:]
+            )
+            return LeadInDwellEdge(
+                start=start,
+                end=end,
+                cost=cost,
+                dwellVector=dwellVector,
+                leadVector=leadVector,
+                transitionEdge=transition
+            )
+        return Edge(start=start, end=end, cost=cost, type=type)
+
+    def toParameters(self) -> 'list[float]':
+        '''
+        compact form of the edge without its start and end vertices
+
+        Returns
+        -------
+        list[float]
+            edge type, cost, and path parameters of the edge
+        '''
+        return [float(self.type), float(self.cost)]
+
 
 @dataclass
 class Edge2D(Edge):
@@ -65,6 +148,17 @@ class Edge2D(Edge):
     type: EdgeType = EdgeType.TWO_D
     radius: float = 0
 
+    def toParameters(self) -> 'list[float]':
+        return [
+            float(EdgeType.TWO_D),
+            float(self.cost),
+            float(self.aParam),
+            float(self.bParam),
+            float(self.cParam),
+            float(self.pathType),
+            float(self.radius)
+        ]
+
 
 @dataclass
 class Edge3D(Edge2D):
@@ -78,6 +172,18 @@ class Edge3D(Edge2D):
     pathTypeSZ: DubinsPathType = DubinsPathType.UNKNOWN
     type: EdgeType = EdgeType.THREE_D
 
+    def toParameters(self) -> 'list[float]':
+        parameters = super().toParameters()
+        parameters[0] = float(EdgeType.THREE_D)
+        return parameters + [
+            float(self.starParam),
+            float(self.dParam),
+            float(self.eParam),
+            float(self.fParam),
+            float(self.radiusSZ),
+            float(self.pathTypeSZ)
+        ]
+
 
 @dataclass
 class DwellStraightEdge(Edge):
@@ -88,6 +194,10 @@ class DwellStraightEdge(Edge):
     transitionEdge: Edge = field(default_factory=Edge)
     type: EdgeType = EdgeType.DWELL_STRAIGHT
 
+    def toParameters(self) -> 'list[float]':
+        return [float(EdgeType.DWELL_STRAIGHT), float(self.cost)] + _padVector(self.dwellVector) + \
+            self.transitionEdge.toParameters()
+
 
 @dataclass
 class LeadInDwellEdge(Edge):
@@ -98,3 +208,28 @@ class LeadInDwellEdge(Edge):
     leadVector: 'list[float]' = field(default_factory=lambda: [0] * 3)
     transitionEdge: Edge = field(default_factory=Edge)
     type: EdgeType = EdgeType.LEAD_IN_DWELL
+
+    def toParameters(self) -> 'list[float]':
+        return [float(EdgeType.LEAD_IN_DWELL), float(self.cost)] + _padVector(self.dwellVector) + \
+            _padVector(self.leadVector) + self.transitionEdge.toParameters()
+
+
+def _padVector(vector) -> 'list[float]':
+    '''
+    vector as a list of 3 floats, 2D vectors have a z of 0
+    '''
+    vector = [float(v) for v in vector]
+    return vector + [0.0] * (3 - len(vector))
+
+
+def _transitionVertex(vertex: Vertex, offset: np.ndarray) -> Vertex:
+    '''
+    copy of a vertex moved by an offset like the start and end of a transition edge, the copy keeps the type, group
+    and visits of the vertex as the edge solvers do
+    '''
+    vertex = copy.deepcopy(vertex)
+    vertex.x += offset[0]
+    vertex.y += offset[1]
+    if len(offset) > 2:
+        vertex.z += offset[2]
+    return vertex
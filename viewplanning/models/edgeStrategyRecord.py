@@ -25,3 +25,5 @@ class EdgeStrategyRecord:
     etsp2DTSPType: Etsp2DtspType = Etsp2DtspType.UNKNOWN
     radius: float = 0
     flightAngleBounds: 'list[float]' = field(default_factory=lambda: [0] * 2)
+    headingResolution: int = 8
+    pitchResolution: int = 1
@@ -4,4 +4,5 @@ class Etsp2DtspType(IntEnum):
     UNKNOWN = 0
     ALTERNATING = 1
     BISECTOR = 2
-    ALTERNATING_BISECTOR = 3
\ No newline at end of file
+    ALTERNATING_BISECTOR = 3
+    DYNAMIC_PROGRAMMING = 4
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from .environment import Environment, RoadMapType
 from .region import Region, RegionType
-from .sampleStrategyRecord import SampleStrategyRecord, SampleStrategyType, HeadingStrategyRecord, HeadingStrategyType, IntersectionStrategyRecord, SampleStrategyIntersection
+from .sampleStrategyRecord import SampleStrategyRecord, SampleStrategyType, HeadingStrategyRecord, HeadingStrategyType, IntersectionStrategyRecord, SampleStrategyIntersection, RefinementStrategyRecord
 from .solverType import SolverType
 from .etsp2dtspType import Etsp2DtspType
 from .verificationType import VerificationType
@@ -13,7 +13,7 @@ import numpy as np
 @dataclass
 class Experiment(object):
     edgeStrategy: EdgeStrategyRecord = field(
-        default_factory=EdgeStrategyRecord),
+        default_factory=EdgeStrategyRecord)
     solverType: SolverType = SolverType.UNKNOWN
     verificationType: VerificationType = VerificationType.DEFAULT
     sampleStrategy: SampleStrategyRecord = field(
@@ -104,12 +104,17 @@ def makeExperiment(
     cliqueLimit: int = 3,
     intersectionRadius: float = 300,
     intersectionAlpha: float = 1,
-    multiplyDwell: bool = True
+    multiplyDwell: bool = True,
+    headingResolution: int = 8,
+    pitchResolution: int = 1,
+    refinement: RefinementStrategyRecord = None,
+    seed: int = 0
 ):
     if envRotMatrix is None:
         envRotMatrix = np.eye(3).tolist()
 
     regions = [] if regions is None else regions
+    refinement = RefinementStrategyRecord() if refinement is None else refinement
     for region in regions:
         region.type = regionType
 
@@ -134,13 +139,17 @@ def makeExperiment(
                 cliqueLimit=cliqueLimit,
                 alpha=intersectionAlpha,
                 cliqueRadius=intersectionRadius
-            )
+            ),
+            refinement=refinement,
+            seed=seed
         ),
         edgeStrategy=EdgeStrategyRecord(
             dwellDistance=dwellDistance,
             leadDistance=leadDistance,
             flightAngleBounds=faBounds,
             etsp2DTSPType=etsp2Dtsp,
+            headingResolution=headingResolution,
+            pitchResolution=pitchResolution,
             radius=radius,
             type=edgeType,
             modification=modification),
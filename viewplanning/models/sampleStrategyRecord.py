@@ -44,6 +44,19 @@ class HeadingStrategyRecord(object):
     multiplyDwell: bool = field(default=False)
 
 
+@dataclass
+class RefinementStrategyRecord(object):
+    numSamples: int = 2
+    distance: float = 50.0
+    numTheta: int = 3
+    headingSpread: float = 0.4
+    numPhi: int = 1
+    phiSpread: float = 0.0
+    maxIterations: int = 3
+    tolerance: float = 0.01
+    shrink: float = 0.5
+
+
 @dataclass
 class SampleStrategyRecord(object):
     type: SampleStrategyType = SampleStrategyType.UNKNOWN
@@ -58,6 +71,11 @@ class SampleStrategyRecord(object):
     heading: HeadingStrategyRecord = field(
         default_factory=HeadingStrategyRecord
     )
+    refinement: RefinementStrategyRecord = field(
+        default_factory=RefinementStrategyRecord
+    )
+    # every random draw of sampling and refinement comes from streams derived from the seed
+    seed: int = 0
 
     @staticmethod
     def from_dict(item: dict):
@@ -66,4 +84,5 @@ class SampleStrategyRecord(object):
             **item.get('intersection', {})
         )
         n.heading = HeadingStrategyRecord(**item.get('heading', {}))
+        n.refinement = RefinementStrategyRecord(**item.get('refinement', {}))
         return n
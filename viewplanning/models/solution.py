@@ -3,24 +3,50 @@ import uuid
 from .experiment import Experiment
 from .edge import Edge
 from .vertex import Vertex
+from .tour import Tour
 
 
 @dataclass
 class Solution(object):
     cost: float = 0
     executionTime: float = 0
-    edges: 'list[Edge]' = field(default_factory=list)
+    tour: Tour = field(default_factory=Tour)
     experiment: Experiment = field(default_factory=Experiment)
     executed: bool = False
     _id: uuid.UUID = field(default_factory=uuid.uuid1)
     samples: 'list[Vertex]' = field(default_factory=list)
     verified: int = 0
 
+    def __post_init__(self):
+        self._edges = None
+
+    @property
+    def edges(self) -> 'list[Edge]':
+        '''
+        edges of the tour, built from the compact tour the first time they are used
+        '''
+        if self._edges is None:
+            self._edges = self.tour.getEdges(self.samples)
+        return self._edges
+
+    @edges.setter
+    def edges(self, edges: 'list[Edge]'):
+        self.tour = Tour.fromEdges(edges, self.samples)
+        self._edges = edges
+
     @staticmethod
     def from_dict(item: dict):
+        item = dict(item)
+        edges = item.pop('edges', None)
         n = Solution(**item)
-        n.edges = [Edge.from_dict(e) for e in item['edges']]
         n.experiment = Experiment.from_dict(item['experiment'])
         n.samples = [Vertex.from_dict(v) for v in item['samples']]
         n.verified = int(n.verified)
+        if 'tour' in item:
+            n.tour = Tour.from_dict(item['tour'])
+        elif edges is not None:
+            # solutions stored before the compact tour, their tours could pass through vertices that aren't samples
+            edges = [Edge.from_dict(e) for e in edges]
+            n.samples += Tour.missingVertices(edges, n.samples)
+            n.edges = edges
         return n
@@ -9,3 +9,4 @@ class SolverType(IntEnum):
     THREE_D_MODIFIED_DISTANCE = 4
     # -----------------------------
     HIGH_ALTITUDE = 8
+    ADAPTIVE = 9
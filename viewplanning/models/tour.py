@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from .edge import Edge
+from .vertex import Vertex
+
+
+@dataclass
+class Tour(object):
+    '''
+    compact tour, vertices are indices into the samples of a solution and each edge is stored as its path parameters
+    '''
+    vertices: 'list[int]' = field(default_factory=list)
+    parameters: 'list[list[float]]' = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def getEdge(self, i: int, samples: 'list[Vertex]') -> Edge:
+        '''
+        build the ith edge of the tour, the edge ending at the ith vertex
+
+        Parameters
+        ----------
+        i: int
+            index of the edge
+        samples: list[Vertex]
+            samples the tour indexes
+
+        Returns
+        -------
+        Edge
+        '''
+        return Edge.fromParameters(samples[self.vertices[i - 1]], samples[self.vertices[i]], self.parameters[i])
+
+    def getEdges(self, samples: 'list[Vertex]') -> 'list[Edge]':
+        '''
+        build all edges of the tour
+
+        Parameters
+        ----------
+        samples: list[Vertex]
+            samples the tour indexes
+
+        Returns
+        -------
+        list[Edge]
+        '''
+        return [self.getEdge(i, samples) for i in range(len(self.vertices))]
+
+    @staticmethod
+    def fromEdges(edges: 'list[Edge]', samples: 'list[Vertex]'):
+        '''
+        make a compact tour from a cycle of edges
+
+        Parameters
+        ----------
+        edges: list[Edge]
+            cycle of edges
+        samples: list[Vertex]
+            samples containing the vertices of the edges
+
+        Returns
+        -------
+        Tour
+
+        Raises
+        ------
+        ValueError
+            if a vertex of the edges isn't one of the samples
+        '''
+        index = _SampleIndex(samples)
+        tour = Tour()
+        for edge in edges:
+            i = index.find(edge.end)
+            if i is None:
+                raise ValueError(f'vertex {edge.end} of the tour is not a sample')
+            tour.vertices.append(i)
+            tour.parameters.append(edge.toParameters())
+        return tour
+
+    @staticmethod
+    def missingVertices(edges: 'list[Edge]', samples: 'list[Vertex]') -> 'list[Vertex]':
+        '''
+        vertices of a cycle of edges that aren't samples, each once
+
+        Parameters
+        ----------
+        edges: list[Edge]
+            cycle of edges
+        samples: list[Vertex]
+            samples the vertices are looked up in
+
+        Returns
+        -------
+        list[Vertex]
+        '''
+        index = _SampleIndex(samples)
+        missing = {}
+        for edge in edges:
+            if index.find(edge.end) is None:
+                missing.setdefault(_vertexKey(edge.end), edge.end)
+        return list(missing.values())
+
+    @staticmethod
+    def from_dict(item: dict):
+        return Tour(**item)
+
+
+class _SampleIndex:
+    '''
+    index of vertices in the samples, by identity and by value since vertices read from a store are copies of the
+    samples
+    '''
+    def __init__(self, samples: 'list[Vertex]'):
+        self.samples = samples
+        self.ids = {id(vertex): i for i, vertex in enumerate(samples)}
+        self.values = None
+
+    def find(self, vertex: Vertex) -> int:
+        if id(vertex) in self.ids:
+            return self.ids[id(vertex)]
+        if self.values is None:
+            self.values = {_vertexKey(sample): i for i, sample in enumerate(self.samples)}
+        return self.values.get(_vertexKey(vertex))
+
+
+def _vertexKey(vertex: Vertex):
+    return (vertex.type, str(vertex.group), tuple(vertex.toList()), getattr(vertex, 'id', -1))
@@ -0,0 +1,401 @@
+from .vertex import Vertex, Vertex2D, Vertex3D, Vertex2DMulti, Vertex3DMulti, VertexMulti, VertexType
+from dataclasses import dataclass, field
+import numpy as np
+
+
+WORD_BITS = 64
+MULTI_TYPES = (VertexType.TWO_D_MULTI, VertexType.THREE_D_MULTI)
+VERTEX_CLASSES = {
+    VertexType.TWO_D: Vertex2D,
+    VertexType.THREE_D: Vertex3D,
+    VertexType.TWO_D_MULTI: Vertex2DMulti,
+    VertexType.THREE_D_MULTI: Vertex3DMulti
+}
+
+
+@dataclass(eq=False)
+class VertexBatch:
+    '''
+    Samples stored as columns instead of one dataclass per sample. Groups are indices into labels, and the groups a
+    sample visits are a bitmask over the labels. Indexing with an int gives a Vertex adapter for code that works on
+    single vertices. The adapter of a row is made once and reused, so lookups by identity keep working, but changes to
+    an adapter aren\'t written back to the columns. Slices are views of the columns.
+    '''
+    # [n, 5] x, y, z, theta, phi
+    data: np.ndarray = field(default_factory=lambda: np.zeros([0, 5]))
+    # [n] index of the group label
+    group: np.ndarray = field(default_factory=lambda: np.zeros([0], dtype=np.int32))
+    # [n] samples that are copies of each other in different groups share an id, -1 when not a multi vertex
+    id: np.ndarray = field(default_factory=lambda: np.zeros([0], dtype=np.int64))
+    # [n, words] bit i is set when the sample visits labels[i]
+    visits: np.ndarray = field(default_factory=lambda: np.zeros([0, 1], dtype=np.uint64))
+    labels: 'list[str]' = field(default_factory=list)
+    type: VertexType = VertexType.THREE_D
+
+    def __post_init__(self):
+        self._vertices: 'list[Vertex]' = [None] * len(self.data)
+        self._labelIndex = {label: i for i, label in enumerate(self.labels)}
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.data[:, 2]
+
+    @property
+    def theta(self) -> np.ndarray:
+        return self.data[:, 3]
+
+    @property
+    def phi(self) -> np.ndarray:
+        return self.data[:, 4]
+
+    @property
+    def points(self) -> np.ndarray:
+        '''[n, 3] view of the positions'''
+        return self.data[:, :3]
+
+    @property
+    def isMulti(self) -> bool:
+        return self.type in MULTI_TYPES
+
+    @property
+    def nbytes(self) -> int:
+        '''bytes used by the columns'''
+        return self.data.nbytes + self.group.nbytes + self.id.nbytes + self.visits.nbytes
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, key) -> 'Vertex | VertexBatch':
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if self._vertices[key] is None:
+                self._vertices[key] = self._makeVertex(key)
+            return self._vertices[key]
+        return VertexBatch(self.data[key], self.group[key], self.id[key], self.visits[key], list(self.labels), self.type)
+
+    def __add__(self, other: 'VertexBatch | list[Vertex]') -> 'VertexBatch':
+        return VertexBatch.concatenate([self, VertexBatch.fromVertices(other)])
+
+    def __radd__(self, other: 'list[Vertex]') -> 'VertexBatch':
+        return VertexBatch.concatenate([VertexBatch.fromVertices(other), self])
+
+    def _makeVertex(self, i: int) -> Vertex:
+        values = dict(zip(('x', 'y', 'z', 'theta', 'phi'), self.data[i].tolist()))
+        if self.type in (VertexType.TWO_D, VertexType.TWO_D_MULTI):
+            values.pop('z')
+            values.pop('phi')
+        values['group'] = self.labels[self.group[i]]
+        if self.isMulti:
+            values['id'] = int(self.id[i])
+            values['visits'] = set(self.visitLabels(i))
+        return VERTEX_CLASSES[self.type](**values)
+
+    def groupLabels(self) -> np.ndarray:
+        '''
+        [n] group label of every sample
+        '''
+        return np.array(self.labels, dtype=object)[self.group]
+
+    def visitLabels(self, i: int) -> 'list[str]':
+        '''
+        labels of the groups a sample visits
+
+        Parameters
+        ----------
+        i: int
+            index of the sample
+
+        Returns
+        -------
+        list[str]
+        '''
+        bits = np.unpackbits(np.ascontiguousarray(self.visits[i]).view(np.uint8), bitorder='little')
+        return [self.labels[j] for j in np.flatnonzero(bits[:len(self.labels)])]
+
+    def visitMatrix(self) -> np.ndarray:
+        '''
+        [n, m] bool where [i, j] is True when sample i visits labels[j]
+        '''
+        bits = np.unpackbits(np.ascontiguousarray(self.visits).view(np.uint8), axis=1, bitorder='little')
+        return bits[:, :len(self.labels)].astype(bool)
+
+    def labelIndex(self, label) -> int:
+        '''
+        index of a group label, the label is added when the batch doesn\'t have it
+
+        Parameters
+        ----------
+        label: str
+            group label
+
+        Returns
+        -------
+        int
+        '''
+        label = str(label)
+        if label not in self._labelIndex:
+            self._labelIndex[label] = len(self.labels)
+            self.labels.append(label)
+            words = _words(len(self.labels))
+            if words > self.visits.shape[1]:
+                self.visits = np.pad(self.visits, [(0, 0), (0, words - self.visits.shape[1])])
+        return self._labelIndex[label]
+
+    def addVisits(self, inside: np.ndarray, labels: 'list[str]'):
+        '''
+        mark samples as visiting groups
+
+        Parameters
+        ----------
+        inside: np.ndarray
+            [n, k] bool where [i, j] is True when sample i visits labels[j]
+        labels: list[str]
+            k group labels
+        '''
+        for j, label in enumerate(labels):
+            rows = np.flatnonzero(inside[:, j])
+            if len(rows) > 0:
+                b = self.labelIndex(label)
+                self.visits[rows, b // WORD_BITS] |= np.uint64(1 << (b % WORD_BITS))
+        self._vertices = [None] * len(self)
+
+    def relabel(self, labels: 'dict[str, str]') -> 'VertexBatch':
+        '''
+        copy of the batch with its group labels renamed, visits of labels missing from the map are dropped
+
+        Parameters
+        ----------
+        labels: dict[str, str]
+            new label of each label, every sample's own group must be in it
+
+        Returns
+        -------
+        VertexBatch
+        '''
+        kept = [j for j, label in enumerate(self.labels) if label in labels]
+        remap = np.full([len(self.labels)], -1, dtype=np.int32)
+        remap[kept] = np.arange(len(kept), dtype=np.int32)
+        group = remap[self.group] if len(self) > 0 else self.group.copy()
+        if np.any(group < 0):
+            raise ValueError('the group of a sample has no new label')
+        batch = VertexBatch(
+            self.data.copy(),
+            group,
+            self.id.copy(),
+            np.zeros([len(self), _words(len(kept))], dtype=np.uint64),
+            [labels[self.labels[j]] for j in kept],
+            self.type
+        )
+        batch.addVisits(self.visitMatrix()[:, kept], batch.labels)
+        return batch
+
+    def duplicateVisits(self) -> 'VertexBatch':
+        '''
+        copy every sample into each group it visits besides its own. The copies are appended after the samples.
+
+        Returns
+        -------
+        VertexBatch
+        '''
+        matrix = self.visitMatrix()
+        matrix[np.arange(len(self)), self.group] = False
+        rows, groups = np.nonzero(matrix)
+        copies = VertexBatch(self.data[rows], groups.astype(np.int32), self.id[rows], self.visits[rows], self.labels, self.type)
+        return VertexBatch.concatenate([self, copies])
+
+    def toVertices(self) -> 'list[Vertex]':
+        '''
+        adapters of every sample
+        '''
+        return list(self)
+
+    def save(self, file):
+        '''
+        write the columns to a compressed .npz
+
+        Parameters
+        ----------
+        file: str | file
+            path or open binary file
+        '''
+        np.savez_compressed(
+            file,
+            data=self.data,
+            group=self.group,
+            id=self.id,
+            visits=self.visits,
+            labels=np.array(self.labels, dtype=str),
+            type=np.array(int(self.type))
+        )
+
+    @staticmethod
+    def load(file) -> 'VertexBatch':
+        '''
+        read a batch written with save
+
+        Parameters
+        ----------
+        file: str | file
+            path or open binary file
+
+        Returns
+        -------
+        VertexBatch
+        '''
+        with np.load(file) as columns:
+            return VertexBatch(
+                columns['data'],
+                columns['group'],
+                columns['id'],
+                columns['visits'],
+                columns['labels'].tolist(),
+                VertexType(int(columns['type']))
+            )
+
+    @staticmethod
+    def fromSamples(points: np.ndarray, headings: 'list[np.ndarray]', phis: np.ndarray, group, visits: 'list' = None, type: VertexType = None) -> 'VertexBatch':
+        '''
+        batch of every combination of heading and pitch angle at each point, ordered by point then heading then pitch.
+
+        Parameters
+        ----------
+        points: np.ndarray
+            [k, 3] positions
+        headings: list[np.ndarray]
+            headings of each position
+        phis: np.ndarray
+            pitch angles given to every heading
+        group:
+            group label of the samples
+        visits: list
+            group labels the samples visit, makes a batch of multi vertices
+        type: VertexType
+            type of the vertices, 3D or 3D multi when not given
+
+        Returns
+        -------
+        VertexBatch
+        '''
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        phis = np.asarray(phis, dtype=float).reshape(-1)
+        counts = np.array([len(h) for h in headings], dtype=int)
+        n = int(np.sum(counts)) * len(phis)
+        data = np.empty([n, 5])
+        data[:, :3] = np.repeat(points, counts * len(phis), axis=0)
+        thetas = np.concatenate([np.asarray(h, dtype=float) for h in headings]) if n > 0 else np.zeros([0])
+        data[:, 3] = np.repeat(thetas, len(phis))
+        data[:, 4] = np.tile(phis, int(np.sum(counts)))
+        batch = VertexBatch(
+            data,
+            np.zeros([n], dtype=np.int32),
+            np.full([n], -1, dtype=np.int64),
+            np.zeros([n, 1], dtype=np.uint64),
+            [],
+            type if type is not None else VertexType.THREE_D if visits is None else VertexType.THREE_D_MULTI
+        )
+        batch.group[:] = batch.labelIndex(group)
+        if visits is not None:
+            batch.addVisits(np.ones([n, len(visits)], dtype=bool), list(visits))
+        return batch
+
+    @staticmethod
+    def fromVertices(vertices: 'list[Vertex] | VertexBatch') -> 'VertexBatch':
+        '''
+        batch of a list of vertices of the same type
+
+        Parameters
+        ----------
+        vertices: list[Vertex] | VertexBatch
+            vertices to store, batches are returned as they are
+
+        Returns
+        -------
+        VertexBatch
+        '''
+        if isinstance(vertices, VertexBatch):
+            return vertices
+        vertices = list(vertices)
+        n = len(vertices)
+        vertexType = vertices[0].type if n > 0 else VertexType.THREE_D
+        batch = VertexBatch(
+            np.zeros([n, 5]),
+            np.zeros([n], dtype=np.int32),
+            np.full([n], -1, dtype=np.int64),
+            np.zeros([n, 1], dtype=np.uint64),
+            [],
+            vertexType
+        )
+        for i, vertex in enumerate(vertices):
+            batch.data[i] = [vertex.x, vertex.y, getattr(vertex, 'z', 0), vertex.theta, getattr(vertex, 'phi', 0)]
+            batch.group[i] = batch.labelIndex(vertex.group)
+            if isinstance(vertex, VertexMulti):
+                batch.id[i] = vertex.id
+                for label in vertex.visits:
+                    b = batch.labelIndex(label)
+                    batch.visits[i, b // WORD_BITS] |= np.uint64(1 << (b % WORD_BITS))
+        # the vertices are the adapters of the batch
+        batch._vertices = vertices
+        return batch
+
+    @staticmethod
+    def concatenate(batches: 'list[VertexBatch]') -> 'VertexBatch':
+        '''
+        join batches of the same vertex type, labels of the batches are merged
+
+        Parameters
+        ----------
+        batches: list[VertexBatch]
+
+        Returns
+        -------
+        VertexBatch
+        '''
+        batches = [b for b in batches if len(b) > 0] or batches[:1]
+        if len(batches) == 0:
+            return VertexBatch()
+        labels = []
+        index = {}
+        for batch in batches:
+            for label in batch.labels:
+                if label not in index:
+                    index[label] = len(labels)
+                    labels.append(label)
+        words = _words(len(labels))
+        groups = []
+        visits = []
+        for batch in batches:
+            remap = np.array([index[label] for label in batch.labels], dtype=np.int32)
+            groups.append(remap[batch.group] if len(remap) > 0 else batch.group)
+            if len(batch.labels) > 0 and np.array_equal(remap, np.arange(len(remap))):
+                visits.append(np.pad(batch.visits, [(0, 0), (0, words - batch.visits.shape[1])]))
+                continue
+            moved = np.zeros([len(batch), words], dtype=np.uint64)
+            matrix = batch.visitMatrix()
+            for j, b in enumerate(remap):
+                moved[matrix[:, j], b // WORD_BITS] |= np.uint64(1 << (int(b) % WORD_BITS))
+            visits.append(moved)
+        return VertexBatch(
+            np.concatenate([b.data for b in batches]),
+            np.concatenate(groups).astype(np.int32),
+            np.concatenate([b.id for b in batches]),
+            np.concatenate(visits),
+            labels,
+            batches[0].type
+        )
+
+
+def _words(numLabels: int) -> int:
+    return max(1, -(-numLabels // WORD_BITS))
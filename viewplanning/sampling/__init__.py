@@ -1,2 +1,6 @@
-from .sampleHelpers import containsPoint3d, polygonFromBody, containsPoint2d, SamplingFailedException, iterateRegions, polygonsFromMesh, IdProvider, getAngle, getPointsOnEdge
+from .sampleHelpers import containsPoint3d, containsPoints3d, polygonFromBody, containsPoint2d, containsPoints2d, SamplingFailedException, iterateRegions, polygonsFromMesh, IdProvider, getAngle, getAngles, pointsOnPerimeter, getPointsOnEdge, samplePerimeter
 from .sampleStrategy import SampleStrategy
+from .slicing import sliceMesh, sliceMany
+from .sliceCache import SliceCache
+from .polygonStack import PolygonStack
+from .cachedSampleStrategy import CachedSampleStrategy
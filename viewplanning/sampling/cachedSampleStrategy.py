@@ -0,0 +1,149 @@
+from viewplanning.sampling.sampleStrategy import SampleStrategy
+from viewplanning.sampling.sampleHelpers import IdProvider
+from viewplanning.sampling.polygonStack import LEVELS
+from viewplanning.configuration import ConfigurationFactory
+from viewplanning.models import Region, SampleStrategyRecord, SampleStrategyIntersection, VertexBatch
+from typing import Iterator
+import numpy as np
+import dataclasses
+import hashlib
+import logging
+import json
+import os
+
+
+# change when the samplers change so old samples aren't reused
+CACHE_VERSION = 1
+
+
+class CachedSampleStrategy(SampleStrategy[Region]):
+    '''
+    Keeps the samples of a strategy in a folder of .npz files keyed by the region files and their modification times,
+    the sample strategy record and its seed, and the intersection settings of intersecting strategies. Experiments that only differ in how the samples are used share samples,
+    and running an experiment again skips sampling.
+    '''
+
+    @staticmethod
+    def fromConfig(strategy: SampleStrategy, record: SampleStrategyRecord) -> SampleStrategy:
+        '''
+        wrap a strategy with the cache folder in the configuration, the strategy is returned as is without a folder
+
+        Parameters
+        ----------
+        strategy: SampleStrategy
+            strategy to cache
+        record: SampleStrategyRecord
+            record the strategy was made from
+
+        Returns
+        -------
+        SampleStrategy
+        '''
+        config = ConfigurationFactory.getInstance()
+        config = {} if config is None else config.get('samples', {})
+        folder = config.get('folder', '')
+        if not folder:
+            return strategy
+        return CachedSampleStrategy(strategy, record, folder)
+
+    def __init__(self, strategy: SampleStrategy, record: SampleStrategyRecord, folder: str):
+        '''
+        Parameters
+        ----------
+        strategy: SampleStrategy
+            strategy to get samples from when they aren't cached
+        record: SampleStrategyRecord
+            record the strategy was made from
+        folder: str
+            directory of the cached samples
+        '''
+        super().__init__(strategy.headingStrategy)
+        self.strategy = strategy
+        self.record = record
+        self.folder = folder
+        self.rng = strategy.rng
+        self.hits = 0
+        self.misses = 0
+
+    def setRng(self, rng):
+        self.strategy.setRng(rng)
+        return super().setRng(rng)
+
+    def getSamples(self, regions: 'Iterator[Region]') -> VertexBatch:
+        regions = list(regions)
+        file = os.path.join(self.folder, self.key(regions) + '.npz')
+        if os.path.exists(file):
+            try:
+                samples = VertexBatch.load(file)
+                self.hits += 1
+                logging.debug(f'loaded {len(samples)} samples from {file}')
+                return self._freshIds(samples)
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f'failed to read cached samples {file}: {e}')
+        self.misses += 1
+        samples = VertexBatch.fromVertices(self.strategy.getSamples(regions))
+        os.makedirs(self.folder, exist_ok=True)
+        # write beside the cache and move it in so other processes never read a partial file
+        temp = f'{file}.{os.getpid()}.tmp'
+        with open(temp, 'wb') as f:
+            samples.save(f)
+        os.replace(temp, file)
+        return samples
+
+    def key(self, regions: 'list[Region]') -> str:
+        '''
+        name of the cache file of the samples of regions
+
+        Parameters
+        ----------
+        regions: list[Region]
+            regions to sample
+
+        Returns
+        -------
+        str
+        '''
+        record = dataclasses.asdict(self.record)
+        # refinement happens after sampling
+        record.pop('refinement', None)
+        item = {
+            'version': CACHE_VERSION,
+            'record': record,
+            'regions': [{
+                'file': os.path.abspath(region.file) if region.file else '',
+                'mtime': os.path.getmtime(region.file) if region.file and os.path.exists(region.file) else 0,
+                'type': int(region.type),
+                'rotationMatrix': np.asarray(region.rotationMatrix, dtype=float).tolist(),
+                'z': region.z,
+                'points': region.points
+            } for region in regions]
+        }
+        if self.record.intersection.type not in (SampleStrategyIntersection.UNKNOWN, SampleStrategyIntersection.NON_INTERSECTING):
+            # samples of intersecting strategies come from the intersections of the configured store
+            item['intersection'] = _intersectionSettings()
+        return hashlib.sha1(json.dumps(item, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _freshIds(self, samples: VertexBatch) -> VertexBatch:
+        '''
+        copies of a multi vertex share an id, the ids are replaced so they don't collide with ids given out in this
+        process
+        '''
+        multi = samples.id >= 0
+        if multi.any():
+            unique, inverse = np.unique(samples.id[multi], return_inverse=True)
+            samples.id[multi] = IdProvider.getInsance('').getIds(len(unique))[inverse]
+        return samples
+
+
+def _intersectionSettings() -> dict:
+    '''
+    configuration of the intersection store that changes the intersections multi region samplers sample
+    '''
+    config = ConfigurationFactory.getInstance()
+    config = {} if config is None else config.get('intersection', {})
+    settings = {'type': config.get('type', 'memory')}
+    if settings['type'] == 'slices':
+        settings['levels'] = config.get('levels', LEVELS)
+    elif settings['type'] == 'drive':
+        settings['folder'] = os.path.abspath(config.get('folder', ''))
+    return settings
@@ -2,4 +2,4 @@ from .headingStrategy import HeadingStrategy
 from .straightDwellHeadings import StraightDwellHeadings
 from .uniformHeadings import UniformHeadings
 from .inwardPointingHeadings import InwardPointingHeadings
-from .helpers import dwellHeadingSubsets
+from .helpers import dwellHeadingSubsets, dwellHeadingSubsetsMany, intersectRays, intersectRaysMany
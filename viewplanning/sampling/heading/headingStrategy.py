@@ -1,4 +1,4 @@
-from viewplanning.sampling.sampleHelpers import polygonFromBody
+from viewplanning.sampling.sliceCache import SliceCache
 import numpy as np
 import pyvista as pv
 from shapely.geometry import Polygon
@@ -45,13 +45,96 @@ class HeadingStrategy:
         if polygon is None and mesh is None:
             raise TypeError('Mesh and Polygon cannot both be None')
         if polygon is None and mesh is not None:
-            polygon = polygonFromBody(point[2], mesh, cutoff=CUTOFF)
+            polygon = SliceCache.getInstance().getPolygon(point[2], mesh, cutoff=CUTOFF)
         if polygon is None:
             return []
         return self.getHeadingsHelper(point, self.numHeadings, polygon, **kwargs)
 
+    def getHeadingsBatch(self, points: np.ndarray, mesh: pv.PolyData = None, polygon: Polygon = None, **kwargs) -> 'list[np.ndarray]':
+        '''
+        Get headings of many points. Either mesh or polygon parameters must be passed. Strategies that can find the
+        headings of every point in a slice at once override this.
+        Parameters
+        ----------
+        points: np.ndarray
+            [m, 3] points to get headings at
+        mesh: pv.PolyData
+            visibility volume
+        polygon: Polygon
+            horizontal slice of a visibility volume every point is in
+        Returns
+        -------
+        list[np.ndarray]
+            the sampled headings of each point
+        '''
+        if polygon is None and mesh is None:
+            raise TypeError('Mesh and Polygon cannot both be None')
+        return [self.getHeadings(np.array(point, dtype=float), mesh=mesh, polygon=polygon, **kwargs) for point in points]
+
     def getHeadingsHelper(self, point: np.ndarray, numHeadings: int, polygon: Polygon, **kwargs):
         '''
             abstract method to override in subclasses to sample headings
         '''
         raise NotImplementedError()
+
+    def getHeadingsNear(self, point: np.ndarray, heading: float, numHeadings: int, spread: float, mesh: pv.PolyData = None, polygon: Polygon = None, **kwargs):
+        '''
+        Get headings within spread radians of a heading that the strategy would accept at the point. Either mesh or
+        polygon parameters must be passed.
+
+        Parameters
+        ----------
+        point: np.ndarray
+            point to get headings at
+        heading: float
+            heading to sample around
+        numHeadings: int
+            number of headings to sample
+        spread: float
+            largest difference from heading in radians
+        mesh: pv.PolyData
+            visibility volume
+        polygon: Polygon
+            horizontal slice of a visibility volume
+        Returns
+        -------
+        np.ndarray
+            a set of sampled headings for the point
+        '''
+        if polygon is None and mesh is None:
+            raise TypeError('Mesh and Polygon cannot both be None')
+        if polygon is None and mesh is not None:
+            polygon = SliceCache.getInstance().getPolygon(point[2], mesh, cutoff=CUTOFF)
+        if polygon is None:
+            return []
+        candidates = headingsNear(heading, numHeadings, spread)
+        return self.getHeadingsNearHelper(point, candidates, polygon, **kwargs)
+
+    def getHeadingsNearHelper(self, point: np.ndarray, candidates: np.ndarray, polygon: Polygon, **kwargs):
+        '''
+            method to override in subclasses to remove the candidate headings the strategy wouldn\'t sample
+        '''
+        return candidates
+
+
+def headingsNear(heading: float, numHeadings: int, spread: float) -> np.ndarray:
+    '''
+    headings evenly spaced in [heading - spread, heading + spread]
+
+    Parameters
+    ----------
+    heading: float
+        center heading
+    numHeadings: int
+        number of headings
+    spread: float
+        largest difference from heading in radians
+
+    Returns
+    -------
+    np.ndarray
+        headings
+    '''
+    if numHeadings <= 1 or spread <= 0:
+        return np.array([heading])
+    return np.linspace(heading - spread, heading + spread, numHeadings)
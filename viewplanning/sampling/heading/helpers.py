@@ -5,6 +5,8 @@ from dataclasses import dataclass
 
 APPROX_ZERO = 1e-4
 TWO_PI = 2 * np.pi
+# number of segment and ray pairs tested at once
+RAY_CHUNK = 2 ** 20
 
 
 def dwellHeadingSubsets(point: np.ndarray, polygon: Polygon, numRays: int, dwellDistance: float):
@@ -27,23 +29,44 @@ def dwellHeadingSubsets(point: np.ndarray, polygon: Polygon, numRays: int, dwell
     list[list]
         a set of subsets of valid heading angles
     '''
-    s = getSegment(point, polygon)
-    d = s[1, :] - s[0, :]
-    theta0 = np.arctan2(d[1], d[0])
-    theta = np.linspace(theta0, theta0 + np.pi, numRays)
-    ray = np.row_stack([np.cos(theta), np.sin(theta)]).T
-    distances = intersectRays([polygon], point, ray, np.inf)
-    valid = distances > dwellDistance
+    return dwellHeadingSubsetsMany(np.reshape(point, [1, -1]), polygon, numRays, dwellDistance)[0]
+
+
+def dwellHeadingSubsetsMany(points: np.ndarray, polygon: Polygon, numRays: int, dwellDistance: float):
+    '''
+    dwellHeadingSubsets of many points in the same polygon. The rays of all the points are cast at once.
+
+    Parameters
+    ----------
+    points: np.ndarray
+        [m, 2 or 3] points where the headings are tested
+    polygon: Polygon
+        a horizontal slice of a visiblity polygon
+    numRays: int
+        numer of rays to test headings with
+    dwellDistance: float | np.ndarray
+        how far in a heading direction the vehicle needs to dwell in visiblility volume, one for all points or [m]
+
+    Returns
+    -------
+    list[list]
+        the subsets of valid heading angles of each point
+    '''
+    points = np.asarray(points, dtype=float)
+    s = getSegments(points, polygon)
+    d = s[:, 1, :] - s[:, 0, :]
+    theta0 = np.arctan2(d[:, 1], d[:, 0])
+    theta = np.linspace(theta0, theta0 + np.pi, numRays, axis=1)
+    rays = np.stack([np.cos(theta), np.sin(theta)], axis=2)
+    distances = intersectRaysMany([polygon], points, rays, np.inf)
+    valid = distances > np.reshape(dwellDistance, [-1, 1])
+    # runs of valid rays start where valid turns on and end where it turns off
+    edges = np.diff(np.pad(valid, [(0, 0), (1, 1)]).astype(np.int8), axis=1)
     sets = []
-    current = None
-    for i in range(valid.shape[0]):
-        if valid[i] and current is None:
-            current = i
-        elif not valid[i] and current is not None:
-            sets.append((theta[current], theta[i - 1]))
-            current = None
-    if current is not None:
-        sets.append((theta[current], theta[valid.shape[0] - 1]))
+    for i in range(len(points)):
+        starts = np.flatnonzero(edges[i] == 1)
+        ends = np.flatnonzero(edges[i] == -1) - 1
+        sets.append([(theta[i, j], theta[i, k]) for j, k in zip(starts, ends)])
     return sets
 
 
@@ -63,16 +86,34 @@ def getSegment(point: np.ndarray, polygon: Polygon):
     np.ndarray
         a pair of points representing a line segment
     '''
+    return getSegments(np.reshape(point, [1, -1]), polygon)[0]
+
+
+def getSegments(points: np.ndarray, polygon: Polygon):
+    '''
+    getSegment of many points on the same polygon
+
+    Parameters
+    ----------
+    points: np.ndarray
+        [m, 2 or 3] points to test
+    polygon: Polygon
+        polygon to find segments on
+
+    Returns
+    -------
+    np.ndarray
+        [m, 2, d] pairs of points representing line segments
+    '''
     vertices = np.array(polygon.exterior.coords[:-1])
-    d = np.roll(vertices, -1, 0) - vertices
-    p = vertices - point
-    d = d[:, :2]
-    p = p[:, :2]
-    t = np.cross(d, p, axis=1)
-    i = np.argmin(np.abs(t))
-    if i + 2 > vertices.shape[0]:
-        return np.row_stack([vertices[i], vertices[0]])
-    return vertices[i:i + 2, :]
+    d = (np.roll(vertices, -1, 0) - vertices)[:, :2]
+    index = np.zeros(len(points), dtype=int)
+    step = max(1, RAY_CHUNK // len(vertices))
+    for i in range(0, len(points), step):
+        p = vertices[None, :, :2] - np.asarray(points)[i:i + step, None, :2]
+        t = d[None, :, 0] * p[:, :, 1] - d[None, :, 1] * p[:, :, 0]
+        index[i:i + step] = np.argmin(np.abs(t), axis=1)
+    return np.stack([vertices[index], vertices[(index + 1) % len(vertices)]], axis=1)
 
 
 def intersectRays(polygons: 'list[Polygon]', start: np.ndarray, dirs: np.ndarray, dmax: float):
@@ -95,39 +136,49 @@ def intersectRays(polygons: 'list[Polygon]', start: np.ndarray, dirs: np.ndarray
     np.ndarray
         a set of distances where the rays intersect or dmax if no intersection
     '''
-    dirs = np.apply_along_axis(lambda x: x / np.linalg.norm(x), 1, dirs)
-    s0hat = []
-    nhat = []
-    s1hat = []
-    for polygon in polygons:
-        t0 = np.array(polygon.exterior.coords[:-1])[:, :2]
-        t1 = np.roll(t0, 1, 0)
-        nhat.append(t1 - t0)
-        s0hat.append(t0)
-        s1hat.append(t1)
-    s0 = np.row_stack(s0hat)
-    s1 = np.row_stack(s1hat)
-    n = np.row_stack(nhat)
-    p = np.matmul(dirs, [[0, 1], [-1, 0]])
-    nom = np.einsum('kj, ij -> ik', p, s0 - start[:2])
-    denom = np.einsum('kj, ij -> ik', p, n)
-    with np.errstate(divide='ignore'):
-        t = -nom / denom
-    # get rid of points not on line segments
-    t[t < -APPROX_ZERO] = np.inf
-    t[t > 1 + APPROX_ZERO] = np.inf
-    points = np.zeros([t.shape[0], t.shape[1], 2])
-    with np.errstate(invalid='ignore'):
-        for ii in range(t.shape[0]):
-            for jj in range(t.shape[1]):
-                points[ii, jj, :] = t[ii, jj] * n[ii] + s0[ii]
-
-    vectors = points - np.reshape(start[:2], [1, 1, 2])
-    distance = np.einsum('kj, ikj -> ik', dirs, vectors)
-    # ensure ray is going the right direction and limit direction
-    distance[distance < 0] = dmax
-    distance[distance > dmax] = dmax
-    distance[np.isnan(distance)] = dmax
-    index = np.argmin(distance, axis=0)
-
-    return np.squeeze([distance[index[i], i] for i in range(index.shape[0])])
+    return np.squeeze(intersectRaysMany(polygons, np.reshape(start, [1, -1]), dirs, dmax)[0])
+
+
+def intersectRaysMany(polygons: 'list[Polygon]', starts: np.ndarray, dirs: np.ndarray, dmax: float):
+    '''
+    intersectRays from many start points at once
+
+    Parameters
+    ----------
+    polygons: list[Polygon]
+        objects to block the rays
+    starts: np.ndarray
+        [m, 2 or 3] start points
+    dirs: np.ndarray
+        [k, 2] directions emitted from every start point or [m, k, 2] directions of each start point
+    dmax: float
+        maximum distance to consider
+
+    Returns
+    -------
+    np.ndarray
+        [m, k] distances where the rays intersect or dmax if no intersection
+    '''
+    starts = np.asarray(starts, dtype=float)[:, :2]
+    dirs = np.asarray(dirs, dtype=float)
+    dirs = dirs / np.linalg.norm(dirs, axis=-1, keepdims=True)
+    dirs = np.broadcast_to(dirs, (len(starts),) + dirs.shape[-2:])
+    t0 = [np.array(polygon.exterior.coords[:-1])[:, :2] for polygon in polygons]
+    s0 = np.concatenate(t0)
+    n = np.concatenate([np.roll(t, 1, 0) - t for t in t0])
+    # normal of each ray
+    p = np.stack([-dirs[:, :, 1], dirs[:, :, 0]], axis=2)
+    distance = np.empty(dirs.shape[:2])
+    step = max(1, RAY_CHUNK // (len(s0) * dirs.shape[1]))
+    for i in range(0, len(starts), step):
+        rel = s0[None, :, :] - starts[i:i + step, None, :]
+        nom = np.einsum('mkj, msj -> msk', p[i:i + step], rel)
+        denom = np.einsum('mkj, sj -> msk', p[i:i + step], n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = -nom / denom
+            # distance along the ray to where it crosses the segment
+            d = np.einsum('mkj, msj -> msk', dirs[i:i + step], rel) + t * np.einsum('mkj, sj -> msk', dirs[i:i + step], n)
+        # get rid of points not on line segments, behind the ray, or parallel to it
+        d[~((t >= -APPROX_ZERO) & (t <= 1 + APPROX_ZERO) & (d >= 0))] = dmax
+        distance[i:i + step] = np.minimum(np.min(d, axis=1), dmax)
+    return distance
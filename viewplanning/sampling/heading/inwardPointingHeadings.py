@@ -1,6 +1,7 @@
 from .headingStrategy import HeadingStrategy
-from .helpers import getSegment
+from .helpers import getSegment, getSegments
 import numpy as np
+import pyvista as pv
 from shapely.geometry import Polygon
 
 
@@ -13,3 +14,17 @@ class InwardPointingHeadings(HeadingStrategy):
         d = s[1] - s[0]
         theta = np.arctan2(d[1], d[0])
         return np.linspace(theta, theta + np.pi, numHeadings)
+
+    def getHeadingsBatch(self, points: np.ndarray, mesh: pv.PolyData = None, polygon: Polygon = None, **kwargs):
+        if polygon is None:
+            return super().getHeadingsBatch(points, mesh=mesh, polygon=polygon, **kwargs)
+        s = getSegments(points, polygon)
+        d = s[:, 1] - s[:, 0]
+        theta = np.arctan2(d[:, 1], d[:, 0])
+        return list(np.linspace(theta, theta + np.pi, self.numHeadings, axis=1))
+
+    def getHeadingsNearHelper(self, point: np.ndarray, candidates: np.ndarray, polygon: Polygon, **kwargs):
+        s = getSegment(point, polygon)
+        d = s[1] - s[0]
+        theta = np.arctan2(d[1], d[0])
+        return candidates[np.mod(candidates - theta, 2 * np.pi) <= np.pi]
@@ -1,6 +1,6 @@
 import numpy as np
 import pyvista as pv
-from .helpers import getSegment, dwellHeadingSubsets
+from .helpers import getSegments, dwellHeadingSubsetsMany
 from shapely.geometry import Polygon
 from .headingStrategy import HeadingStrategy
 
@@ -31,13 +31,43 @@ class StraightDwellHeadings(HeadingStrategy):
         self.dwellDistance = dwellDistance
 
     def getHeadingsHelper(self, point: np.ndarray, numHeadings: int, polygon: Polygon, dwellMultiplier: float = 1, **kwargs):
+        return self._headingsMany(np.reshape(point, [1, -1]), numHeadings, polygon, dwellMultiplier)[0]
+
+    def getHeadingsBatch(self, points: np.ndarray, mesh: pv.PolyData = None, polygon: Polygon = None, dwellMultiplier: float = 1, **kwargs):
+        if polygon is None:
+            return super().getHeadingsBatch(points, mesh=mesh, polygon=polygon, dwellMultiplier=dwellMultiplier, **kwargs)
+        return self._headingsMany(np.asarray(points, dtype=float), self.numHeadings, polygon, dwellMultiplier)
+
+    def getHeadingsNearHelper(self, point: np.ndarray, candidates: np.ndarray, polygon: Polygon, dwellMultiplier: float = 1, **kwargs):
         dwellMultiplier = dwellMultiplier if self.multiplyDwell else 1
-        s = getSegment(point, polygon)
-        d = s[1] - s[0]
+        point = self._offsetIntoShape(np.reshape(point, [1, -1]).astype(float), polygon)
+        headingSets = dwellHeadingSubsetsMany(
+            point, polygon, self.numRays, self.dwellDistance * dwellMultiplier)[0]
+        valid = np.zeros(len(candidates), dtype=bool)
+        for start, end in headingSets:
+            valid |= np.mod(candidates - start, 2 * np.pi) <= end - start + APPROX_ZERO
+        return candidates[valid]
+
+    def _headingsMany(self, points: np.ndarray, numHeadings: int, polygon: Polygon, dwellMultiplier: float):
+        dwellMultiplier = dwellMultiplier if self.multiplyDwell else 1
+        points = self._offsetIntoShape(points, polygon)
+        headingSets = dwellHeadingSubsetsMany(
+            points, polygon, self.numRays, self.dwellDistance * dwellMultiplier)
+        return [self._spreadHeadings(sets, numHeadings) for sets in headingSets]
+
+    def _offsetIntoShape(self, points: np.ndarray, polygon: Polygon):
+        '''
+        moves points OFFSET_INTO_SHAPE away from their nearest segment to the inside of the polygon
+        '''
+        s = getSegments(points, polygon)
+        d = s[:, 1] - s[:, 0]
         n = np.matmul(d, [[0, 1, 0], [-1, 0, 0], [0, 0, 1]])
-        point += n / np.linalg.norm(n) * OFFSET_INTO_SHAPE
-        headingSets = dwellHeadingSubsets(
-            point, polygon, self.numRays, self.dwellDistance * dwellMultiplier)
+        return points + n / np.linalg.norm(n, axis=1, keepdims=True) * OFFSET_INTO_SHAPE
+
+    def _spreadHeadings(self, headingSets: 'list[tuple]', numHeadings: int):
+        '''
+        headings evenly spaced over the total range of the heading sets
+        '''
         if len(headingSets) <= 0:
             return []
         totalRange = sum([e - s for s, e in headingSets])
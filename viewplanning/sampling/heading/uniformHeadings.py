@@ -1,4 +1,4 @@
-from .headingStrategy import HeadingStrategy
+from .headingStrategy import HeadingStrategy, headingsNear
 import numpy as np
 from shapely.geometry import Polygon
 import pyvista as pv
@@ -14,3 +14,6 @@ class UniformHeadings(HeadingStrategy):
 
     def getHeadings(self, point: np.ndarray, mesh: pv.PolyData = None, polygon: Polygon = None, **kwargs):
         return np.linspace(self.headingRange[0], self.headingRange[1] - (self.headingRange[1] - self.headingRange[0]) / self.numHeadings, self.numHeadings)
+
+    def getHeadingsNear(self, point: np.ndarray, heading: float, numHeadings: int, spread: float, mesh: pv.PolyData = None, polygon: Polygon = None, **kwargs):
+        return headingsNear(heading, numHeadings, spread)
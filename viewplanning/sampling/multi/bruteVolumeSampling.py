@@ -1,7 +1,8 @@
 from viewplanning.sampling.sampleStrategy import SampleStrategy
 from viewplanning.sampling.sampleHelpers import iterateRegions, SamplingFailedException
 from .helpers import findCliques, MultiSampleStrategy, makeDuplicateNodes, IntersectionStore, Volume
-from viewplanning.models import VertexMulti, Region
+from viewplanning.store import MeshGeometry, MeshRef
+from viewplanning.models import VertexBatch, Region
 from typing import Iterator
 import pyvista as pv
 from math import sqrt
@@ -35,7 +36,11 @@ class BruteVolumeSampling(SampleStrategy):
         self.method = method
         self.headingStrategy = method.headingStrategy
 
-    def getSamples(self, regions: 'Iterator[Region]') -> 'list[VertexMulti]':
+    def setRng(self, rng):
+        self.method.setRng(rng)
+        return super().setRng(rng)
+
+    def getSamples(self, regions: 'Iterator[Region]') -> VertexBatch:
         try:
             regions: list[Region] = list(regions)
             meshes: list[pv.PolyData] = list(iterateRegions(regions))
@@ -44,20 +49,22 @@ class BruteVolumeSampling(SampleStrategy):
             volumes: list[Volume] = []
             for i, mesh in enumerate(meshes):
                 volumes.append(
-                    Volume([str(i)], mesh, self.method.numSamples, mesh.volume))
+                    Volume([str(i)], mesh, self.method.numSamples, MeshGeometry.of(mesh).volume))
             logging.debug(f'finding cliques for pid {os.getpid()}')
             cliques = findCliques(
                 regions,
                 self.cliqueRadius,
                 clique_limit=self.cliqueLimit,
                 dwell=self.headingStrategy.dwellDistance,
-                multDwell=self.headingStrategy.multiplyDwell
+                multDwell=self.headingStrategy.multiplyDwell,
+                meshes=meshes
             )
             logging.debug(f'intersecting meshes for pid {os.getpid()} # of cliques {len(cliques)}')
-            for group in cliques:
-                if len(group) <= 1:
-                    continue
-                mesh = intersectMeshes(group, meshes, regions)
+            intersections, operations = intersectCliques(cliques, meshes, regions)
+            logging.debug(
+                f'intersected {len(intersections)} cliques for pid {os.getpid()} with {operations} booleans, '
+                f'{sum(len(group) - 1 for group in intersections) - operations} fewer than from scratch')
+            for group, mesh in intersections.items():
                 if not mesh or mesh.n_cells <= 0:
                     continue
                 x_min, x_max, y_min, y_max, _, _ = mesh.bounds
@@ -68,28 +75,59 @@ class BruteVolumeSampling(SampleStrategy):
                     d = self.headingStrategy.dwellDistance
                 if k < d:
                     continue
-                volumes.append(Volume(list(map(str, group)), mesh, self.method.numSamples, mesh.volume))
+                volumes.append(Volume(list(map(str, group)), mesh, self.method.numSamples, MeshGeometry.of(mesh).volume))
 
             logging.debug(f'finding samples points for pid {os.getpid()}')
             # get samples from sample method
             samples = self.method.sampleMeshes(volumes, meshes, regions)
-            # return checkMultiRegion(samples, meshes, containsPoint3d)
+            # return checkMultiRegion(samples, meshes)
             # if len(set([s.group for s in samples])) != len(meshes):
             #     raise SamplingFailedException('Failed to Sample all Meshes')
             return makeDuplicateNodes(samples)
         finally:
-            store = IntersectionStore.getInstance()
-            store.clearCache()
+            # intersections are kept for the next experiment on the same regions
+            IntersectionStore.getInstance().logStats()
+
 
+def intersectCliques(cliques: 'list[list[int]]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> 'tuple[dict[tuple[int, ...], pv.PolyData], int]':
+    '''
+    intersect cliques one size at a time, a clique is the intersection of its prefix clique and its last mesh. Cliques
+    whose prefix is empty are empty and are skipped, and all cliques of a size are intersected in parallel.
+    enumerate_all_cliques gives the prefix of every clique before the clique.
+
+    Parameters
+    ----------
+    cliques: list[list[int]]
+        indices of the meshes of every clique
+    meshes: list[pv.PolyData]
+        visibility volumes
+    regions: list[Region]
+        regions of the meshes
 
-def intersectMeshes(indices, meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> pv.PolyData:
-    result = meshes[indices[0]]
+    Returns
+    -------
+    tuple[dict[tuple[int, ...], pv.PolyData | None], int]
+        intersection of every clique with more than one mesh in the order of the cliques and the number of booleans
+    '''
     store = IntersectionStore.getInstance()
-    for k, i in enumerate(indices[1:], 1):
-        result = store.intersect(
-            result,
-            meshes[i],
-            '-'.join([os.path.basename(regions[j].file) for j in indices[:k]]),
-            os.path.basename(regions[i].file)
+    ref = lambda i: MeshRef.fromRegion(regions[i]) if regions[i].file else meshes[i]
+    results: 'dict[tuple[int, ...], pv.PolyData]' = {tuple(clique): None for clique in cliques if len(clique) > 1}
+    operations = 0
+    for size in sorted({len(clique) for clique in results}):
+        level = [clique for clique in results if len(clique) == size]
+        if size == 2:
+            prefixes = [meshes[clique[0]] for clique in level]
+            jobs = [[ref(clique[0]), ref(clique[1])] for clique in level]
+        else:
+            level = [clique for clique in level if results.get(clique[:-1]) is not None]
+            prefixes = [results[clique[:-1]] for clique in level]
+            jobs = [[results[clique[:-1]], ref(clique[-1])] for clique in level]
+        intersections = store.intersectPairs(
+            [(prefix, meshes[clique[-1]]) for prefix, clique in zip(prefixes, level)],
+            [store.groupKey(clique, regions) for clique in level],
+            jobs
         )
-    return result
+        operations += len(level)
+        for clique, intersection in zip(level, intersections):
+            results[clique] = intersection if intersection is not None and intersection.n_cells > 0 else None
+    return results, operations
@@ -1,8 +1,10 @@
 from typing import Callable, Any
-from viewplanning.models import VertexMulti, Region
-from viewplanning.store import MeshStore, IntersectionStore
-from viewplanning.sampling.sampleHelpers import IdProvider, SamplingFailedException
-import copy
+from viewplanning.models import VertexMulti, VertexBatch, Region
+from viewplanning.store import MeshStore, IntersectionStore, MeshGeometry, RegionCache
+from viewplanning.sampling.sampleHelpers import IdProvider, SamplingFailedException, containsPoints3d
+from viewplanning.sampling.slicing import sliceMany
+from scipy.spatial import cKDTree
+from shapely.errors import GEOSException
 import numpy as np
 import networkx as nx
 from networkx.algorithms import enumerate_all_cliques
@@ -15,6 +17,10 @@ import pymeshfix as mf
 
 
 APPROX_ZERO = 1e-3
+# number of heights the overlap of two visibility volumes is estimated at
+OVERLAP_LEVELS = 8
+# estimates this much shorter than the dwell distance are checked with an exact intersection
+OVERLAP_MARGIN = .1
 
 
 @dataclass
@@ -26,83 +32,57 @@ class Volume:
     value: float = 0
 
 
-def checkMultiRegion(samples: 'list[VertexMulti]', meshes: 'list', contains: 'Callable[[list[float], Any], bool]'):
+def checkMultiRegion(samples: 'list[VertexMulti] | VertexBatch', meshes: 'list', contains: 'Callable[[np.ndarray, list], np.ndarray]' = containsPoints3d) -> VertexBatch:
     '''
     checks if samples are in multiple visibility volumes and adds the samples to the other visibility volumes by duplicating the sample.
-    mutates the samples list
 
     Parameters
     ----------
-    samples: list[VertexMulti]
-        a list of samples to check
+    samples: list[VertexMulti] | VertexBatch
+        samples to check
     meshes: list
         a list of visibility volumes
-    contains: (list[float], Any) -> bool
-        a function to check if a sample is in a visiblity region
+    contains: (np.ndarray, list) -> np.ndarray
+        a function that takes [n, 3] points and m visiblity regions and returns an [n, m] matrix of which regions contain which points
     
     Returns
     -------
-    list[VertexMulti]
-        an updated list of samples
-    '''
-    ids = IdProvider.getInsance('')
-    j = 0
-    length = len(samples)
-    while j < length:
-        sample = samples[j]
-        sample.id = ids.getId()
-        for i, mesh in enumerate(meshes):
-            if i not in sample.visits and contains(sample.toList()[:3], mesh):
-                sample.visits.add(str(i))
-
-        queue = sample.visits.copy()
-        # remove current group if it exists
-        if sample.group in queue:
-            queue.remove(sample.group)
-
-        # continually make a copy of the node until there's a copy for all meshes
-        while len(queue) > 0:
-            newSample = copy.deepcopy(sample)
-            newSample.group = queue.pop()
-            samples.append(newSample)
-        j += 1
-    return samples
-
-
-def makeDuplicateNodes(samples: 'list[VertexMulti]'):
-    '''
-    Duplicates nodes in multiple visiblity volumes so each volume has its own samples.
-    Mutates the list of samples.
+    VertexBatch
+        the samples followed by their copies
+    '''
+    samples = VertexBatch.fromVertices(samples)
+    if len(samples) == 0:
+        return samples
+    samples.addVisits(contains(samples.points, meshes), [str(i) for i in range(len(meshes))])
+    return makeDuplicateNodes(samples)
 
-    Parameters
-    ----------
-    samples: list[VertexMulti]
-        the list of samples
+
+def makeDuplicateNodes(samples: 'list[VertexMulti] | VertexBatch') -> VertexBatch:
     '''
-    ids = IdProvider.getInsance('')
-    j = 0
-    length = len(samples)
-    while j < length:
-        sample = samples[j]
-        sample.id = ids.getId()
+    Duplicates nodes in multiple visiblity volumes so each volume has its own samples. Every sample gets a new id that
+    its copies share.
 
-        queue = sample.visits.copy()
-        # remove current group if it exists
-        if sample.group in queue:
-            queue.remove(sample.group)
+    Parameters
+    ----------
+    samples: list[VertexMulti] | VertexBatch
+        the samples
 
-        # continually make a copy of the node until there's a copy for all meshes
-        while len(queue) > 0:
-            newSample = copy.deepcopy(sample)
-            newSample.group = queue.pop()
-            samples.append(newSample)
-        j += 1
-    return samples
+    Returns
+    -------
+    VertexBatch
+        the samples followed by their copies
+    '''
+    samples = VertexBatch.fromVertices(samples)
+    samples.id[:] = IdProvider.getInsance('').getIds(len(samples))
+    return samples.duplicateVisits()
 
 
-def makeGraph(regions: 'list[Region]', radius: float, dwell: float, multDwell=True):
+def makeGraph(regions: 'list[Region]', radius: float, dwell: float, multDwell=True, meshes: 'list[pv.PolyData]' = None):
     '''
-    Makes a graph to check for intersections between visibility volumes.
+    Makes a graph to check for intersections between visibility volumes. Candidate pairs come from candidatePairs and
+    an edge is added when the overlap estimated by overlapExtents is longer than the dwell distance. The estimate is
+    never longer than the exact overlap, so pairs whose estimate is within OVERLAP_MARGIN below the dwell distance are
+    intersected exactly with the intersection store.
 
     Parameters
     ----------
@@ -114,22 +94,149 @@ def makeGraph(regions: 'list[Region]', radius: float, dwell: float, multDwell=Tr
         how long in (length) to stay in the visiblity volumes
     multDwell:
         multiply dwell distance based on the number of visible targets
+    meshes: list[pv.PolyData] = None
+        meshes of the regions, loaded from the mesh store when they are needed if not given
     '''
+    dwell = (dwell * 2) if multDwell else dwell
     graph = nx.Graph()
-    queue = regions.copy()
     graph.add_nodes_from(range(len(regions)))
-    i = 0
-    while len(queue) > 0:
-        current = queue.pop(0)
-        j = i + 1
-        for other in queue:
-            if isEdge(current, other, radius, (dwell * 2) if multDwell else dwell):
-                graph.add_edge(i, j)
-            j += 1
-        i += 1
+    meshes = _MeshList(regions, meshes)
+    pairs = candidatePairs(regions, radius, dwell, meshes)
+    extents = overlapExtents(pairs, meshes)
+    edges = extents > dwell
+    near = np.flatnonzero(~edges & (extents > dwell * (1 - OVERLAP_MARGIN)))
+    if len(near) > 0:
+        store = IntersectionStore.getInstance()
+        intersections = store.intersectPairs(
+            [(meshes[i], meshes[j]) for i, j in pairs[near]],
+            [store.groupKey([i, j], regions) for i, j in pairs[near]]
+        )
+        edges[near] = [xyExtent(intersection) > dwell for intersection in intersections]
+    graph.add_edges_from(pairs[edges].tolist())
     return graph
 
 
+def candidatePairs(regions: 'list[Region]', radius: float, dwell: float, meshes: 'list[pv.PolyData]' = None) -> np.ndarray:
+    '''
+    pairs of visibility volumes that may overlap by more than the dwell distance. Pairs of centres within twice the
+    radius are found with a kd tree and pairs are dropped when the lens between their spheres is shorter than the dwell
+    distance or their bounding boxes don't overlap. The pairs are independent so they can be intersected in any order
+    or in parallel.
+
+    Parameters
+    ----------
+    regions: list[Region]
+        a list of visibility volumes
+    radius: float
+        max sensing distance for the camera
+    dwell: float
+        distance to remain in the visibility volumes
+    meshes: list[pv.PolyData] = None
+        meshes of the regions, loaded from the mesh store when they are needed if not given
+
+    Returns
+    -------
+    np.ndarray
+        [k, 2] indices i < j of the regions in lexicographic order
+    '''
+    if len(regions) < 2:
+        return np.zeros([0, 2], dtype=int)
+    centers = np.array([region.points[0] for region in regions], dtype=float)
+    pairs = cKDTree(centers).query_pairs(radius * 2, output_type='ndarray').astype(int).reshape(-1, 2)
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    # the lens between two spheres is 2 * sqrt(radius^2 - l^2) wide and 2 * (radius - l) long
+    l = np.linalg.norm(centers[pairs[:, 0]] - centers[pairs[:, 1]], axis=1) / 2
+    r = np.sqrt(np.maximum(radius ** 2 - l ** 2, 0))
+    pairs = pairs[(r * 2 >= dwell) | ((radius - l) * 2 >= dwell)]
+    if len(pairs) == 0:
+        return pairs
+    meshes = _MeshList(regions, meshes)
+    used = np.unique(pairs)
+    bounds = np.zeros([len(regions), 6])
+    bounds[used] = [MeshGeometry.of(meshes[i]).aabb for i in used]
+    a = bounds[pairs[:, 0]]
+    b = bounds[pairs[:, 1]]
+    overlap = np.all((b[:, 0::2] <= a[:, 1::2]) & (b[:, 1::2] >= a[:, 0::2]), axis=1)
+    return pairs[overlap]
+
+
+def overlapExtents(pairs: np.ndarray, meshes: 'list[pv.PolyData]') -> np.ndarray:
+    '''
+    estimate the length of the overlap of pairs of visibility volumes in the xy plane. Both volumes are sliced at
+    OVERLAP_LEVELS heights in their common height range and the overlapping polygons at every height are combined.
+    This is much cheaper than a boolean intersection and is usually a few percent shorter than the exact overlap, it
+    is never longer.
+    Extents written by create precompute are used when the region cache has them.
+
+    Parameters
+    ----------
+    pairs: np.ndarray
+        [k, 2] indices of the meshes
+    meshes: list[pv.PolyData]
+        visibility volumes
+
+    Returns
+    -------
+    np.ndarray
+        [k] diagonal of the xy bounds of the overlap, 0 for pairs that don't overlap
+    '''
+    extents = np.zeros(len(pairs))
+    cache = RegionCache.getInstance()
+    for k, (i, j) in enumerate(pairs):
+        if cache is not None:
+            extent = cache.extent(MeshGeometry.of(meshes[i]).digest, MeshGeometry.of(meshes[j]).digest, OVERLAP_LEVELS)
+            if extent is not None:
+                extents[k] = extent
+                continue
+        a = MeshGeometry.of(meshes[i]).aabb
+        b = MeshGeometry.of(meshes[j]).aabb
+        z0, z1 = max(a[4], b[4]), min(a[5], b[5])
+        if z0 > z1:
+            continue
+        # volumes overlap most near the top or bottom of their common range, chebyshev nodes are dense at the ends
+        zLevels = z0 + (z1 - z0) * (1 - np.cos(np.pi * (np.arange(OVERLAP_LEVELS) + .5) / OVERLAP_LEVELS)) / 2
+        aPolygons, _, _ = sliceMany(meshes[i], zLevels)
+        bPolygons, _, _ = sliceMany(meshes[j], zLevels)
+        x0, y0, x1, y1 = np.inf, np.inf, -np.inf, -np.inf
+        for aPolygon, bPolygon in zip(aPolygons, bPolygons):
+            if aPolygon is None or bPolygon is None:
+                continue
+            try:
+                overlap = aPolygon.intersection(bPolygon)
+                if overlap.is_empty:
+                    continue
+                bounds = overlap.bounds
+            except GEOSException:
+                # invalid slices fall back to the overlap of their bounds
+                ax0, ay0, ax1, ay1 = aPolygon.bounds
+                bx0, by0, bx1, by1 = bPolygon.bounds
+                bounds = (max(ax0, bx0), max(ay0, by0), min(ax1, bx1), min(ay1, by1))
+                if bounds[0] > bounds[2] or bounds[1] > bounds[3]:
+                    continue
+            x0, y0 = min(x0, bounds[0]), min(y0, bounds[1])
+            x1, y1 = max(x1, bounds[2]), max(y1, bounds[3])
+        if x0 <= x1:
+            extents[k] = np.sqrt((x1 - x0) ** 2 + (y1 - y0) ** 2)
+    return extents
+
+
+class _MeshList:
+    '''
+    meshes of regions by index, loaded from the mesh store the first time they are used
+    '''
+    def __init__(self, regions: 'list[Region]', meshes: 'list[pv.PolyData]' = None):
+        if isinstance(meshes, _MeshList):
+            meshes = meshes.meshes
+        self.regions = regions
+        self.meshes = list(meshes) if meshes is not None else [None] * len(regions)
+
+    def __getitem__(self, i: int) -> pv.PolyData:
+        if self.meshes[i] is None:
+            region = self.regions[i]
+            self.meshes[i] = MeshStore.getInstance().getMesh(region.file, region.rotationMatrix)
+        return self.meshes[i]
+
+
 def isEdge(a: Region, b: Region, radius: float, dwell: float):
     '''
     is there an intersection between visiblity volumes
@@ -164,16 +271,30 @@ def isEdge(a: Region, b: Region, radius: float, dwell: float):
         return False
     interStore = IntersectionStore.getInstance()
     intersection = interStore.intersect(aMesh, bMesh, os.path.basename(a.file), os.path.basename(b.file))
-    if intersection is None:
-        return False
+    return xyExtent(intersection) > dwell
+
+
+def xyExtent(intersection: pv.PolyData) -> float:
+    '''
+    length of an intersection of visibility volumes in the xy plane
+
+    Parameters
+    ----------
+    intersection: pv.PolyData
+        intersection of visibility volumes, None when they don't intersect
+
+    Returns
+    -------
+    float
+        diagonal of the xy bounds of the intersection, 0 when it is empty
+    '''
+    if intersection is None or intersection.n_points <= 0:
+        return 0.0
     x_min, x_max, y_min, y_max, _, _ = intersection.bounds
-    if intersection.n_points <= 0:
-        return False
-    k = np.sqrt((x_max - x_min) ** 2 + (y_max - y_min) ** 2)
-    return k > dwell
+    return float(np.sqrt((x_max - x_min) ** 2 + (y_max - y_min) ** 2))
 
 
-def findCliques(regions: 'list[Region]', radius: float, clique_limit: int = 3, dwell: float = 0, multDwell: bool = True):
+def findCliques(regions: 'list[Region]', radius: float, clique_limit: int = 3, dwell: float = 0, multDwell: bool = True, meshes: 'list[pv.PolyData]' = None):
     '''
     return a list of possible visibility volume intersections
 
@@ -189,13 +310,15 @@ def findCliques(regions: 'list[Region]', radius: float, clique_limit: int = 3, d
         dwell distance to remain in a visiblity volume
     multDwell: bool = True
         multipy the dwell distance by the number of visible targets
+    meshes: list[pv.PolyData] = None
+        meshes of the regions, loaded from the mesh store when they are needed if not given
     
     Returns
     -------
     list[list[int]]
         a set of set of possible visibility volume intersections
     '''
-    graph = makeGraph(regions, radius, dwell, multDwell)
+    graph = makeGraph(regions, radius, dwell, multDwell, meshes)
     cliques = []
     for clique in enumerate_all_cliques(graph):
         if len(clique) <= clique_limit:
@@ -219,8 +342,27 @@ class MultiSampleStrategy:
         '''
         self.headingStrategy = headingStrategy
         self.numSamples = numSamples
+        # global numpy random state until a generator is set
+        self.rng = np.random
+
+    def setRng(self, rng: np.random.Generator) -> 'MultiSampleStrategy':
+        '''
+        Draw every random number of the method from a generator
+
+        Parameters
+        ----------
+        rng: np.random.Generator
+            random number generator
+
+        Returns
+        -------
+        MultiSampleStrategy
+            self
+        '''
+        self.rng = rng
+        return self
 
-    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> 'list[VertexMulti]':
+    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> 'VertexBatch | list[VertexMulti]':
         '''
         sample volumes and return a set of samples for the visbility volumes
 
@@ -1,12 +1,11 @@
 from .helpers import MultiSampleStrategy, Volume
-from viewplanning.sampling import polygonFromBody, getPointsOnEdge, SamplingFailedException
-from viewplanning.models import Region, VertexMulti, Vertex3DMulti
+from viewplanning.sampling import polygonFromBody, samplePerimeter, SamplingFailedException
+from viewplanning.models import Region, VertexBatch
 import pyvista as pv
 import numpy as np
 
 OFFSET = .01
 INTERSECTION_CUTOFF = 1e-3
-LIMIT = 200 
 
 
 class IntersectingEdge3DSampling(MultiSampleStrategy):
@@ -32,7 +31,7 @@ class IntersectingEdge3DSampling(MultiSampleStrategy):
         self.numPhi = numPhi
         self.phiRange = phiRange
 
-    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> 'list[VertexMulti]':
+    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> VertexBatch:
         samples = []
         for volume in volumes:
             _, _, _, _, zMin, zMax = volume.volume.bounds
@@ -40,37 +39,11 @@ class IntersectingEdge3DSampling(MultiSampleStrategy):
             polygon = polygonFromBody(z, volume.volume, cutoff=INTERSECTION_CUTOFF)
             if polygon is None:
                 raise SamplingFailedException(f'failed to sample {volume.parents}')
-            s = self._sampleSlice(volume.samples, polygon, z, volume.parents[0], volume.parents)
-            samples += s
-        return samples
+            samples.append(self._sampleSlice(volume.samples, polygon, z, volume.parents[0], volume.parents))
+        return VertexBatch.concatenate(samples)
 
     def _sampleSlice(self, numPoints, polygon, z, group, visits):
-        samples = []
-        pointsIndex = 0
-        remainingSamples = numPoints * self.headingStrategy.numHeadings * self.numPhi
-        lr = remainingSamples
-        i = 0
-        while remainingSamples > 0 and i < LIMIT:
-            points = getPointsOnEdge(pointsIndex, int(np.ceil(remainingSamples / (self.headingStrategy.numHeadings * self.numPhi))), polygon)
-            pointsIndex += numPoints
-            for point in points:
-                phiMag = self.phiRange[1] - self.phiRange[0]
-                for theta in self.headingStrategy.getHeadings(np.array([point[0], point[1], z]), polygon=polygon):
-                    for n in range(self.numPhi):
-                        if remainingSamples <= 0:
-                            return samples
-                        phi = self.phiRange[0] + phiMag * n / (self.numPhi)
-                        samples.append(Vertex3DMulti(
-                            group=group,
-                            visits=set(map(str, visits)),
-                            x=point[0],
-                            y=point[1],
-                            z=z,
-                            theta=theta,
-                            phi=phi
-                        ))
-                        remainingSamples -= 1
-            if lr == remainingSamples:
-                i += 1
-            lr = remainingSamples
-        return samples
+        phiMag = self.phiRange[1] - self.phiRange[0]
+        phis = self.phiRange[0] + phiMag * np.arange(self.numPhi) / (self.numPhi)
+        return samplePerimeter(numPoints, polygon, z, self.headingStrategy, phis, group, visits)
+
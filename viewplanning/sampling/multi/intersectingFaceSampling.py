@@ -1,6 +1,7 @@
 from .helpers import MultiSampleStrategy, Volume
-from viewplanning.models import Region, VertexMulti, Vertex3DMulti
+from viewplanning.models import Region, VertexBatch
 from viewplanning.sampling.sampleHelpers import SamplingFailedException
+from viewplanning.store import MeshGeometry
 import pyvista as pv
 import numpy as np
 
@@ -28,43 +29,18 @@ class IntersectingFaceSampling(MultiSampleStrategy):
         self.numPhi = numPhi
         self.phiRange = phiRange
 
-    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> 'list[VertexMulti]':
+    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> VertexBatch:
         samples = []
         for volume in volumes:
             if volume.samples <= 0:
                 continue
-
-            areas = np.array([.5 * np.linalg.norm(np.cross(
-                volume.volume.points[volume.volume.faces.reshape(
-                    -1, 4)[i, 1], :] - volume.volume.points[volume.volume.faces.reshape(-1, 4)[i, 2], :],
-                volume.volume.points[volume.volume.faces.reshape(
-                    -1, 4)[i, 1], :] - volume.volume.points[volume.volume.faces.reshape(-1, 4)[i, 3], :]
-            )) for i in range(volume.volume.n_faces)])
-            # get random faces
-            indexes = np.random.choice(range(areas.shape[0]), size=[
-                                       volume.samples], p=areas / np.sum(areas))
-            points = volume.volume.points[volume.volume.faces.reshape(
-                [-1, 4])[indexes, 1:]]
-            # transform random point into triangle barycentric coordinate
-            r1 = np.sqrt(np.random.random(size=[volume.samples, 1]))
-            r2 = np.random.random(size=[volume.samples, 1])
-            d = points[:, 0, :] * (1 - r1) + points[:, 1, :] * \
-                r1 * (1 - r2) + points[:, 2, :] * r1 * r2
+            d, _ = MeshGeometry.of(volume.volume).sampleSurface(volume.samples, self.rng)
             if np.isnan(d).any():
                 raise SamplingFailedException(
                     'got a nan value when trying barycentric coordiantes'
                 )
             phiMag = self.phiRange[1] - self.phiRange[0]
-            for point in d:
-                for theta in self.headingStrategy.getHeadings(point, mesh=volume.volume, dwellMultiplier=len(volume.parents)):
-                    for j in range(self.numPhi):
-                        samples.append(Vertex3DMulti(
-                            group=volume.parents[0],
-                            visits=set(map(str, volume.parents)),
-                            x=point[0],
-                            y=point[1],
-                            z=point[2],
-                            theta=theta,
-                            phi=self.phiRange[0] + phiMag * j / (self.numPhi)
-                        ))
-        return samples
+            phis = self.phiRange[0] + phiMag * np.arange(self.numPhi) / self.numPhi
+            headings = [self.headingStrategy.getHeadings(point, mesh=volume.volume, dwellMultiplier=len(volume.parents)) for point in d]
+            samples.append(VertexBatch.fromSamples(d, headings, phis, volume.parents[0], volume.parents))
+        return VertexBatch.concatenate(samples)
@@ -1,15 +1,16 @@
 from .helpers import MultiSampleStrategy, Volume
 from typing import Generator
 import numpy as np
-from viewplanning.models import Region, Vertex3DMulti
-from viewplanning.sampling.sampleHelpers import SamplingFailedException, polygonFromBody, getPointsOnEdge
+from viewplanning.models import Region, VertexBatch
+from viewplanning.sampling.sampleHelpers import SamplingFailedException, polygonFromBody, samplePerimeter
+from viewplanning.sampling.slicing import sliceMany
+from viewplanning.store import MeshGeometry
 from shapely.geometry import Polygon
 import pyvista as pv
 
 
 OFFSET_INTO_BODY = .005
 POLYGON_CUTOFF = .1
-LIMIT = 200
 
 
 class IntersectingGlobalWeightedFaceSampling(MultiSampleStrategy):
@@ -38,8 +39,8 @@ class IntersectingGlobalWeightedFaceSampling(MultiSampleStrategy):
         self.phiRange = phiRange
         self.numLevels = numLevels
 
-    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> 'list[Vertex3DMulti]':
-        samples: 'list[Vertex3DMulti]' = []
+    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> VertexBatch:
+        samples: 'list[VertexBatch]' = []
         globalZMin = min([volume.volume.bounds[4] for volume in volumes])
         globalZMax = max([volume.volume.bounds[5] for volume in volumes])
         r = globalZMax - globalZMin
@@ -47,47 +48,40 @@ class IntersectingGlobalWeightedFaceSampling(MultiSampleStrategy):
         globalZMax -= r * OFFSET_INTO_BODY
 
         bodyInfo = []
-        zLengths = [0] * self.numLevels
-        # slice all bodies along global z slices
+        zLengths = np.zeros(self.numLevels)
+        zSlices = np.linspace(globalZMin, globalZMax, self.numLevels)
+        # slice all bodies along global z slices and just inside their top and bottom
         for volume in volumes:
-            item = {
+            _, _, _, _, bodyMin, bodyMax = volume.volume.bounds
+            r = bodyMax - bodyMin
+            polygons, lengths, _ = sliceMany(
+                volume.volume,
+                np.append(zSlices, [bodyMin + r * OFFSET_INTO_BODY, bodyMax - r * OFFSET_INTO_BODY]),
+                cutoff=POLYGON_CUTOFF
+            )
+            bodyInfo.append({
                 'body': volume,
-                'slices': []
-            }
-            i = 0
-            for z in np.linspace(globalZMin, globalZMax, self.numLevels):
-                polygon = polygonFromBody(z, volume.volume, cutoff=POLYGON_CUTOFF)
-                if polygon is None:
-                    i += 1
-                    item['slices'].append({'z': z, 'polygon': None})
-                    continue
-                item['slices'].append({'z': z, 'polygon': polygon})
-                # total lengths along global z slices
-                zLengths[i] += polygon.exterior.length
-                i += 1
-            bodyInfo.append(item)
+                'slices': [{'z': z, 'polygon': polygon} for z, polygon in zip(zSlices, polygons)],
+                'bottom': polygons[-2],
+                'top': polygons[-1]
+            })
+            # total lengths along global z slices
+            zLengths += lengths[:-2]
         for bi in bodyInfo:
-            s = []
             for numPoints, polygon, z in self._iterateNumSamplesPerBody(bi, zLengths):
                 if numPoints <= 0 or polygon is None:
                     continue
-                samp = self._sampleSlice(
+                samples.append(self._sampleSlice(
                     numPoints,
                     polygon,
                     z,
                     bi['body'].parents[0],
                     bi['body'].parents
-                )
-                s += samp
-            samples += s
-        return samples
+                ))
+        return VertexBatch.concatenate(samples)
 
     def _surfaceArea(self, body: pv.PolyData):
-        areas = np.array([.5 * np.linalg.norm(np.cross(
-            body.points[body.faces.reshape(-1, 4)[i, 1], :] - body.points[body.faces.reshape(-1, 4)[i, 2], :],
-            body.points[body.faces.reshape(-1, 4)[i, 1], :] - body.points[body.faces.reshape(-1, 4)[i, 3], :]
-        )) for i in range(body.n_faces)])
-        return np.sum(areas)
+        return MeshGeometry.of(body).area
         totalArea = sum(zLengths)
         while i < len(bodyInfo['slices']) - 1 \
                 and (bodyInfo['slices'][i] is None or bodyInfo['slices'][i]['z'] < bodyMin):
@@ -131,7 +125,7 @@ class IntersectingGlobalWeightedFaceSampling(MultiSampleStrategy):
         while bodyMin > bodyInfo['slices'][i]['z']:
             i += 1
         if i > 0:
-            inBodySlices.append({'z': bodyMin, 'polygon': polygonFromBody(bodyMin, bodyInfo['body'].volume, cutoff=POLYGON_CUTOFF)})
+            inBodySlices.append({'z': bodyMin, 'polygon': bodyInfo['bottom']})
             length = (zLengths[i] - zLengths[i - 1]) / (bodyInfo['slices'][i]['z'] - bodyInfo['slices']
                                                         [i - 1]['z']) * (bodyMin - bodyInfo['slices'][i - 1]['z']) + zLengths[i - 1]
             newZ.append(length)
@@ -145,7 +139,7 @@ class IntersectingGlobalWeightedFaceSampling(MultiSampleStrategy):
             length = (zLengths[j] - zLengths[j - 1]) / (bodyInfo['slices'][j]['z'] - bodyInfo['slices']
                                                         [j - 1]['z']) * (bodyMax - bodyInfo['slices'][j - 1]['z']) + zLengths[j - 1]
             newZ.append(length)
-            inBodySlices.append({'z': bodyMax, 'polygon': polygonFromBody(bodyMax, bodyInfo['body'].volume)})
+            inBodySlices.append({'z': bodyMax, 'polygon': bodyInfo['top']})
 
         totalZ = sum(newZ)
         allocations = newZ / totalZ * bodyInfo['body'].samples
@@ -159,32 +153,7 @@ class IntersectingGlobalWeightedFaceSampling(MultiSampleStrategy):
             yield allocationsInt[i], inBodySlices[i]['polygon'], inBodySlices[i]['z']
 
     def _sampleSlice(self, numPoints, polygon, z, group, visits):
-        samples = []
-        pointsIndex = 0
-        remainingSamples = numPoints * self.headingStrategy.numHeadings * self.numPhi
-        lr = remainingSamples
-        i = 0
-        while remainingSamples > 0 and i < LIMIT:
-            points = getPointsOnEdge(pointsIndex + i, int(np.ceil(remainingSamples / (self.headingStrategy.numHeadings * self.numPhi))), polygon)
-            pointsIndex += numPoints
-            for point in points:
-                phiMag = self.phiRange[1] - self.phiRange[0]
-                for theta in self.headingStrategy.getHeadings(np.array([point[0], point[1], z]), polygon=polygon):
-                    for n in range(self.numPhi):
-                        if remainingSamples <= 0:
-                            return samples
-                        phi = self.phiRange[0] + phiMag * n / (self.numPhi)
-                        samples.append(Vertex3DMulti(
-                            group=group,
-                            visits=set(map(str, visits)),
-                            x=point[0],
-                            y=point[1],
-                            z=z,
-                            theta=theta,
-                            phi=phi
-                        ))
-                        remainingSamples -= 1
-            if remainingSamples == lr:
-                i += 1
-            lr = remainingSamples
-        return samples
+        phiMag = self.phiRange[1] - self.phiRange[0]
+        phis = self.phiRange[0] + phiMag * np.arange(self.numPhi) / (self.numPhi)
+        return samplePerimeter(numPoints, polygon, z, self.headingStrategy, phis, group, visits)
+
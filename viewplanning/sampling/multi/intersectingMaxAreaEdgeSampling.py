@@ -1,6 +1,7 @@
 from .helpers import MultiSampleStrategy, Volume
-from viewplanning.sampling.sampleHelpers import polygonFromBody, SamplingFailedException, getPointsOnEdge
-from viewplanning.models import Region, VertexMulti, Vertex2DMulti
+from viewplanning.sampling.sampleHelpers import SamplingFailedException, samplePerimeter
+from viewplanning.sampling.slicing import sliceMany
+from viewplanning.models import Region, VertexBatch, VertexType
 from viewplanning.sampling.heading import HeadingStrategy
 import pyvista as pv
 import numpy as np
@@ -26,8 +27,8 @@ class IntersectingMaxAreaEdgeSampling(MultiSampleStrategy):
         '''
         super().__init__(numSamples, headingStrategy)
 
-    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> 'list[VertexMulti]':
-        samples: 'list[Vertex2DMulti]' = []
+    def sampleMeshes(self, volumes: 'list[Volume]', meshes: 'list[pv.PolyData]', regions: 'list[Region]') -> VertexBatch:
+        samples = []
         globalZMin = min([volume.volume.bounds[4] for volume in volumes])
         globalZMax = max([volume.volume.bounds[5] for volume in volumes])
 
@@ -36,12 +37,8 @@ class IntersectingMaxAreaEdgeSampling(MultiSampleStrategy):
         # slice all along global z slices
         polygons = []
         for j, volume in enumerate(volumes):
-            for i, z in enumerate(zSlices):
-                polygon = polygonFromBody(z, volume.volume)
-                polygons.append(polygon)
-                if polygon is None:
-                    continue
-                areas[j, i] = polygon.area
+            volumePolygons, _, areas[j] = sliceMany(volume.volume, zSlices)
+            polygons.append(volumePolygons)
         s = np.sum(areas, axis=0)
         i = np.array([list(range(SLICES))] * len(volumes))
         i[areas <= 0] = SLICES
@@ -49,35 +46,15 @@ class IntersectingMaxAreaEdgeSampling(MultiSampleStrategy):
         idx = max(np.argmax(s[idx:]), idx)
         zhat = zSlices[idx]
 
-        for volume in volumes:
-            polygon = polygonFromBody(zhat, volume.volume)
+        for j, volume in enumerate(volumes):
+            polygon = polygons[j][idx]
             if polygon is None:
                 raise SamplingFailedException(
                     f'Couldn\'t slice mesh into polygon at z level {zhat}')
-            s = self._sampleSlice(self.numSamples, polygon,
-                                  volume.parents[0], volume.parents)
-            samples += s
+            samples.append(self._sampleSlice(self.numSamples, polygon, zhat, volume.parents[0], volume.parents))
 
-        return samples
+        return VertexBatch.concatenate(samples)
+
+    def _sampleSlice(self, numPoints, polygon, z, group, visits):
+        return samplePerimeter(numPoints, polygon, z, self.headingStrategy, [0], group, visits, VertexType.TWO_D_MULTI)
 
-    def _sampleSlice(self, numPoints, polygon, group, visits):
-        samples = []
-        pointsIndex = 0
-        remainingSamples = numPoints * self.headingStrategy.numHeadings
-        while remainingSamples > 0:
-            points = getPointsOnEdge(pointsIndex, int(
-                np.ceil(remainingSamples / (self.headingStrategy.numHeadings))), polygon)
-            pointsIndex += numPoints
-            for point in points:
-                for theta in self.headingStrategy.getHeadings(np.array([point[0], point[1], z]), polygon=polygon):
-                    if remainingSamples <= 0:
-                        return samples
-                    samples.append(Vertex2DMulti(
-                        group=group,
-                        visits=set(map(str, visits)),
-                        x=point[0],
-                        y=point[1],
-                        theta=theta
-                    ))
-                    remainingSamples -= 1
-        return samples
@@ -1,7 +1,8 @@
 from viewplanning.sampling.sampleStrategy import SampleStrategy
-from viewplanning.sampling.sampleHelpers import iterateRegions, containsPoint3d
+from viewplanning.sampling.sampleHelpers import iterateRegions
 from .helpers import checkMultiRegion, Volume, MultiSampleStrategy
-from viewplanning.models import VertexMulti, Region
+from viewplanning.store import MeshGeometry
+from viewplanning.models import VertexBatch, Region
 from typing import Iterator
 import pyvista as pv
 
@@ -21,9 +22,14 @@ class SimpleIntersectingVolumeSampling(SampleStrategy):
         method: MultiSampleStrategy
             method to sample the volumes with
         '''
+        super().__init__(method.headingStrategy)
         self.method = method
 
-    def getSamples(self, regions: 'Iterator[Region]') -> 'list[VertexMulti]':
+    def setRng(self, rng):
+        self.method.setRng(rng)
+        return super().setRng(rng)
+
+    def getSamples(self, regions: 'Iterator[Region]') -> VertexBatch:
 
         regions: list[Region] = list(regions)
         meshes: list[pv.PolyData] = list(iterateRegions(regions))
@@ -32,8 +38,8 @@ class SimpleIntersectingVolumeSampling(SampleStrategy):
         volumes: list[Volume] = []
         for i, mesh in enumerate(meshes):
             volumes.append(
-                Volume([i], mesh, self.method.numSamples, mesh.volume))
+                Volume([i], mesh, self.method.numSamples, MeshGeometry.of(mesh).volume))
 
         # get samples from sample method
         samples = self.method.sampleMeshes(volumes, meshes, regions)
-        return checkMultiRegion(samples, meshes, containsPoint3d)
+        return checkMultiRegion(samples, meshes)
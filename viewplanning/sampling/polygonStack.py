@@ -0,0 +1,244 @@
+import numpy as np
+import pyvista as pv
+import weakref
+from dataclasses import dataclass
+from shapely.geometry import Polygon, MultiPolygon
+from shapely.geometry.polygon import orient
+from shapely.geometry.base import BaseGeometry
+from shapely.errors import GEOSException
+from vtkmodules.vtkFiltersGeneral import vtkContourTriangulator
+from viewplanning.sampling.slicing import sliceMany
+
+
+# number of slabs an intersection is approximated with
+LEVELS = 16
+# distance where ring vertices are merged before the rings are triangulated
+APPROX_ZERO = 1e-4
+
+
+@dataclass(eq=False)
+class PolygonStack:
+    '''
+    A volume approximated by slabs with a polygon for their cross section. The intersection of two stacks is the
+    intersection of their polygons slab by slab, which is much cheaper and more reliable than a mesh boolean for
+    volumes that are close to extrusions. Meshes made with toMesh are registered so slice based samplers can get the
+    polygons with PolygonStack.of(mesh) instead of slicing the mesh.
+    '''
+    # [n + 1] heights of the bottoms and tops of the slabs
+    edges: np.ndarray
+    # [n] cross sections of the slabs, None for empty slabs
+    polygons: 'list[Polygon | MultiPolygon]'
+
+    def crossSection(self, zLevel: float) -> 'Polygon | MultiPolygon':
+        '''
+        cross section at a height
+
+        Parameters
+        ----------
+        zLevel: float
+            z height
+
+        Returns
+        -------
+        Polygon | MultiPolygon
+            polygons of the slab at the height or None
+        '''
+        k = np.searchsorted(self.edges, zLevel, side='right') - 1
+        if k == len(self.polygons) and zLevel == self.edges[-1]:
+            k -= 1
+        if k < 0 or k >= len(self.polygons):
+            return None
+        return self.polygons[k]
+
+    def polygonAt(self, zLevel: float) -> Polygon:
+        '''
+        largest polygon of the cross section at a height
+
+        Parameters
+        ----------
+        zLevel: float
+            z height
+
+        Returns
+        -------
+        Polygon
+            largest polygon of the slab at the height or None
+        '''
+        section = self.crossSection(zLevel)
+        if section is None:
+            return None
+        return max(_parts(section), key=lambda p: p.area)
+
+    def toMesh(self) -> pv.PolyData:
+        '''
+        triangle mesh of the stack with a closed prism for every part of every slab, holes in the parts go through
+        the prisms. The mesh is registered with the stack.
+
+        Returns
+        -------
+        pv.PolyData
+        '''
+        points = []
+        faces = []
+        offset = 0
+        for k, polygon in enumerate(self.polygons):
+            if polygon is None:
+                continue
+            for part in _parts(polygon):
+                # vtk leaves holes in caps with collinear or repeated vertices
+                part = orient(part.simplify(APPROX_ZERO))
+                rings = [np.asarray(ring.coords)[:-1, :2] for ring in [part.exterior, *part.interiors]]
+                if len(rings[0]) < 3:
+                    continue
+                rings = [rings[0]] + [ring for ring in rings[1:] if len(ring) >= 3]
+                triangles = _triangulate(rings)
+                if len(triangles) == 0:
+                    continue
+                ring = np.concatenate(rings)
+                n = len(ring)
+                points.append(np.concatenate([
+                    np.column_stack([ring, np.full(n, self.edges[k])]),
+                    np.column_stack([ring, np.full(n, self.edges[k + 1])])
+                ]))
+                # bottom faces down and top faces up for counter clockwise triangles
+                faces.append(np.column_stack([np.full(len(triangles), 3), triangles[:, ::-1] + offset]).ravel())
+                faces.append(np.column_stack([np.full(len(triangles), 3), triangles + offset + n]).ravel())
+                start = offset
+                for r in rings:
+                    i = np.arange(len(r)) + start
+                    j = np.roll(i, -1)
+                    # sides face out of the exterior, which is counter clockwise, and into the holes, which are clockwise
+                    faces.append(np.column_stack([np.full(len(r), 4), i, j, j + n, i + n]).ravel())
+                    start += len(r)
+                offset += 2 * n
+        if offset == 0:
+            return None
+        mesh = pv.PolyData(np.concatenate(points), np.concatenate(faces)).triangulate()
+        self.register(mesh)
+        return mesh
+
+    def register(self, mesh: pv.PolyData):
+        '''
+        make the stack the polygons of a mesh, the mesh must not be changed in place after
+
+        Parameters
+        ----------
+        mesh: pv.PolyData
+            mesh of the stack
+        '''
+        key = id(mesh)
+        _stacks[key] = (weakref.ref(mesh, lambda ref, key=key: _forget(key, ref)), self)
+
+    @staticmethod
+    def of(mesh: pv.PolyData) -> 'PolygonStack':
+        '''
+        stack a mesh was made from
+
+        Parameters
+        ----------
+        mesh: pv.PolyData
+            mesh
+
+        Returns
+        -------
+        PolygonStack | None
+            None if the mesh isn't from a stack
+        '''
+        item = _stacks.get(id(mesh))
+        if item is not None and item[0]() is mesh:
+            return item[1]
+        return None
+
+    @staticmethod
+    def intersect(meshes: 'list[pv.PolyData]', levels: int = LEVELS) -> 'PolygonStack':
+        '''
+        intersect volumes slab by slab. The common height range of the volumes is split into slabs, every volume is
+        sliced through the middle of the slabs and the cross sections are intersected with shapely. Volumes that are
+        stacks use their own cross sections.
+
+        Parameters
+        ----------
+        meshes: list[pv.PolyData]
+            volumes to intersect
+        levels: int
+            number of slabs
+
+        Returns
+        -------
+        PolygonStack | None
+            None if the volumes don't overlap
+        '''
+        bounds = np.array([mesh.bounds for mesh in meshes])
+        z0, z1 = bounds[:, 4].max(), bounds[:, 5].min()
+        if z0 >= z1 or np.any(bounds[:, 0::2].max(axis=0)[:2] >= bounds[:, 1::2].min(axis=0)[:2]):
+            return None
+        edges = np.linspace(z0, z1, levels + 1)
+        middles = (edges[:-1] + edges[1:]) / 2
+        polygons = None
+        for mesh in meshes:
+            stack = PolygonStack.of(mesh)
+            sections = [stack.crossSection(z) for z in middles] if stack is not None else sliceMany(mesh, middles)[0]
+            if polygons is None:
+                polygons = sections
+                continue
+            for k, section in enumerate(sections):
+                if polygons[k] is None or section is None:
+                    polygons[k] = None
+                    continue
+                try:
+                    overlap = polygons[k].intersection(section)
+                except GEOSException:
+                    # self intersecting slices are repaired and tried again
+                    overlap = polygons[k].buffer(0).intersection(section.buffer(0))
+                parts = [part for part in _parts(overlap) if part.area > 0]
+                polygons[k] = None if not parts else parts[0] if len(parts) == 1 else MultiPolygon(parts)
+        if all(polygon is None for polygon in polygons):
+            return None
+        return PolygonStack(edges, polygons)
+
+
+def _triangulate(rings: 'list[np.ndarray]') -> np.ndarray:
+    '''
+    triangles of a polygon with holes
+
+    Parameters
+    ----------
+    rings: list[np.ndarray]
+        [n, 2] vertices of the exterior and then of every hole
+
+    Returns
+    -------
+    np.ndarray
+        [t, 3] counter clockwise triangles indexing the vertices of the rings in order
+    '''
+    points = np.concatenate(rings)
+    lines = []
+    start = 0
+    for ring in rings:
+        lines += [len(ring) + 1, *range(start, start + len(ring)), start]
+        start += len(ring)
+    triangulator = vtkContourTriangulator()
+    # nested contours are holes, the vertices aren't moved or added to
+    triangulator.SetInputData(pv.PolyData(np.column_stack([points, np.zeros(len(points))]), lines=np.array(lines)))
+    triangulator.Update()
+    triangles = np.array(pv.wrap(triangulator.GetOutput()).faces.reshape(-1, 4)[:, 1:])
+    a, b, c = (points[triangles[:, m]] for m in range(3))
+    clockwise = np.cross(b - a, c - a) < 0
+    triangles[clockwise] = triangles[clockwise][:, ::-1]
+    return triangles
+
+
+def _parts(geometry: BaseGeometry) -> 'list[Polygon]':
+    if isinstance(geometry, Polygon):
+        return [geometry] if not geometry.is_empty else []
+    return [part for g in getattr(geometry, 'geoms', []) for part in _parts(g)]
+
+
+# id of a mesh to a weak reference of the mesh and its stack
+_stacks: 'dict[int, tuple[weakref.ref, PolygonStack]]' = {}
+
+
+def _forget(key: int, ref: weakref.ref):
+    item = _stacks.get(key)
+    if item is not None and item[0] is ref:
+        _stacks.pop(key)
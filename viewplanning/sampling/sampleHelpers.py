@@ -1,15 +1,18 @@
 import numpy as np
-from shapely.geometry.polygon import Polygon, orient
-from viewplanning.models import Region, RegionType
-from viewplanning.store import readObj
+from shapely.geometry.polygon import Polygon
+from viewplanning.models import Region, RegionType, VertexBatch, VertexType
+from viewplanning.store import MeshStore
+from viewplanning.sampling.slicing import sliceMesh
+from viewplanning.sampling.sliceCache import SliceCache
 import pyvista as pv
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from matplotlib.widgets import Slider
 
 APPROX_ZERO = 1e-4
 DUPLICATE_MAG_CUTOFF = 1e-4
 DZ_MAX = .01
+# number of passes without new samples before samplePerimeter gives up
+LIMIT = 200
+# number of point and face pairs tested at once by containsPoints3d
+CONTAINS_CHUNK = 2 ** 20
 
 
 class SamplingFailedException(Exception):
@@ -18,7 +21,8 @@ class SamplingFailedException(Exception):
 
 def iterateRegions(regions: 'list[Region]', type=RegionType.UNKNOWN):
     '''
-    Reads representations regions into memory.
+    Reads representations regions into memory. Meshes come from the process's MeshStore, so the same region gives the
+    same mesh object while it is cached and per mesh caches keep working across calls.
 
     Parameters
     ----------
@@ -37,7 +41,7 @@ def iterateRegions(regions: 'list[Region]', type=RegionType.UNKNOWN):
             if region.type == RegionType.POINT:
                 yield region.points
             elif region.type == RegionType.POLYGON:
-                mesh = readObj(region.file, region.rotationMatrix)
+                mesh = MeshStore.getInstance().getMesh(region.file, region.rotationMatrix)
                 _, _, _, _, minZ, maxZ = mesh.bounds
                 dz = maxZ - minZ
                 z = region.z
@@ -47,38 +51,28 @@ def iterateRegions(regions: 'list[Region]', type=RegionType.UNKNOWN):
                     z += .1
                 yield polygon
             elif region.type == RegionType.WAVEFRONT:
-                obj = readObj(region.file, region.rotationMatrix)
+                obj = MeshStore.getInstance().getMesh(region.file, region.rotationMatrix)
                 if obj.n_cells > 0:
                     yield obj
             elif region.type == RegionType.WAVEFRONT_VRIO:
-                obj = readObj(region.file, region.rotationMatrix)
+                obj = MeshStore.getInstance().getMesh(region.file, region.rotationMatrix)
                 if obj.n_cells > 0:
                     yield obj
         else:
             if type == RegionType.POINT:
                 yield region.points
             elif type == RegionType.POLYGON:
-                yield polygonFromBody(region.z, readObj(region.file, region.rotationMatrix))
+                yield polygonFromBody(region.z, MeshStore.getInstance().getMesh(region.file, region.rotationMatrix))
             elif type == RegionType.WAVEFRONT:
-                obj = readObj(region.file, region.rotationMatrix)
+                obj = MeshStore.getInstance().getMesh(region.file, region.rotationMatrix)
                 if obj.n_cells > 0:
                     yield obj
             elif type == RegionType.WAVEFRONT_VRIO:
-                obj = readObj(region.file, region.rotationMatrix)
+                obj = MeshStore.getInstance().getMesh(region.file, region.rotationMatrix)
                 if obj.n_cells > 0:
                     yield obj
 
 
-class Node:
-    """
-        node class for connecting line segments
-    """
-
-    def __init__(self, start, end):
-        self.start = start
-        self.end = end
-
-
 def polygonFromBody(zLevel: float, mesh: pv.PolyData, cutoff=APPROX_ZERO, debug=False) -> Polygon:
     """
     slices a mesh along a plane parallel to xy plane at height zLevel and returns the largest polygon.
@@ -118,116 +112,7 @@ def polygonsFromMesh(zLevel: float, mesh: pv.PolyData, cutoff: float = APPROX_ZE
     list[Polygons]
         list of polygons resulting from z slice
     """
-    # hist = []
-    # k = 0
-    points = np.array(mesh.points[mesh.faces.reshape(-1, 4)[:, 1:]])
-    vectors = np.roll(points, 1, axis=1) - points
-    with np.errstate(divide='ignore', invalid='ignore'):
-        t = np.einsum('k, ijk->ij', [0, 0, 1], np.subtract(points, np.array(
-            [[0, 0, zLevel]]))) / np.einsum('ijk, k->ij', -vectors, [0, 0, 1])
-    indexLine = np.sum((t > 0) & (t < 1), axis=1) > 1
-    intersections = np.sum(indexLine)
-    indexIntersection = (t[indexLine] > 0) & (t[indexLine] < 1)
-    p = np.reshape(points[indexLine][indexIntersection], [intersections, 2, 3])
-    d = np.reshape(vectors[indexLine][indexIntersection], [
-                   intersections, 2, 3])
-    s = np.reshape(t[indexLine][indexIntersection], [intersections, 2])
-    segments = np.zeros_like(p)
-    for ii in range(p.shape[0]):
-        for jj in range(p.shape[1]):
-            segments[ii, jj, :] = p[ii, jj, :] + s[ii, jj] * d[ii, jj, :]
-    # make polygons out of segments
-    if len(segments) <= 0:
-        return []
-    ring = [Node(segments[0, 1, :].copy(), segments[0, 0, :].copy())]
-    segments[0, :, :] = np.inf
-    rings = []
-    misses = 0
-    while not np.isinf(segments).all():
-        vec = np.linalg.norm(segments - ring[-1].end, axis=2)
-        i = np.argmin(vec, axis=0)
-        # check for duplicate segment
-        a = vec[i, [0, 1]] < cutoff
-        if i[0] == i[1] and a.all():
-            segments[i] = np.inf
-            continue
-
-        # if the end matches
-        if a.any():
-            misses = 0
-            if a[0]:
-                segment = segments[i[0], :, :].copy()
-                ring.append(Node(segment[0, :], segment[1, :]))
-                segments[i[0], :, :] = np.inf
-            else:
-                segment = segments[i[1], :, :].copy()
-                ring.append(Node(segment[1, :], segment[0, :]))
-                segments[i[1], :, :] = np.inf
-
-            # check to see if loop closed
-            if np.linalg.norm(ring[0].start - ring[-1].end) < cutoff:
-                rings.append(ring)
-                if not np.isinf(segments).all():
-                    i, _, _ = np.where(~np.isinf(segments))
-                    ring = [Node(segments[i[0], 1, :].copy(),
-                                 segments[i[0], 0, :].copy())]
-                    segments[i[0], :, :] = np.inf
-        else:
-            misses += 1
-
-        if misses > 0 and not np.isinf(segments).all():
-            # bad ring
-            if len(ring) > 1:
-                # try again without last segment
-                ring.pop()
-            else:
-                i, _, _ = np.where(~np.isinf(segments))
-                ring = [Node(segments[i[0], 1, :].copy(),
-                             segments[i[0], 0, :].copy())]
-                segments[i[0], :, :] = np.inf
-    # plotting debugging
-    #     hist.append((segments.copy(), ring.copy()))
-    #     k += 1
-    # if debug:
-    #     fig = plt.figure()
-    #     ax = fig.add_subplot()
-
-    #     def update(k):
-    #         ax.clear()
-    #         if k > len(hist):
-    #             return
-    #         for segment in hist[k][0]:
-    #             ax.set_title(k)
-    #             ax.plot(segment[:, 0], segment[:, 1])
-    #         path = [hist[k][1][0].start]
-    #         for segment in hist[k][1]:
-    #             path.append(segment.end)
-    #         path = np.array(path)
-    #         ax.plot(path[:, 0], path[:, 1], marker='x', color='m')
-
-    #     fig.subplots_adjust(left=0.25, bottom=0.25)
-    #     sAx = fig.add_axes([0.25, 0.1, 0.65, 0.03])
-    #     slider = Slider(sAx, 'step', 0, len(hist) - 1, 0, valstep=1)
-    #     slider.on_changed(update)
-    #     # ani = FuncAnimation(fig, update, frames=range(len(hist)), blit=False)
-    #     plt.show()
-    polygons = []
-    for ring in rings:
-        ps = []
-        for current in ring:
-            if np.linalg.norm(current.start - current.end) > cutoff:
-                ps.append(current.start)
-        ps.append(current.end)
-        if len(ps) < 3:
-            continue
-        polygon = np.array(orient(Polygon(shell=ps)).exterior.coords)[:-1]
-        theta = (np.arctan2(polygon[:, 1],
-                 polygon[:, 0]) + 2 * np.pi) % (2 * np.pi)
-        index = np.argmin(theta)
-        polygon = np.roll(polygon, -index, axis=0)
-        polygons.append(Polygon(polygon))
-
-    return polygons
+    return sliceMesh(zLevel, mesh, cutoff=cutoff)
 
 
 def containsPoint2d(point, polygon: Polygon):
@@ -267,6 +152,44 @@ def containsPoint2d(point, polygon: Polygon):
     return np.sum(t) % 2 == 1
 
 
+def containsPoints2d(points: np.ndarray, polygon: Polygon) -> np.ndarray:
+    '''
+    containsPoint2d of many points in the same polygon
+
+    Parameters
+    ----------
+    points: np.ndarray
+        [n, 2 or 3] points, only x and y are used
+    polygon: Polygon
+        polygon to test
+
+    Returns
+    -------
+    np.ndarray
+        [n] bool, True where the point is in the polygon
+    '''
+    points = np.asarray(points, dtype=float).reshape(len(points), -1)
+    x0, y0, x1, y1 = polygon.bounds
+    tx = points[:, 0]
+    ty = points[:, 1]
+    inside = ((x0 - tx) * (x1 - tx) <= -APPROX_ZERO) & ((y0 - ty) * (y1 - ty) <= -APPROX_ZERO)
+    candidates = np.flatnonzero(inside)
+    vertices1 = np.array(polygon.exterior.xy).T[:-1, :]
+    vertices = np.roll(vertices1, 1, axis=0)
+    step = max(1, CONTAINS_CHUNK // len(vertices1))
+    for i in range(0, len(candidates), step):
+        c = candidates[i:i + step]
+        cx = tx[c, None]
+        cy = ty[c, None]
+        yFlag = vertices[None, :, 1] >= cy
+        yFlag1 = vertices1[None, :, 1] >= cy
+        a = (vertices1[None, :, 1] - cy) * (vertices[None, :, 0] - vertices1[None, :, 0])
+        b = (vertices1[None, :, 0] - cx) * (vertices[None, :, 1] - vertices1[None, :, 1])
+        crossings = (yFlag != yFlag1) & ((a >= b) == yFlag1)
+        inside[c] = np.sum(crossings, axis=1) % 2 == 1
+    return inside
+
+
 def containsPoint3d(point, body: pv.PolyData):
     '''
     Determines if a 3D volume containts a point by breaking it into a 2D polygon and testing the polygon.
@@ -296,14 +219,103 @@ def containsPoint3d(point, body: pv.PolyData):
     if (z0 - tz) * (z1 - tz) > - APPROX_ZERO:
         return False
 
-    # use 2d method
-    polygon = polygonFromBody(point[2], body)
+    # use 2d method, nearby heights share a slice
+    polygon = SliceCache.getInstance().getPolygon(point[2], body)
     if polygon is None:
         return False
 
     return containsPoint2d(point[:2], polygon)
 
 
+def containsPoints3d(points: np.ndarray, bodies: 'list[pv.PolyData]') -> np.ndarray:
+    '''
+    Determines which 3D volumes contain which points. Points outside the bounding box of a volume are rejected, and the
+    rest count the faces of the volume above them along a vertical ray.
+
+    Parameters
+    ----------
+    points: np.ndarray
+        [n, 3] (x, y, z) points
+    bodies: list[pv.PolyData]
+        m closed triangle meshes
+
+    Returns
+    -------
+    np.ndarray
+        [n, m] where [i, j] is True if volume j contains point i
+    '''
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if len(bodies) == 0:
+        return np.zeros([len(points), 0], dtype=bool)
+    bounds = np.array([body.bounds for body in bodies])
+    lower = bounds[None, :, ::2]
+    upper = bounds[None, :, 1::2]
+    # same bounding box test as containsPoint3d
+    inside = np.all((lower - points[:, None, :]) * (upper - points[:, None, :]) <= -APPROX_ZERO, axis=2)
+    for j, body in enumerate(bodies):
+        candidates = np.flatnonzero(inside[:, j])
+        if len(candidates) > 0:
+            inside[candidates, j] = _rayParity(points[candidates], body)
+    return inside
+
+
+def _rayParity(points: np.ndarray, body: pv.PolyData) -> np.ndarray:
+    '''
+    parity of the number of faces of a mesh crossed by vertical rays going up from points. Vertical faces are skipped.
+    Points on an edge of the projected faces count for the face to the left of the edge directed in increasing (x, y)
+    order, so shared edges and vertices are counted once.
+
+    Parameters
+    ----------
+    points: np.ndarray
+        [n, 3] points
+    body: pv.PolyData
+        closed triangle mesh
+
+    Returns
+    -------
+    np.ndarray
+        [n] True if the number of crossings is odd
+    '''
+    triangles = np.asarray(body.points, dtype=float)[body.faces.reshape(-1, 4)[:, 1:]]
+    xy = triangles[:, :, :2]
+    u = xy[:, 1] - xy[:, 0]
+    v = xy[:, 2] - xy[:, 0]
+    area = u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+    triangles = triangles[area != 0]
+    area = area[area != 0]
+    # edge k goes from vertex k to vertex k + 1 and is opposite of vertex k + 2
+    start = triangles[:, :, :2]
+    end = np.roll(start, -1, axis=1)
+    # compute each edge in a canonical direction so both faces sharing it get the exact same values
+    flip = (end[:, :, 0] < start[:, :, 0]) | ((end[:, :, 0] == start[:, :, 0]) & (end[:, :, 1] < start[:, :, 1]))
+    a = np.where(flip[:, :, None], end, start)
+    b = np.where(flip[:, :, None], start, end)
+    # positive when the edge is counterclockwise around the face in its canonical direction
+    sign = np.where(flip, -1.0, 1.0) * np.sign(area)[:, None]
+    opposite = np.roll(triangles[:, :, 2], -2, axis=1)
+    lowerXY = np.min(start, axis=1)
+    upperXY = np.max(start, axis=1)
+
+    parity = np.zeros(len(points), dtype=bool)
+    chunk = max(1, CONTAINS_CHUNK // max(len(triangles), 1))
+    for s in range(0, len(points), chunk):
+        p = points[s:s + chunk]
+        # only faces whose projected bounding box holds the point
+        i, t = np.nonzero(np.all((lowerXY[None] <= p[:, None, :2]) & (p[:, None, :2] <= upperXY[None]), axis=2))
+        if len(i) == 0:
+            continue
+        d = b[t] - a[t]
+        w = d[:, :, 0] * (p[i, None, 1] - a[t, :, 1]) - d[:, :, 1] * (p[i, None, 0] - a[t, :, 0])
+        w = w * sign[t]
+        covered = np.all((w > 0) | ((w == 0) & (sign[t] > 0)), axis=1)
+        i, t, w = i[covered], t[covered], w[covered]
+        z = np.sum(w * opposite[t], axis=1) / np.abs(area[t])
+        above = z > p[i, 2]
+        np.logical_xor.at(parity, s + i[above], True)
+    return parity
+
+
 class IdProvider:
     '''
     Provides a unique integer id when called. IdProviders are given a name to reterive the provider from the global namespace.
@@ -327,6 +339,14 @@ class IdProvider:
         self.i += 1
         return j
 
+    def getIds(self, n: int) -> np.ndarray:
+        '''
+        n consecutive unique ids
+        '''
+        ids = np.arange(self.i, self.i + n, dtype=np.int64)
+        self.i += n
+        return ids
+
 
 def getAngle(i):
     '''
@@ -341,19 +361,65 @@ def getAngle(i):
     -------
     float
     '''
-    if i == 0:
-        return 0
-    if i == 1:
-        return 1
-    j = i - 2
-    n = 1
-    while j >= sum([2 ** (s + 1) for s in range(n)]):
-        n += 1
-    k = j - sum([2 ** (s + 1) for s in range(n - 1)])
-    return (2 * k + 1) / (2 ** n)
-
-
-def getPointsOnEdge(startIndex: int, numPoints: int, polygon: Polygon):
+    return float(getAngles(i, 1)[0])
+
+
+def getAngles(startIndex: int, numAngles: int) -> np.ndarray:
+    '''
+    consecutive values of the getAngle sequence. After 0 and 1, index i with 2 ** n <= i < 2 ** (n + 1) is
+    (2 * (i - 2 ** n) + 1) / 2 ** n.
+
+    Parameters
+    ----------
+    startIndex: int
+        index of the first value
+    numAngles: int
+        number of values
+
+    Returns
+    -------
+    np.ndarray
+        [numAngles] values in [0, 2)
+    '''
+    i = np.arange(startIndex, startIndex + numAngles, dtype=np.int64)
+    # frexp is exact for integers, i = m * 2 ** e with .5 <= m < 1 so 2 ** (e - 1) <= i
+    _, e = np.frexp(i.astype(float))
+    level = np.ldexp(1.0, np.maximum(e - 1, 0))
+    angles = (2 * (i - level) + 1) / level
+    angles[i == 0] = 0
+    angles[i == 1] = 1
+    return angles
+
+
+def pointsOnPerimeter(polygon: Polygon, fracs: np.ndarray) -> np.ndarray:
+    '''
+    points at fractions of the arclength around the exterior of a polygon
+
+    Parameters
+    ----------
+    polygon: Polygon
+        the polygon who's perimeter to place points on
+    fracs: np.ndarray
+        [n] fractions of the perimeter in [0, 1)
+
+    Returns
+    -------
+    np.ndarray
+        [n, d] points with the dimension of the polygon's coordinates
+    '''
+    coords = np.array(polygon.exterior.coords)
+    vectors = np.diff(coords, axis=0)
+    lengths = np.linalg.norm(vectors, axis=1)
+    travel = np.concatenate([[0], np.cumsum(lengths)])
+    distance = np.asarray(fracs, dtype=float) * polygon.exterior.length
+    # end of the first segment that reaches the distance
+    j = np.clip(np.searchsorted(travel, distance, side='left'), 1, len(coords) - 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        points = coords[j] - ((travel[j] - distance) / lengths[j - 1])[:, None] * vectors[j - 1]
+    return np.where((distance <= 0)[:, None], coords[0], points)
+
+
+def getPointsOnEdge(startIndex: int, numPoints: int, polygon: Polygon) -> np.ndarray:
     '''
     gets points on the edge of a polygon based on arclength of the polygon and the sequence [getAngle(startIndex), ... getAngle(startIndex + numPoints)]
 
@@ -368,26 +434,57 @@ def getPointsOnEdge(startIndex: int, numPoints: int, polygon: Polygon):
 
     Returns
     -------
-    list[float]
+    np.ndarray
+        [numPoints, d] points ordered by arclength
+    '''
+    return pointsOnPerimeter(polygon, np.sort(getAngles(startIndex, numPoints) / 2))
+
+
+def samplePerimeter(numPoints: int, polygon: Polygon, z: float, headingStrategy, phis: np.ndarray, group, visits: 'list' = None, type: VertexType = None) -> VertexBatch:
+    '''
+    samples on the perimeter of a slice of a volume. Every point gets the headings of the heading strategy and every
+    heading gets each pitch angle. Points that get no headings are replaced by points further along the getAngle
+    sequence until there are numPoints * numHeadings * len(phis) samples or no new samples are found LIMIT times.
+
+    Parameters
+    ----------
+    numPoints: int
+        number of points on the perimeter
+    polygon: Polygon
+        slice of the volume
+    z: float
+        height of the slice
+    headingStrategy: HeadingStrategy
+        how to get headings at each point
+    phis: np.ndarray
+        pitch angles of every heading
+    group:
+        group label of the samples
+    visits: list
+        group labels the samples visit, makes multi vertices
+    type: VertexType
+        type of vertex to make, 3D by default
+
+    Returns
+    -------
+    VertexBatch
     '''
-    fracs = [getAngle(i) / 2 for i in range(startIndex,
-                                            startIndex + numPoints)]
-    fracs.sort()
-    perimeter = polygon.exterior.length
-    segments = np.array(polygon.exterior.coords)
-    j = 0
-    travelDistance = 0
-    a = segments[j + 1] - segments[j]
-    d = np.linalg.norm(a)
-    points = []
-    for frac in fracs:
-        # advance to line where next point is in the middle of
-        while travelDistance < frac * perimeter:
-            a = segments[j + 1] - segments[j]
-            d = np.linalg.norm(a)
-            travelDistance += d
-            j += 1
-        t = travelDistance - frac * perimeter
-        point = segments[j] - t * a / np.linalg.norm(a)
-        points.append(point)
-    return points
+    phis = np.asarray(phis, dtype=float).reshape(-1)
+    perPoint = headingStrategy.numHeadings * len(phis)
+    batches = []
+    pointsIndex = 0
+    remainingSamples = numPoints * perPoint
+    i = 0
+    lr = remainingSamples
+    while remainingSamples > 0 and i < LIMIT:
+        points = getPointsOnEdge(pointsIndex, int(np.ceil(remainingSamples / perPoint)), polygon)
+        pointsIndex += numPoints
+        positions = np.column_stack([points[:, 0], points[:, 1], np.full(len(points), z)])
+        headings = headingStrategy.getHeadingsBatch(positions, polygon=polygon)
+        batch = VertexBatch.fromSamples(positions, headings, phis, group, visits, type)[:remainingSamples]
+        batches.append(batch)
+        remainingSamples -= len(batch)
+        if lr == remainingSamples:
+            i += 1
+        lr = remainingSamples
+    return VertexBatch.concatenate(batches)
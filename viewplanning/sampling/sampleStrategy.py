@@ -1,4 +1,5 @@
 from typing import Generic, TypeVar, Iterator
+import numpy as np
 from viewplanning.models import Vertex
 from viewplanning.sampling.heading import HeadingStrategy
 
@@ -13,6 +14,25 @@ class SampleStrategy(Generic[T]):
 
     def __init__(self, headingStrategy: HeadingStrategy) -> None:
         self.headingStrategy = headingStrategy
+        # global numpy random state until a generator is set
+        self.rng = np.random
+
+    def setRng(self, rng: np.random.Generator) -> 'SampleStrategy[T]':
+        '''
+        Draw every random number of the strategy from a generator
+
+        Parameters
+        ----------
+        rng: np.random.Generator
+            random number generator
+
+        Returns
+        -------
+        SampleStrategy[T]
+            self
+        '''
+        self.rng = rng
+        return self
 
     def getSamples(self, regions: 'Iterator[T]') -> 'list[Vertex]':
         '''
@@ -1,13 +1,23 @@
 from typing import Iterator
 import numpy as np
-import random
+from shapely.geometry import Polygon
 from viewplanning.sampling.sampleStrategy import SampleStrategy
-from viewplanning.sampling.sampleHelpers import containsPoint2d, polygonFromBody, iterateRegions, SamplingFailedException
-from viewplanning.models import Region, Vertex3D
+from viewplanning.sampling.sampleHelpers import containsPoints2d, iterateRegions, SamplingFailedException
+from viewplanning.sampling.slicing import sliceMany
+from viewplanning.models import Region, VertexBatch
 from viewplanning.sampling.heading import HeadingStrategy
 import pyvista as pv
 
 
+# number of z levels the interior is sampled at
+LEVELS = 16
+# fewest candidate points drawn at once in a level
+MIN_BATCH = 64
+# number of candidate batches before a level or body fails
+LIMIT = 200
+APPROX_ZERO = 1e-4
+
+
 class BodySampleStrategy(SampleStrategy[Region]):
     '''
     Body sample strategy samples points on the interior of a 3D volume. 
@@ -31,39 +41,96 @@ class BodySampleStrategy(SampleStrategy[Region]):
         self.numPhi = numPhi
         self.phiRange = phiRange
     
-    def getSamples(self, bodies: Iterator[Region]) -> 'list[Vertex3D]':
+    def getSamples(self, bodies: Iterator[Region]) -> VertexBatch:
         samples = []
         group = 0
+        phiMag = self.phiRange[1] - self.phiRange[0]
+        phis = self.phiRange[0] + phiMag * np.arange(self.numPhi) / self.numPhi
+        perPoint = self.numPhi * self.headingStrategy.numHeadings
         for body in iterateRegions(bodies):
             body: pv.PolyData
-            zMax = body.bounds[4]
-            zMin = body.bounds[5]
-            k = 0
-            while k < self.numSamples * self.numPhi * self.headingStrategy.numHeadings:
-                z = random.random() * (zMax - zMin) + zMin
-                polygon = polygonFromBody(z, body)
-                while not polygon:
-                    z = random.random() * (zMax - zMin) + zMin
-                    polygon = polygonFromBody(z, body)
-                xMin, yMin, xMax, yMax = polygon.bounds
-                x = random.random() * (xMax - xMin) + xMin
-                y = random.random() * (yMax - yMin) + yMin
-                while not containsPoint2d([x, y, z], polygon):
-                    x = random.random() * (xMax - xMin) + xMin
-                    y = random.random() * (yMax - yMin) + yMin
-                phiMag = self.phiRange[1] - self.phiRange[0]
-                for theta in self.headingStrategy.getHeadings(np.array([x, y, z]), [0, 2 * np.pi], polygon=polygon):
-                    for j in range(self.numPhi):
-                        samples.append(Vertex3D(
-                            group=str(group),
-                            x=x,
-                            y=y,
-                            z=z,
-                            theta=theta,
-                            phi=self.phiRange[0] + phiMag * j / self.numPhi
-                        ))
-                        k += 1
-                if k <= 0:
-                    raise SamplingFailedException('Sample points failed to intersect with body')
+            zLevels = bodyLevels(body)
+            polygons, _, areas = sliceMany(body, zLevels)
+            if np.sum(areas) <= 0:
+                raise SamplingFailedException('Sample points failed to intersect with body')
+            batches = []
+            remainingSamples = self.numSamples * perPoint
+            i = 0
+            while remainingSamples > 0:
+                for z, polygon, points in self._samplePoints(int(np.ceil(remainingSamples / perPoint)), zLevels, polygons, areas):
+                    headings = self.headingStrategy.getHeadingsBatch(points, polygon=polygon)
+                    batches.append(VertexBatch.fromSamples(points, headings, phis, group))
+                    remainingSamples -= len(batches[-1])
+                i += 1
+                if remainingSamples > 0 and i >= LIMIT:
+                    raise SamplingFailedException('Sample points failed to get headings in body')
+            samples += batches
             group += 1
-        return samples
+        return VertexBatch.concatenate(samples)
+
+    def _samplePoints(self, numPoints: int, zLevels: np.ndarray, polygons: 'list[Polygon]', areas: np.ndarray) -> 'list[tuple[float, Polygon, np.ndarray]]':
+        '''
+        draws points inside the slices of a body. Points are allocated to the levels by slice area, and each level is
+        rejection sampled from its bounding box in batches sized by the fraction of the box the slice covers.
+
+        Parameters
+        ----------
+        numPoints: int
+            number of points to draw
+        zLevels: np.ndarray
+            height of each slice
+        polygons: list[Polygon]
+            largest polygon of each slice or None
+        areas: np.ndarray
+            area of each slice
+
+        Returns
+        -------
+        list[tuple[float, Polygon, np.ndarray]]
+            height, polygon and [k, 3] points of each level that got points
+        '''
+        allocations = areas / np.sum(areas) * numPoints
+        counts = np.floor(allocations).astype(int)
+        order = np.flip(np.argsort(allocations - counts, kind='stable'))
+        counts[order[:numPoints - np.sum(counts)]] += 1
+        levels = []
+        for z, polygon, count in zip(zLevels, polygons, counts):
+            if count <= 0:
+                continue
+            xMin, yMin, xMax, yMax = polygon.bounds
+            accept = polygon.area / max((xMax - xMin) * (yMax - yMin), APPROX_ZERO)
+            points = []
+            found = 0
+            i = 0
+            while found < count:
+                if i >= LIMIT:
+                    raise SamplingFailedException('Sample points failed to intersect with body')
+                n = max(MIN_BATCH, int(np.ceil((count - found) / max(accept, APPROX_ZERO) * 1.25)))
+                candidates = np.column_stack([
+                    self.rng.random(n) * (xMax - xMin) + xMin,
+                    self.rng.random(n) * (yMax - yMin) + yMin,
+                    np.full(n, z)
+                ])
+                candidates = candidates[containsPoints2d(candidates, polygon)][:count - found]
+                points.append(candidates)
+                found += len(candidates)
+                i += 1
+            levels.append((z, polygon, np.concatenate(points)))
+        return levels
+
+
+def bodyLevels(body: pv.PolyData) -> np.ndarray:
+    '''
+    heights the interior of a body is sampled at, evenly spaced between its lowest and highest point
+
+    Parameters
+    ----------
+    body: pv.PolyData
+        volume to sample
+
+    Returns
+    -------
+    np.ndarray
+        [LEVELS] z levels
+    '''
+    return np.linspace(body.bounds[4], body.bounds[5], LEVELS + 2)[1:-1]
@@ -1,12 +1,11 @@
 import numpy as np
-from viewplanning.models import Region, Vertex3D, RegionType
+from viewplanning.models import Region, VertexBatch, RegionType
 from viewplanning.sampling.sampleStrategy import SampleStrategy
-from viewplanning.sampling.sampleHelpers import iterateRegions, polygonFromBody, getPointsOnEdge, SamplingFailedException
+from viewplanning.sampling.sampleHelpers import iterateRegions, polygonFromBody, samplePerimeter, SamplingFailedException
 from typing import Iterator
 
 OFFSET = .01
 POLYGON_CUTOFF = .01
-LIMIT = 200
 
 
 class Edge3dSampleStrategy(SampleStrategy[Region]):
@@ -32,7 +31,7 @@ class Edge3dSampleStrategy(SampleStrategy[Region]):
         self.numPhi = numPhi
         self.phiRange = phiRange
 
-    def getSamples(self, polygons: Iterator[Region]) -> 'list[Vertex3D]':
+    def getSamples(self, polygons: Iterator[Region]) -> VertexBatch:
         samples = []
         regions = list(polygons)
 
@@ -42,36 +41,11 @@ class Edge3dSampleStrategy(SampleStrategy[Region]):
             polygon = polygonFromBody(z, mesh, cutoff=POLYGON_CUTOFF)
             if not polygon:
                 raise SamplingFailedException(f'failed to slice mesh {group}')
-            s = self._sampleSlice(self.numSamples, polygon, z, group)
-            samples += s
-        return samples
+            samples.append(self._sampleSlice(self.numSamples, polygon, z, group))
+        return VertexBatch.concatenate(samples)
 
     def _sampleSlice(self, numPoints, polygon, z, group):
-        samples = []
-        pointsIndex = 0
-        remainingSamples = numPoints * self.headingStrategy.numHeadings * self.numPhi
-        i = 0
-        lr = remainingSamples
-        while remainingSamples > 0 and i < LIMIT:
-            points = getPointsOnEdge(pointsIndex, int(np.ceil(remainingSamples / (self.headingStrategy.numHeadings * self.numPhi))), polygon)
-            pointsIndex += numPoints
-            for point in points:
-                phiMag = self.phiRange[1] - self.phiRange[0]
-                for theta in self.headingStrategy.getHeadings(np.array([point[0], point[1], z]), polygon=polygon):
-                    for n in range(self.numPhi):
-                        if remainingSamples <= 0:
-                            return samples
-                        phi = self.phiRange[0] + phiMag * n / (self.numPhi)
-                        samples.append(Vertex3D(
-                            group=str(group),
-                            x=point[0],
-                            y=point[1],
-                            z=z,
-                            theta=theta,
-                            phi=phi
-                        ))
-                        remainingSamples -= 1
-            if lr == remainingSamples:
-                i += 1
-            lr = remainingSamples
-        return samples
+        phiMag = self.phiRange[1] - self.phiRange[0]
+        phis = self.phiRange[0] + phiMag * np.arange(self.numPhi) / (self.numPhi)
+        return samplePerimeter(numPoints, polygon, z, self.headingStrategy, phis, group)
+
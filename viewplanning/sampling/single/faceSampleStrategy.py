@@ -2,8 +2,9 @@ from typing import Iterator
 import numpy as np
 import pyvista as pv
 from viewplanning.sampling.sampleStrategy import SampleStrategy
-from viewplanning.models import Region, Vertex3D
+from viewplanning.models import Region, VertexBatch
 from viewplanning.sampling.sampleHelpers import iterateRegions
+from viewplanning.store import MeshGeometry
 
 
 class FaceSampleStrategy(SampleStrategy[Region]):
@@ -29,32 +30,13 @@ class FaceSampleStrategy(SampleStrategy[Region]):
         self.numPhi = numPhi
         self.phiRange = phiRange
 
-    def getSamples(self, bodies: Iterator[Region]) -> 'list[Vertex3D]':
+    def getSamples(self, bodies: Iterator[Region]) -> VertexBatch:
         samples = []
         for group, body in enumerate(iterateRegions(bodies)):
             body: pv.PolyData
-            areas = np.array([.5 * np.linalg.norm(np.cross(
-                body.points[body.faces.reshape(-1, 4)[i, 1], :] - body.points[body.faces.reshape(-1, 4)[i, 2], :],
-                body.points[body.faces.reshape(-1, 4)[i, 1], :] - body.points[body.faces.reshape(-1, 4)[i, 3], :]
-            )) for i in range(body.n_cells)])
-            # get random faces
-            indexes = np.random.choice(range(areas.shape[0]), size=[self.numSamples], p=areas / np.sum(areas))
-            points = body.points[body.faces.reshape([-1, 4])[indexes, 1:]]
-            normals = body.face_normals[indexes, :]
-            # transform random point into triangle barycentric coordinate
-            r1 = np.sqrt(np.random.random(size=[self.numSamples, 1]))
-            r2 = np.random.random(size=[self.numSamples, 1])
-            d = points[:, 0, :] * (1 - r1) + points[:, 1, :] * r1 * (1 - r2) + points[:, 2, :] * r1 * r2
+            d, _ = MeshGeometry.of(body).sampleSurface(self.numSamples, self.rng)
             phiMag = self.phiRange[1] - self.phiRange[0]
-            for k, point in enumerate(d):
-                for theta in self.headingStrategy.getHeadings(point, mesh=body):
-                    for j in range(self.numPhi):
-                        samples.append(Vertex3D(
-                            group=str(group),
-                            x=point[0],
-                            y=point[1],
-                            z=point[2],
-                            theta=theta,
-                            phi=self.phiRange[0] + phiMag * j / max(self.numPhi - 1, 1)
-                        ))
-        return samples
+            phis = self.phiRange[0] + phiMag * np.arange(self.numPhi) / max(self.numPhi - 1, 1)
+            headings = [self.headingStrategy.getHeadings(point, mesh=body) for point in d]
+            samples.append(VertexBatch.fromSamples(d, headings, phis, group))
+        return VertexBatch.concatenate(samples)
@@ -1,15 +1,16 @@
 from typing import Generator, Iterator
 import numpy as np
-from viewplanning.models import Region, Vertex3D
+from viewplanning.models import Region, VertexBatch
 from viewplanning.sampling.sampleStrategy import SampleStrategy
-from viewplanning.sampling.sampleHelpers import SamplingFailedException, polygonFromBody, iterateRegions, getPointsOnEdge
+from viewplanning.sampling.sampleHelpers import SamplingFailedException, iterateRegions, samplePerimeter
+from viewplanning.sampling.slicing import sliceMany
+from viewplanning.store import MeshGeometry
 from shapely.geometry import Polygon
 import pyvista as pv
 import math
 
 OFFSET_INTO_BODY = .005
 POLYGON_CUTOFF = .1
-LIMIT = 200
 
 
 class GlobalPerimeterWeightedFaceSampleStrategy(SampleStrategy[Region]):
@@ -38,12 +39,12 @@ class GlobalPerimeterWeightedFaceSampleStrategy(SampleStrategy[Region]):
         self.phiRange = phiRange
         self.numSlices = numLevels
 
-    def getSamples(self, regions: 'Iterator[Region]') -> 'list[Vertex3D]':
+    def getSamples(self, regions: 'Iterator[Region]') -> VertexBatch:
         samples = []
         bodies: list[pv.PolyData] = list(iterateRegions(regions))
 
         if len(bodies) <= 0:
-            return []
+            return VertexBatch()
 
         # find global min and max
         globalZMin = min([body.bounds[4] for body in bodies])
@@ -60,73 +61,44 @@ class GlobalPerimeterWeightedFaceSampleStrategy(SampleStrategy[Region]):
         totalZ = self.numSlices
 
         bodyInfo = []
-        zLengths = [0] * totalZ
-        # slice all bodies along global z slices
+        zLengths = np.zeros(totalZ)
+        zSlices = np.linspace(globalZMin, globalZMax, totalZ)
+        # slice all bodies along global z slices and just inside their top and bottom
         for body in bodies:
-            item = {
+            _, _, _, _, bodyMin, bodyMax = body.bounds
+            r = bodyMax - bodyMin
+            polygons, lengths, _ = sliceMany(
+                body,
+                np.append(zSlices, [bodyMin + r * OFFSET_INTO_BODY, bodyMax - r * OFFSET_INTO_BODY]),
+                cutoff=POLYGON_CUTOFF
+            )
+            bodyInfo.append({
                 'body': body,
-                'slices': []
-            }
-            i = 0
-            for z in np.linspace(globalZMin, globalZMax, totalZ):
-                polygon = polygonFromBody(z, body, cutoff=POLYGON_CUTOFF)
-                if polygon is None:
-                    i += 1
-                    item['slices'].append({'z': z, 'polygon': None})
-                    continue
-                item['slices'].append({'z': z, 'polygon': polygon})
-                # total lengths along global z slices
-                zLengths[i] += polygon.exterior.length
-                i += 1
-            bodyInfo.append(item)
+                'slices': [{'z': z, 'polygon': polygon} for z, polygon in zip(zSlices, polygons)],
+                'bottom': polygons[-2],
+                'top': polygons[-1]
+            })
+            # total lengths along global z slices
+            zLengths += lengths[:-2]
         for group, bi in enumerate(bodyInfo):
             samplesPerBody = self._iterateNumSamplesPerBody(bi, zLengths)
             s = []
             for numPoints, polygon, z in samplesPerBody:
                 if numPoints <= 0 or polygon is None:
                     continue
-                s += self._sampleSlice(numPoints, polygon, z, group)
-            if len(s) <= 0:
+                s.append(self._sampleSlice(numPoints, polygon, z, group))
+            if sum(len(b) for b in s) <= 0:
                 raise SamplingFailedException(f'failed to sample view region {regions[group].file}')
             samples += s
-        return samples
+        return VertexBatch.concatenate(samples)
 
     def _sampleSlice(self, numPoints, polygon, z, group):
-        samples = []
-        pointsIndex = 0
-        remainingSamples = numPoints * self.headingStrategy.numHeadings * self.numPhi
-        i = 0
-        lr = remainingSamples
-        while remainingSamples > 0 and i < LIMIT:
-            points = getPointsOnEdge(pointsIndex, int(np.ceil(remainingSamples / (self.headingStrategy.numHeadings * self.numPhi))), polygon)
-            pointsIndex += numPoints
-            for point in points:
-                phiMag = self.phiRange[1] - self.phiRange[0]
-                for theta in self.headingStrategy.getHeadings(np.array([point[0], point[1], z]), polygon=polygon):
-                    for n in range(self.numPhi):
-                        if remainingSamples <= 0:
-                            return samples
-                        phi = self.phiRange[0] + phiMag * n / (self.numPhi)
-                        samples.append(Vertex3D(
-                            group=str(group),
-                            x=point[0],
-                            y=point[1],
-                            z=z,
-                            theta=theta,
-                            phi=phi
-                        ))
-                        remainingSamples -= 1
-            if lr == remainingSamples:
-                i += 1
-            lr = remainingSamples
-        return samples
+        phiMag = self.phiRange[1] - self.phiRange[0]
+        phis = self.phiRange[0] + phiMag * np.arange(self.numPhi) / (self.numPhi)
+        return samplePerimeter(numPoints, polygon, z, self.headingStrategy, phis, group)
 
     def _surfaceArea(self, body: pv.PolyData):
-        areas = np.array([.5 * np.linalg.norm(np.cross(
-            body.points[body.faces.reshape(-1, 4)[i, 1], :] - body.points[body.faces.reshape(-1, 4)[i, 2], :],
-            body.points[body.faces.reshape(-1, 4)[i, 1], :] - body.points[body.faces.reshape(-1, 4)[i, 3], :]
-        )) for i in range(body.n_cells)])
-        return np.sum(areas)
+        return MeshGeometry.of(body).area
 
     # included to make sure view regions that don't have the same min and max get their top and bottom polygons samples
     def _iterateNumSamplesPerBody(self, bodyInfo, zLengths) -> 'Generator[(int, Polygon, float), None, None]':
@@ -140,7 +112,7 @@ class GlobalPerimeterWeightedFaceSampleStrategy(SampleStrategy[Region]):
         while bodyMin > bodyInfo['slices'][j]['z']:
             j += 1
         if j > 0:
-            inBodySlices.append({'z': bodyMin, 'polygon': polygonFromBody(bodyMin, bodyInfo['body'], cutoff=POLYGON_CUTOFF)})
+            inBodySlices.append({'z': bodyMin, 'polygon': bodyInfo['bottom']})
             length = (zLengths[j] - zLengths[j - 1]) / (bodyInfo['slices'][j]['z'] - bodyInfo['slices'][j - 1]['z']) \
                 * (bodyMin - bodyInfo['slices'][j - 1]['z']) + zLengths[j - 1]
             newZ.append(length)
@@ -153,7 +125,7 @@ class GlobalPerimeterWeightedFaceSampleStrategy(SampleStrategy[Region]):
             length = (zLengths[j] - zLengths[j - 1]) / (bodyInfo['slices'][j]['z'] - bodyInfo['slices'][j - 1]['z']) \
                 * (bodyMax - bodyInfo['slices'][j - 1]['z']) + zLengths[j - 1]
             newZ.append(length)
-            inBodySlices.append({'z': bodyMax, 'polygon': polygonFromBody(bodyMax, bodyInfo['body'], cutoff=POLYGON_CUTOFF)})
+            inBodySlices.append({'z': bodyMax, 'polygon': bodyInfo['top']})
 
         totalZ = sum(newZ)
         allocations = newZ / totalZ * self.numSamples
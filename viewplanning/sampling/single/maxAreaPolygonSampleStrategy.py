@@ -3,7 +3,8 @@ from typing import Iterator
 from viewplanning.models import Region, RegionType, Vertex2D
 import pyvista as pv
 import numpy as np
-from viewplanning.sampling.sampleHelpers import SamplingFailedException, iterateRegions, polygonFromBody, containsPoint2d
+from viewplanning.sampling.sampleHelpers import SamplingFailedException, iterateRegions, containsPoint2d
+from viewplanning.sampling.slicing import sliceMany
 
 
 SLICES = 64
@@ -38,12 +39,8 @@ class MaxAreaPolygonSampleStrategy(SampleStrategy):
         # slice all along global z slices
         polygons = []
         for j, body in enumerate(bodies):
-            for i, z in enumerate(zSlices):
-                polygon = polygonFromBody(z, body)
-                polygons.append(polygon)
-                if polygon is None:
-                    continue
-                areas[j, i] = polygon.area
+            bodyPolygons, _, areas[j] = sliceMany(body, zSlices)
+            polygons.append(bodyPolygons)
         s = np.sum(areas, axis=0)
         i = np.array([list(range(SLICES))] * len(bodies))
         i[areas <= 0] = SLICES
@@ -52,7 +49,7 @@ class MaxAreaPolygonSampleStrategy(SampleStrategy):
         zhat = zSlices[idx]
 
         for group, body in enumerate(bodies):
-            polygon = polygonFromBody(zhat, body)
+            polygon = polygons[group][idx]
             if polygon is None:
                 raise SamplingFailedException('Couldn\'t slice mesh into polygon')
             xMin, yMin, xMax, yMax = polygon.bounds
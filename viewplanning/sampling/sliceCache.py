@@ -0,0 +1,147 @@
+from viewplanning.sampling.slicing import sliceMesh
+from viewplanning.configuration import ConfigurationFactory
+from viewplanning.sampling.polygonStack import PolygonStack
+from shapely.geometry import Polygon
+from collections import OrderedDict
+import pyvista as pv
+import numpy as np
+import weakref
+import logging
+import os
+
+
+APPROX_ZERO = 1e-4
+CACHE_SIZE = 4096
+TOLERANCE = .01
+# approximate size of a shapely polygon without its coordinates
+POLYGON_OVERHEAD = 200
+
+
+class SliceCache:
+    '''
+    least recently used cache of horizontal slices of meshes. Slices are keyed by the identity of the mesh, the height
+    rounded to a multiple of the tolerance, and the cutoff, so samples at nearly the same height share a slice.
+    '''
+    __instance: 'dict[int, SliceCache]' = {}
+
+    @staticmethod
+    def getInstance() -> 'SliceCache':
+        '''get a slice cache for the current process'''
+        pid = os.getpid()
+        if pid not in SliceCache.__instance:
+            config = ConfigurationFactory.getInstance()
+            config = {} if config is None else config.get('slices', {})
+            SliceCache.__instance[pid] = SliceCache(
+                config.get('cacheSize', CACHE_SIZE),
+                config.get('tolerance', TOLERANCE)
+            )
+        return SliceCache.__instance[pid]
+
+    def __init__(self, size: int = CACHE_SIZE, tolerance: float = TOLERANCE) -> None:
+        '''
+        This class is designed as a singleton use getInstance
+
+        Parameters
+        ----------
+        size: int
+            largest number of slices to keep
+        tolerance: float
+            heights are rounded to a multiple of the tolerance, 0 to slice at the exact height
+        '''
+        self.size = size
+        self.tolerance = tolerance
+        self.items: 'OrderedDict[tuple, tuple[weakref.ref, Polygon, int]]' = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def getPolygon(self, zLevel: float, mesh: pv.PolyData, cutoff: float = APPROX_ZERO) -> Polygon:
+        '''
+        largest polygon of a horizontal slice of a mesh
+
+        Parameters
+        ----------
+        zLevel: float
+            z height to slice at
+        mesh: pv.PolyData
+            mesh to slice
+        cutoff: float
+            distance where two segment endpoints are the same point
+
+        Returns
+        -------
+        Polygon
+            largest polygon of the slice or None
+        '''
+        stack = PolygonStack.of(mesh)
+        if stack is not None:
+            # intersections from slices already have their polygons
+            return stack.polygonAt(zLevel)
+        if self.tolerance > 0:
+            level = int(np.round(zLevel / self.tolerance))
+            zLevel = level * self.tolerance
+        else:
+            level = zLevel
+        key = (id(mesh), level, cutoff)
+        item = self.items.get(key)
+        # ids are reused after a mesh is garbage collected
+        if item is not None and item[0]() is mesh:
+            self.hits += 1
+            self.items.move_to_end(key)
+            return item[1]
+        self.misses += 1
+        if item is not None:
+            self._remove(key)
+
+        polygon = None
+        if mesh.bounds[4] <= zLevel <= mesh.bounds[5]:
+            for p in sliceMesh(zLevel, mesh, cutoff=cutoff):
+                if polygon is None or p.area > polygon.area:
+                    polygon = p
+        size = POLYGON_OVERHEAD if polygon is None else POLYGON_OVERHEAD + 24 * len(polygon.exterior.coords)
+        self.items[key] = (weakref.ref(mesh), polygon, size)
+        self.bytes += size
+        while len(self.items) > self.size:
+            self._remove(next(iter(self.items)))
+            self.evictions += 1
+        return polygon
+
+    def _remove(self, key: tuple):
+        _, _, size = self.items.pop(key)
+        self.bytes -= size
+
+    def clearCache(self):
+        '''
+        empty the cache
+        '''
+        self.items.clear()
+        self.bytes = 0
+
+    def stats(self) -> 'dict[str, float]':
+        '''
+        usage of the cache
+
+        Returns
+        -------
+        dict[str, float]
+            hits, misses, hit rate, evictions, number of slices and approximate bytes of the slices
+        '''
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': self.hits / total if total > 0 else 0.0,
+            'evictions': self.evictions,
+            'items': len(self.items),
+            'bytes': self.bytes
+        }
+
+    def logStats(self):
+        '''
+        log the usage of the cache
+        '''
+        stats = self.stats()
+        logging.info(
+            f'slice cache pid {os.getpid()} {stats["hits"]} hits {stats["misses"]} misses hit rate {stats["hitRate"]:.2%} '
+            f'{stats["items"]} slices {stats["bytes"] / 2 ** 20:.1f}MiB {stats["evictions"]} evictions')
@@ -0,0 +1,357 @@
+import math
+import numpy as np
+import pyvista as pv
+from shapely.geometry.polygon import Polygon, orient
+from viewplanning.store.meshGeometry import MeshGeometry
+
+
+APPROX_ZERO = 1e-4
+# offsets of the neighbouring cells of the endpoint hash grid
+NEIGHBOURS = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1)]
+
+
+def sliceMesh(zLevel: float, mesh: pv.PolyData, cutoff: float = APPROX_ZERO) -> 'list[Polygon]':
+    '''
+    slices a triangle mesh along a plane parallel to the xy plane at height zLevel. The crossings of every triangle are
+    found in one vectorized pass and the segments are stitched into rings through a hash grid of their endpoints.
+
+    Parameters
+    ----------
+    zLevel: float
+        z height to slice at
+    mesh: pv.PolyData
+        triangle mesh
+    cutoff: float
+        distance where two segment endpoints are the same point
+
+    Returns
+    -------
+    list[Polygon]
+        counter clockwise polygons resulting from the slice
+    '''
+    points = np.asarray(mesh.points)
+    faces = mesh.faces.reshape(-1, 4)[:, 1:]
+    # only gather the triangles that span the plane
+    faces = faces[_spans(points[faces, 2], zLevel)]
+    return polygonsFromSegments(sliceTriangles(zLevel, points[faces]), cutoff)
+
+
+def sliceMany(mesh: pv.PolyData, zLevels: 'list[float]', cutoff: float = APPROX_ZERO) -> 'tuple[list[Polygon], np.ndarray, np.ndarray]':
+    '''
+    slices a triangle mesh at many heights. The triangles are gathered once and each triangle is only tested against
+    the levels between its lowest and highest vertex.
+
+    Parameters
+    ----------
+    mesh: pv.PolyData
+        triangle mesh
+    zLevels: list[float]
+        z heights to slice at
+    cutoff: float
+        distance where two segment endpoints are the same point
+
+    Returns
+    -------
+    tuple[list[Polygon], np.ndarray, np.ndarray]
+        largest polygon of each level or None, and the perimeter and area of the polygon, 0 where there isn\'t a polygon
+    '''
+    zLevels = np.asarray(zLevels, dtype=float)
+    geometry = MeshGeometry.registered(mesh)
+    if geometry is not None and (tuple(zLevels.tolist()), cutoff) in geometry.slices:
+        # slices written by create precompute
+        polygons, perimeters, areas = geometry.slices[(tuple(zLevels.tolist()), cutoff)]
+        return list(polygons), perimeters.copy(), areas.copy()
+    polygons = [None] * len(zLevels)
+    perimeters = np.zeros(len(zLevels))
+    areas = np.zeros(len(zLevels))
+    if len(zLevels) == 0 or mesh.n_cells == 0:
+        return polygons, perimeters, areas
+    order = np.argsort(zLevels, kind='stable')
+    levels = zLevels[order]
+    points = np.asarray(mesh.points)
+    faces = mesh.faces.reshape(-1, 4)[:, 1:]
+    z = points[faces, 2]
+    # levels strictly between the lowest and highest vertex of each triangle
+    lo = np.searchsorted(levels, np.minimum(np.minimum(z[:, 0], z[:, 1]), z[:, 2]), side='right')
+    hi = np.searchsorted(levels, np.maximum(np.maximum(z[:, 0], z[:, 1]), z[:, 2]), side='left')
+    counts = np.maximum(hi - lo, 0)
+    triangle = np.repeat(np.arange(len(faces)), counts)
+    level = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+    # group the triangles by level keeping the order of the faces within a level
+    byLevel = np.argsort(level, kind='stable')
+    triangle, level = triangle[byLevel], level[byLevel]
+    segments, crossing = _crossings(levels[level], points[faces[triangle]])
+    level = level[crossing]
+    if len(segments) == 0:
+        return polygons, perimeters, areas
+    bounds = np.searchsorted(level, np.arange(len(levels) + 1))
+    # neighbours of the endpoints of every level are found at once, indices are shifted to each level
+    offsets, neighbours = _endpointNeighbours(segments.reshape(-1, 3), cutoff, np.repeat(level, 2))
+    for k in range(len(levels)):
+        if bounds[k] == bounds[k + 1]:
+            continue
+        a, b = bounds[k], bounds[k + 1]
+        levelOffsets = offsets[2 * a:2 * b + 1]
+        neighbourhoods = (levelOffsets - levelOffsets[0], neighbours[levelOffsets[0]:levelOffsets[-1]] - 2 * a)
+        polygon = None
+        for p in _polygonsFromRings(segments[a:b], _stitch(segments[a:b], cutoff, neighbourhoods), cutoff):
+            if polygon is None or p.area > polygon.area:
+                polygon = p
+        if polygon is None:
+            continue
+        polygons[order[k]] = polygon
+        perimeters[order[k]] = polygon.exterior.length
+        areas[order[k]] = polygon.area
+    return polygons, perimeters, areas
+
+
+def sliceTriangles(zLevel: float, triangles: np.ndarray) -> np.ndarray:
+    '''
+    line segments where triangles cross a horizontal plane
+
+    Parameters
+    ----------
+    zLevel: float
+        z height to slice at
+    triangles: np.ndarray
+        [n, 3, 3] vertices of the triangles
+
+    Returns
+    -------
+    np.ndarray
+        [s, 2, 3] segments, the endpoints are in the order of the edges of their triangle
+    '''
+    # only triangles that span the plane can cross it
+    triangles = triangles[_spans(triangles[:, :, 2], zLevel)]
+    segments, _ = _crossings(zLevel, triangles)
+    return segments
+
+
+def _crossings(zLevel: 'float | np.ndarray', triangles: np.ndarray) -> 'tuple[np.ndarray, np.ndarray]':
+    '''
+    line segments where triangles cross horizontal planes
+
+    Parameters
+    ----------
+    zLevel: float | np.ndarray
+        z height to slice at or [n] height for each triangle
+    triangles: np.ndarray
+        [n, 3, 3] vertices of the triangles
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        [s, 2, 3] segments and [n] mask of the triangles that cross their plane
+    '''
+    zLevel = np.reshape(zLevel, (-1, 1))
+    # edge j goes from vertex j to vertex j - 1
+    vectors = np.roll(triangles, 1, axis=1) - triangles
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (triangles[:, :, 2] - zLevel) / -vectors[:, :, 2]
+    crossed = (t > 0) & (t < 1)
+    crossing = np.sum(crossed, axis=1) > 1
+    crossed = crossed[crossing]
+    points = triangles[crossing][crossed] + t[crossing][crossed][:, None] * vectors[crossing][crossed]
+    return points.reshape(-1, 2, 3), crossing
+
+
+def _spans(z: np.ndarray, zLevel: float) -> np.ndarray:
+    '''
+    triangles with vertices strictly above and strictly below a plane
+
+    Parameters
+    ----------
+    z: np.ndarray
+        [n, 3] heights of the vertices of the triangles
+    zLevel: float
+        height of the plane
+
+    Returns
+    -------
+    np.ndarray
+        [n] mask of the triangles that span the plane
+    '''
+    below = z < zLevel
+    above = z > zLevel
+    return (below[:, 0] | below[:, 1] | below[:, 2]) & (above[:, 0] | above[:, 1] | above[:, 2])
+
+
+def polygonsFromSegments(segments: np.ndarray, cutoff: float = APPROX_ZERO) -> 'list[Polygon]':
+    '''
+    stitch line segments into closed rings and make polygons from the rings. Segments are chained end to start in the
+    order they're given, a ring that can't be continued drops its last segment and tries again, and rings that don't
+    close are discarded.
+
+    Parameters
+    ----------
+    segments: np.ndarray
+        [s, 2, 3] line segments
+    cutoff: float
+        distance where two segment endpoints are the same point
+
+    Returns
+    -------
+    list[Polygon]
+        counter clockwise polygons starting at the vertex with the smallest angle around the origin
+    '''
+    if len(segments) == 0:
+        return []
+    return _polygonsFromRings(segments, _stitch(segments, cutoff, _endpointNeighbours(segments.reshape(-1, 3), cutoff)), cutoff)
+
+
+def _polygonsFromRings(segments: np.ndarray, rings: 'list[list[tuple[int, int]]]', cutoff: float) -> 'list[Polygon]':
+    '''
+    polygons from rings of segments, skipping segments shorter than cutoff
+
+    Parameters
+    ----------
+    segments: np.ndarray
+        [s, 2, 3] line segments
+    rings: list[list[tuple[int, int]]]
+        rings from _stitch
+    cutoff: float
+        distance where two segment endpoints are the same point
+
+    Returns
+    -------
+    list[Polygon]
+        counter clockwise polygons starting at the vertex with the smallest angle around the origin
+    '''
+    polygons = []
+    for ring in rings:
+        ring = np.array(ring)
+        starts = segments[ring[:, 0], 1 - ring[:, 1]]
+        ends = segments[ring[:, 0], ring[:, 1]]
+        ps = np.concatenate([starts[np.linalg.norm(starts - ends, axis=1) > cutoff], ends[-1:]])
+        if len(ps) < 3:
+            continue
+        polygon = np.array(orient(Polygon(shell=ps)).exterior.coords)[:-1]
+        theta = (np.arctan2(polygon[:, 1], polygon[:, 0]) + 2 * np.pi) % (2 * np.pi)
+        index = np.argmin(theta)
+        polygon = np.roll(polygon, -index, axis=0)
+        polygons.append(Polygon(polygon))
+    return polygons
+
+
+def _stitch(segments: np.ndarray, cutoff: float, neighbourhoods: 'tuple[np.ndarray, np.ndarray]') -> 'list[list[tuple[int, int]]]':
+    '''
+    chain segments into closed rings
+
+    Parameters
+    ----------
+    segments: np.ndarray
+        [s, 2, 3] line segments
+    cutoff: float
+        distance where two segment endpoints are the same point
+    neighbourhoods: tuple[np.ndarray, np.ndarray]
+        offsets and neighbours of the endpoints from _endpointNeighbours
+
+    Returns
+    -------
+    list[list[tuple[int, int]]]
+        rings as (segment, end) pairs, the ring travels through each segment towards endpoint end
+    '''
+    n = len(segments)
+    if n == 0:
+        return []
+    offsets = neighbourhoods[0].tolist()
+    neighbours = neighbourhoods[1].tolist()
+    coordinates = segments.reshape(-1, 3).tolist()
+    used = [False] * n
+    remaining = n
+    nextFree = 0
+
+    def closest(e):
+        # closest unused segment through each of its endpoints within cutoff of endpoint e
+        best = [n, n]
+        for k in range(offsets[e], offsets[e + 1]):
+            i, j = divmod(neighbours[k], 2)
+            if not used[i] and best[j] == n:
+                best[j] = i
+                if best[1 - j] < n:
+                    break
+        return best
+
+    def start():
+        nonlocal nextFree, remaining
+        while used[nextFree]:
+            nextFree += 1
+        used[nextFree] = True
+        remaining -= 1
+        return [(nextFree, 0)]
+
+    rings = []
+    ring = start()
+    while remaining > 0:
+        i, j = ring[-1]
+        first, second = closest(2 * i + j)
+        # segment with both endpoints at the end of the ring
+        if first == second and first < n:
+            used[first] = True
+            remaining -= 1
+            continue
+        if first < n or second < n:
+            if first < n:
+                ring.append((first, 1))
+            else:
+                ring.append((second, 0))
+            used[ring[-1][0]] = True
+            remaining -= 1
+            # check to see if the ring closed
+            i, j = ring[-1]
+            k, m = ring[0]
+            if math.dist(coordinates[2 * k + 1 - m], coordinates[2 * i + j]) < cutoff:
+                rings.append(ring)
+                if remaining > 0:
+                    ring = start()
+        elif len(ring) > 1:
+            # try again without last segment
+            ring.pop()
+        else:
+            ring = start()
+    return rings
+
+
+def _endpointNeighbours(points: np.ndarray, cutoff: float, labels: np.ndarray = None) -> 'tuple[np.ndarray, np.ndarray]':
+    '''
+    endpoints of other segments within cutoff of every endpoint. Endpoints are hashed into a grid of cutoff sized
+    cells, so only the endpoints in the 3 x 3 neighbouring cells are compared.
+
+    Parameters
+    ----------
+    points: np.ndarray
+        [2s, 3] endpoints, endpoint e belongs to segment e // 2
+    cutoff: float
+        distance where two endpoints are the same point
+    labels: np.ndarray
+        [2s] endpoints are only neighbours of endpoints with the same label
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        offsets [2s + 1] and neighbours, the neighbours of endpoint e are neighbours[offsets[e]:offsets[e + 1]] ordered
+        by distance then segment
+    '''
+    cells = np.floor(points[:, :2] / cutoff).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    height, width = cells.max(axis=0) + 2
+    keys = cells[:, 0] * width + cells[:, 1]
+    if labels is not None:
+        keys += labels * height * width
+    order = np.argsort(keys, kind='stable')
+    sortedKeys = keys[order]
+    neighbourKeys = (keys[None, :] + np.array([dx * width + dy for dx, dy in NEIGHBOURS])[:, None]).ravel()
+    lo = np.searchsorted(sortedKeys, neighbourKeys, side='left')
+    hi = np.searchsorted(sortedKeys, neighbourKeys, side='right')
+    counts = hi - lo
+    sources = np.repeat(np.tile(np.arange(len(points)), len(NEIGHBOURS)), counts)
+    # position of every match in the sorted keys
+    position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+    targets = order[position]
+    distances = np.linalg.norm(points[sources] - points[targets], axis=1)
+    keep = (distances < cutoff) & (sources // 2 != targets // 2)
+    sources, targets, distances = sources[keep], targets[keep], distances[keep]
+    order = np.lexsort((targets // 2, distances, sources))
+    offsets = np.zeros(len(points) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(points)), out=offsets[1:])
+    return offsets, targets[order]
@@ -1,3 +1,4 @@
 from .dubinsSolverBuilder import DubinsSolverBuilder
-from .solverFactory import makeSolver
+from .solverFactory import makeSolver, makeVerificationStrategy
 from .dubinsSolver import DubinsSolver
+from .dubinsAdaptiveSolver import DubinsAdaptiveSolver
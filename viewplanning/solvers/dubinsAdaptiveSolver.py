@@ -0,0 +1,283 @@
+from .dubinsHighAltitudeSolver import DubinsHighAltitudeSolver
+from viewplanning.sampling import SampleStrategy, SliceCache, IdProvider
+from viewplanning.plotting import SolutionPlotter
+from viewplanning.verification import VerificationStrategy
+from viewplanning.models import Region, Edge, Vertex, VertexMulti, RefinementStrategyRecord
+from viewplanning.tsp import TspSolver
+from viewplanning.edgeSolver import EdgeSolver
+from viewplanning.store import MeshStore
+from shapely.geometry import Point, Polygon
+import dataclasses
+import numpy as np
+import uuid
+import os
+import logging
+import time
+
+
+CUTOFF = .05
+# distance a refined position can be outside of the other volumes that a multi vertex visits
+CONTAINS_TOLERANCE = 1e-3
+
+
+class DubinsAdaptiveSolver(DubinsHighAltitudeSolver):
+    '''
+    Solves the view planning problem above the urban environment by solving a coarsely sampled instance first and then
+    resampling densely around the vertices of the tour. Each refinement appends the new samples to the previous ones,
+    so only the costs of the new vertices are computed, and the tsp search starts from the previous tour.
+    '''
+
+    def __init__(self,
+                 regions: 'list[Region]',
+                 plotter: SolutionPlotter,
+                 verification: VerificationStrategy,
+                 sampleStrategy: SampleStrategy,
+                 edgeSolver: EdgeSolver,
+                 tspSolver: TspSolver,
+                 id: uuid.UUID,
+                 refinement: RefinementStrategyRecord = None,
+                 phiRange: 'list[float]' = None,
+                 rng: np.random.Generator = None
+                 ) -> None:
+        '''
+        Parameters
+        ----------
+        regions: list[Region]
+            list of regeions where the aircraft can view the target
+        plotter: SolutionPlotter
+            plotter that will visualize the solution
+        verification: VerificationStrategy
+            method for verifying that the solution can view all of the targets
+        sampleStrategy: SampleStrategy
+            method for sampling the regions for the coarse configurations
+        edgeSolver: EdgeSolver
+            method for computing paths between configurations
+        tspSolver: TspSolver
+            traveling salesperson problem solving method
+        id: UUID
+            id of solver for disallowing collision of temporary files
+        refinement: RefinementStrategyRecord
+            how to resample around the vertices of the tour
+        phiRange: list[float]
+            acceptable range of pitch angles
+        rng: np.random.Generator
+            random number generator of the refinement, the global numpy random state by default
+        '''
+        super().__init__(regions, plotter, verification, sampleStrategy, edgeSolver, tspSolver, id)
+        self.refinement = RefinementStrategyRecord() if refinement is None else refinement
+        self.phiRange = [0, 0] if phiRange is None else phiRange
+        self.rng = np.random if rng is None else rng
+        # cost of the tour after the coarse solve and each refinement
+        self.history: 'list[float]' = []
+
+    def solve(self) -> 'list[Edge]':
+        start = time.time()
+        logging.debug(f'sampling {self.id}, pid {os.getpid()}')
+        vertices = self.sample()
+        self.history = []
+
+        def costFunction(x, y):
+            return self.edgeSolver.edgeCost(x, y)
+        try:
+            self.costs = None
+            self.tour = []
+            scale = 1.0
+            for i in range(self.refinement.maxIterations + 1):
+                if i > 0:
+                    samples = self._refine([vertices[j] for j in self.tour], scale)
+                    scale *= self.refinement.shrink
+                    if len(samples) == 0:
+                        break
+                    vertices += samples
+                logging.debug(f'writing file {self.id} iteration {i} {len(vertices)} vertices, pid {os.getpid()}')
+                self.costs = self.tspSolver.costMatrix(vertices, costFunction, self.costs)
+                self.tspSolver.writeMatrix(self.id, vertices, self.costs, self.tour)
+                logging.debug(f'solving {self.id} iteration {i}, pid {os.getpid()}')
+                path = self.tspSolver.solve(self.id, vertices)
+                self.tour = self.tspSolver.tour
+                self.history.append(self._tourCost(vertices, self.tour))
+                if i > 0 and self.history[-2] - self.history[-1] < self.refinement.tolerance * self.history[-2]:
+                    break
+            self.vertices = vertices
+            logging.debug(f'making edges {self.id}, pid {os.getpid()}')
+            edges = self.edgeSolver.getEdges(path)
+            self.edges = edges
+            self.timings['solve'] = time.time() - start
+            logging.info(
+                f'adaptive solve {self.id} {len(self.history) - 1} refinements {len(vertices)} vertices tour costs {[round(c, 2) for c in self.history]}')
+            return edges
+        finally:
+            # meshes and their slices are kept for the next experiment in this process
+            MeshStore.getInstance().logStats()
+            SliceCache.getInstance().logStats()
+            self.tspSolver.cleanUp(self.id)
+
+    def _tourCost(self, vertices: 'list[Vertex]', tour: 'list[int]') -> float:
+        '''
+        cost of a closed tour with the weights given to the tsp solver
+
+        Parameters
+        ----------
+        vertices: list[Vertex]
+            all vertices
+        tour: list[int]
+            indices of the vertices of the tour
+
+        Returns
+        -------
+        float
+            cost of the tour
+        '''
+        if len(tour) < 2:
+            return 0.0
+        weights = self.tspSolver.tspCosts(vertices, self.costs)
+        tour = np.array(tour)
+        return float(np.sum(weights[tour, np.roll(tour, -1)]))
+
+    def _refine(self, vertices: 'list[Vertex]', scale: float) -> 'list[Vertex]':
+        '''
+        sample new vertices around vertices of a tour
+
+        Parameters
+        ----------
+        vertices: list[Vertex]
+            vertices of the tour
+        scale: float
+            multiplier of the neighbourhood size, shrinks every iteration
+
+        Returns
+        -------
+        list[Vertex]
+            new vertices
+        '''
+        samples = []
+        ids = set()
+        for vertex in vertices:
+            # copies of a vertex in every volume it visits share an id, only refine one of them
+            if isinstance(vertex, VertexMulti):
+                if vertex.id in ids:
+                    continue
+                ids.add(vertex.id)
+            samples += self._refineVertex(vertex, scale)
+        return samples
+
+    def _refineVertex(self, vertex: Vertex, scale: float) -> 'list[Vertex]':
+        '''
+        sample new vertices around a vertex. Positions move along the horizontal slice of the visibility volume of the
+        vertex, headings come from the heading strategy, and pitch angles are spread around the pitch of the vertex.
+        Vertices without a z coordinate aren\'t refined.
+
+        Parameters
+        ----------
+        vertex: Vertex
+            vertex to refine
+        scale: float
+            multiplier of the neighbourhood size
+
+        Returns
+        -------
+        list[Vertex]
+            new vertices
+        '''
+        if not hasattr(vertex, 'z'):
+            return []
+        refinement = self.refinement
+        polygon = self._polygon(int(vertex.group), vertex.z)
+        if polygon is None:
+            return []
+        visits = vertex.visits if isinstance(vertex, VertexMulti) else set()
+        kwargs = {'dwellMultiplier': len(visits)} if len(visits) > 0 else {}
+
+        positions = [np.array([vertex.x, vertex.y])]
+        positions += self._positionsNear(positions[0], polygon, refinement.distance * scale, refinement.numSamples)
+        # positions of a multi vertex have to stay in every volume it visits
+        others = [self._polygon(int(g), vertex.z) for g in visits if g != vertex.group]
+        positions = [p for p in positions if all(o is not None and o.distance(Point(p)) <= CONTAINS_TOLERANCE for o in others)]
+
+        phis = [vertex.phi]
+        if refinement.numPhi > 1 and refinement.phiSpread > 0:
+            phis = np.unique(np.clip(
+                vertex.phi + np.linspace(-1, 1, refinement.numPhi) * refinement.phiSpread * scale,
+                min(self.phiRange),
+                max(self.phiRange)
+            ))
+
+        samples = []
+        ids = IdProvider.getInsance('')
+        for i, position in enumerate(positions):
+            point = np.array([position[0], position[1], vertex.z])
+            headings = self.sampleStrategy.headingStrategy.getHeadingsNear(
+                point, vertex.theta, refinement.numTheta, refinement.headingSpread * scale, polygon=polygon, **kwargs)
+            for theta in headings:
+                for phi in phis:
+                    # the vertex itself is already in the tsp
+                    if i == 0 and np.isclose(theta, vertex.theta) and np.isclose(phi, vertex.phi):
+                        continue
+                    changes = {'x': position[0], 'y': position[1], 'theta': theta, 'phi': phi}
+                    if len(visits) > 0:
+                        changes['id'] = ids.getId()
+                        for g in sorted(visits):
+                            samples.append(dataclasses.replace(vertex, group=g, visits=set(visits), **changes))
+                    else:
+                        samples.append(dataclasses.replace(vertex, **changes))
+        return samples
+
+    def _positionsNear(self, position: np.ndarray, polygon: Polygon, distance: float, numSamples: int) -> 'list[np.ndarray]':
+        '''
+        positions in a slice of a visibility volume near a position. Positions on the boundary of the slice move along
+        the boundary and positions inside the slice move randomly within distance.
+
+        Parameters
+        ----------
+        position: np.ndarray
+            (x, y) position to sample around
+        polygon: Polygon
+            horizontal slice of the visibility volume
+        distance: float
+            largest distance to move
+        numSamples: int
+            number of new positions
+
+        Returns
+        -------
+        list[np.ndarray]
+            new (x, y) positions
+        '''
+        if numSamples <= 0 or distance <= 0:
+            return []
+        boundary = polygon.exterior
+        point = Point(position)
+        if boundary.distance(point) <= CUTOFF * distance or not polygon.contains(point):
+            s = boundary.project(point)
+            # alternate on either side of the position getting farther away
+            k = np.arange(1, numSamples + 1)
+            offsets = np.where(k % 2 == 1, 1, -1) * np.ceil(k / 2) / np.ceil(numSamples / 2) * distance
+            return [np.array(boundary.interpolate(np.mod(s + offset, boundary.length)).coords[0][:2]) for offset in offsets]
+        positions = []
+        angles = self.rng.uniform(0, 2 * np.pi, numSamples)
+        radii = distance * np.sqrt(self.rng.uniform(0, 1, numSamples))
+        for angle, radius in zip(angles, radii):
+            p = position + radius * np.array([np.cos(angle), np.sin(angle)])
+            if polygon.contains(Point(p)):
+                positions.append(p)
+        return positions
+
+    def _polygon(self, group: int, z: float) -> Polygon:
+        '''
+        horizontal slice of a visibility volume
+
+        Parameters
+        ----------
+        group: int
+            index of the region
+        z: float
+            height of the slice
+
+        Returns
+        -------
+        Polygon
+            largest polygon of the slice or None
+        '''
+        region = self.regions[group]
+        mesh = MeshStore.getInstance().getMesh(region.file, region.rotationMatrix)
+        return SliceCache.getInstance().getPolygon(z, mesh, cutoff=CUTOFF)
@@ -1,5 +1,5 @@
 from .dubinsSolver import DubinsSolver
-from viewplanning.sampling import SampleStrategy
+from viewplanning.sampling import SampleStrategy, SliceCache
 from viewplanning.plotting import SolutionPlotter
 from viewplanning.verification import VerificationStrategy
 from viewplanning.models import Region, Edge
@@ -9,6 +9,7 @@ from viewplanning.store import MeshStore
 import uuid
 import os
 import logging
+import time
 
 
 class DubinsHighAltitudeSolver(DubinsSolver):
@@ -46,6 +47,7 @@ class DubinsHighAltitudeSolver(DubinsSolver):
         super().__init__(regions, plotter, verification, sampleStrategy, edgeSolver, tspSolver, id)
 
     def solve(self) -> 'list[Edge]':
+        start = time.time()
         logging.debug(f'sampling {self.id}, pid {os.getpid()}')
         vertices = self.sample()
 
@@ -53,15 +55,20 @@ class DubinsHighAltitudeSolver(DubinsSolver):
             return self.edgeSolver.edgeCost(x, y)
         try:
             logging.debug(f'writing file {self.id}, pid {os.getpid()}')
-            self.tspSolver.writeFiles(self.id, vertices, costFunction)
+            self.costs = self.tspSolver.costMatrix(vertices, costFunction)
+            self.tspSolver.writeMatrix(self.id, vertices, self.costs)
             logging.debug(f'solving {self.id}, pid {os.getpid()}')
             path = self.tspSolver.solve(self.id, vertices)
+            self.tour = self.tspSolver.tour
             logging.debug(f'making edges {self.id}, pid {os.getpid()}')
             edges = self.edgeSolver.getEdges(path)
+            self.edges = edges
+            self.timings['solve'] = time.time() - start
             return edges
         except Exception as e:
             raise e
         finally:
-            store = MeshStore.getInstance()
-            store.clearCache()
+            # meshes and their slices are kept for the next experiment in this process
+            MeshStore.getInstance().logStats()
+            SliceCache.getInstance().logStats()
             self.tspSolver.cleanUp(self.id)
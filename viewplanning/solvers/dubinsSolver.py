@@ -1,11 +1,14 @@
 import uuid
-from viewplanning.models import Edge, Region
+from viewplanning.models import Edge, Region, Vertex, VertexBatch
 from viewplanning.sampling import SampleStrategy, SamplingFailedException
 from viewplanning.tsp.Tsp import TspSolver
 from viewplanning.verification import VerificationStrategy
 from viewplanning.plotting import SolutionPlotter
 from viewplanning.edgeSolver import EdgeSolver
 from uuid import UUID
+import numpy as np
+import logging
+import time
 
 
 class DubinsSolver(object):
@@ -30,23 +33,38 @@ class DubinsSolver(object):
         self.tspSolver = tspSolver
         self.vertices = []
         self.id = id
+        # costs between the vertices and the tour of the last solve, kept for replanning
+        self.costs: np.ndarray = None
+        self.tour: 'list[int]' = []
+        self.timings: 'dict[str, float]' = {}
 
     def sample(self):
         samples = self.sampleStrategy.getSamples(self.regions)
         self.vertices = samples
-        # check for sampling success
-        groups = set()
-        for vertex in self.vertices:
-            if int(vertex.group) not in groups:
-                groups.add(int(vertex.group))
-        if len(groups) != len(self.regions):
-            real = set(range(len(self.regions)))
-            diff = real.difference(groups)
-            names = [self.regions[j].file for j in diff]
-            raise SamplingFailedException(f'Sampling failed {type(self.sampleStrategy).__name__} couldn\'t sample regions {names}')
-
+        self._checkSamples(samples, self.regions)
         return samples
 
+    def _checkSamples(self, samples: 'list[Vertex] | VertexBatch', regions: 'list[Region]', offset: int = 0):
+        '''
+        check for sampling success, every region needs at least one sample
+
+        Parameters
+        ----------
+        samples: list[Vertex] | VertexBatch
+            samples of the regions
+        regions: list[Region]
+            regions that were sampled
+        offset: int
+            group of the first region
+        '''
+        batch = VertexBatch.fromVertices(samples)
+        groups = set(int(batch.labels[g]) for g in np.unique(batch.group))
+        real = set(range(offset, offset + len(regions)))
+        diff = real.difference(groups)
+        if len(diff) > 0:
+            names = [regions[j - offset].file for j in diff]
+            raise SamplingFailedException(f'Sampling failed {type(self.sampleStrategy).__name__} couldn\'t sample regions {names}')
+
     def solve(self) -> 'list[Edge]':
         '''
         Solve the view planning problem
@@ -58,6 +76,102 @@ class DubinsSolver(object):
         '''
         pass
 
+    def replan(self, added: 'list[Region]' = None, removed: 'list[int]' = None) -> 'list[Edge]':
+        '''
+        Re-solve the view planning problem after targets are added or removed. The samples and edge costs of the
+        targets that don't change are reused and the previous tour is repaired to start the tsp search from.
+
+        Parameters
+        ----------
+        added: list[Region]
+            regions of the new targets, appended after the current regions
+        removed: list[int]
+            indices of the regions to remove
+
+        Returns
+        -------
+        list[Edge]
+            solution to the view planning problem
+        '''
+        added = [] if added is None else added
+        removed = set() if removed is None else set(removed)
+        if self.costs is None:
+            self.regions = [region for i, region in enumerate(self.regions) if i not in removed] + added
+            return self.solve()
+
+        start = time.time()
+        # drop the samples of removed regions and renumber the groups of the rest in the columns of a copy
+        groupMap = {}
+        for i in range(len(self.regions)):
+            if i not in removed:
+                groupMap[str(i)] = str(len(groupMap))
+        batch = VertexBatch.fromVertices(self.vertices)
+        keep = [i for i, label in enumerate(batch.groupLabels()) if label in groupMap]
+        oldToNew = {j: i for i, j in enumerate(keep)}
+        vertices = batch[np.array(keep, dtype=int)].relabel(groupMap)
+        regions = [region for i, region in enumerate(self.regions) if i not in removed]
+
+        # new regions are sampled on their own and numbered after the current regions
+        if len(added) > 0:
+            samples = VertexBatch.fromVertices(self.sampleStrategy.getSamples(added))
+            samples = samples.relabel({label: str(int(label) + len(regions)) for label in samples.labels})
+            self._checkSamples(samples, added, len(regions))
+            vertices = VertexBatch.concatenate([vertices, samples])
+            regions += added
+        self.vertices = vertices
+        self.regions = regions
+
+        def costFunction(x, y):
+            return self.edgeSolver.edgeCost(x, y)
+        try:
+            self.costs = self.tspSolver.costMatrix(vertices, costFunction, self.costs[np.ix_(keep, keep)])
+            tour = [oldToNew[i] for i in self.tour if i in oldToNew]
+            tour = self._insertGroups(tour, vertices, range(len(regions) - len(added), len(regions)))
+            self.tspSolver.writeMatrix(self.id, vertices, self.costs, tour)
+            path = self.tspSolver.solve(self.id, vertices)
+            self.tour = self.tspSolver.tour
+            self.edges = self.edgeSolver.getEdges(path)
+        finally:
+            self.tspSolver.cleanUp(self.id)
+        self.timings['replan'] = time.time() - start
+        if 'solve' in self.timings:
+            logging.info(f'replanning {self.id} took {self.timings["replan"]:.2f}s, full solve took {self.timings["solve"]:.2f}s')
+        return self.edges
+
+    def _insertGroups(self, tour: 'list[int]', vertices: 'list[Vertex]', groups) -> 'list[int]':
+        '''
+        add the cheapest vertex of each group to a tour at the position that increases the cost the least
+
+        Parameters
+        ----------
+        tour: list[int]
+            indices of the vertices of the tour
+        vertices: list[Vertex]
+            all vertices
+        groups: Iterable[int]
+            groups to add to the tour
+
+        Returns
+        -------
+        list[int]
+            tour visiting the groups
+        '''
+        weights = self.tspSolver.tspCosts(vertices, self.costs)
+        labels = VertexBatch.fromVertices(vertices).groupLabels()
+        for group in groups:
+            candidates = np.flatnonzero(labels == str(group))
+            if len(tour) == 0:
+                tour = [candidates[0]]
+                continue
+            previous = np.array(tour)
+            following = np.roll(previous, -1)
+            # increase[i, j] is the cost of visiting candidate j between tour[i] and tour[i + 1]
+            increase = weights[previous][:, candidates] + weights[candidates][:, following].T - \
+                weights[previous, following][:, None]
+            i, j = np.unravel_index(np.argmin(increase), increase.shape)
+            tour.insert(i + 1, candidates[j])
+        return [int(i) for i in tour]
+
     def verify(self) -> int:
         '''
         Verify the view planning solution is valid
@@ -1,5 +1,6 @@
 from .dubinsHighAltitudeSolver import DubinsHighAltitudeSolver
-from viewplanning.models import SolverType, Region, Environment
+from .dubinsAdaptiveSolver import DubinsAdaptiveSolver
+from viewplanning.models import SolverType, Region, Environment, RefinementStrategyRecord
 from .dubinsSolver import DubinsSolver
 from viewplanning.sampling import SampleStrategy
 from viewplanning.plotting import SolutionPlotter3dPyvista, SolutionPlotter2dRegions
@@ -12,6 +13,7 @@ from viewplanning.store import MeshStore
 from viewplanning.tsp import TspSolver
 from viewplanning.edgeSolver import EdgeSolver
 import pyvista as pv
+import numpy as np
 import uuid
 
 
@@ -29,6 +31,9 @@ class DubinsSolverBuilder(object):
         self._edgeSolver: EdgeSolver = None
         self.environmentStore = MeshStore.getInstance()
         self._id: uuid.UUID = uuid.uuid1()
+        self._refinement: RefinementStrategyRecord = RefinementStrategyRecord()
+        self._phiRange: 'list[float]' = [0, 0]
+        self._rng: np.random.Generator = None
 
     def addRegions(self, regions: list):
         self._regions = regions
@@ -66,6 +71,15 @@ class DubinsSolverBuilder(object):
         self._edgeSolver = edgeSolver
         return self
 
+    def setRefinement(self, refinement: RefinementStrategyRecord, phiRange: 'list[float]'):
+        self._refinement = refinement
+        self._phiRange = phiRange
+        return self
+
+    def setRng(self, rng: np.random.Generator):
+        self._rng = rng
+        return self
+
     def build(self) -> DubinsSolver:
         if self._type == SolverType.HIGH_ALTITUDE:
             return DubinsHighAltitudeSolver(
@@ -77,5 +91,18 @@ class DubinsSolverBuilder(object):
                 self._tspSolver,
                 self._id
             )
+        elif self._type == SolverType.ADAPTIVE:
+            return DubinsAdaptiveSolver(
+                self._regions,
+                SolutionPlotter3dPyvista(self._environment),
+                self._verification,
+                self._sampleStrategy,
+                self._edgeSolver,
+                self._tspSolver,
+                self._id,
+                self._refinement,
+                self._phiRange,
+                self._rng
+            )
         else:
             raise Exception('Unknown Solver Type {0}'.format(self._type))
@@ -3,12 +3,14 @@ from viewplanning.solvers.dubinsSolverBuilder import DubinsSolverBuilder
 from viewplanning.sampling.single import BodySampleStrategy, PointSampleStrategy, FaceSampleStrategy, GlobalPerimeterWeightedFaceSampleStrategy, MaxAreaEdgeSampleStrategy, MaxAreaPolygonSampleStrategy, Edge3dSampleStrategy
 from viewplanning.sampling.multi import IntersectingFaceSampling, IntersectingEdge3DSampling, IntersectingGlobalWeightedFaceSampling, IntersectingMaxAreaEdgeSampling, SimpleIntersectingVolumeSampling, BruteVolumeSampling
 from viewplanning.sampling.heading import UniformHeadings, InwardPointingHeadings, StraightDwellHeadings
-from viewplanning.edgeSolver.etsp2dtsp import Etsp2Dtsp, Alternating, AlternatingBisector, AngleBisector
+from viewplanning.sampling import CachedSampleStrategy
+from viewplanning.edgeSolver.etsp2dtsp import Etsp2Dtsp, Alternating, AlternatingBisector, AngleBisector, DynamicProgramming
 from viewplanning.verification import VerificationStrategy, PathVerification, StartPointVerification
 from viewplanning.dubins import RustVanaAirplane, RustDubinsCar
 from viewplanning.edgeSolver import DubinsAirplaneEdge, DubinsCarEdge, DwellStraight, HeuristicEdge, LeadInDwell
 from viewplanning.tsp import OverlappingTspSubprocess
 from math import pi
+import numpy as np
 import logging
 
 
@@ -29,6 +31,8 @@ def makeSolver(experiment: Experiment):
         .setVerificationStrategy(makeVerificationStrategy(experiment.verificationType)) \
         .setEnvironment(experiment.environment) \
         .setEdgeSolver(makeEdgeSolver(experiment.edgeStrategy, experiment.sampleStrategy)) \
+        .setRefinement(experiment.sampleStrategy.refinement, experiment.sampleStrategy.phiRange) \
+        .setRng(makeRngs(experiment.sampleStrategy.seed)[1]) \
         .setId(experiment._id)
 
     if (experiment.sampleStrategy.intersection.type == SampleStrategyIntersection.SIMPLE_INTERSECTION
@@ -48,16 +52,31 @@ def makeStrategy(sample: SampleStrategyRecord):
         sample strategy to create
     '''
     if sample.intersection.type == SampleStrategyIntersection.NON_INTERSECTING:
-        return makeStrategySingle(sample)
+        strategy = makeStrategySingle(sample)
     elif sample.intersection.type == SampleStrategyIntersection.SIMPLE_INTERSECTION:
         method = makeStrategyMulti(sample)
-        return SimpleIntersectingVolumeSampling(method)
+        strategy = SimpleIntersectingVolumeSampling(method)
     elif sample.intersection.type == SampleStrategyIntersection.BRUTE_INTERSECTION:
         method = makeStrategyMulti(sample)
-        return BruteVolumeSampling(method, sample.intersection.cliqueRadius, sample.intersection.cliqueLimit)
-    elif sample.intersection.type == SampleStrategyIntersection.UNKNOWN:
+        strategy = BruteVolumeSampling(method, sample.intersection.cliqueRadius, sample.intersection.cliqueLimit)
+    else:
         raise Exception(
             'Unknown Sampling Intersection Type {0}'.format(sample.intersection))
+    strategy.setRng(makeRngs(sample.seed)[0])
+    return CachedSampleStrategy.fromConfig(strategy, sample)
+
+
+def makeRngs(seed: int) -> 'tuple[np.random.Generator, np.random.Generator]':
+    '''
+    independent random number generators for sampling and refinement, so cached samples don't change the refinement
+
+    Parameters
+    ----------
+    seed: int
+        seed of the sample strategy record
+    '''
+    sampling, refinement = np.random.SeedSequence(seed).spawn(2)
+    return np.random.default_rng(sampling), np.random.default_rng(refinement)
 
 
 def makeStrategyMulti(sample: SampleStrategyRecord):
@@ -135,7 +154,7 @@ def makeHeadingStrategy(sample: SampleStrategyRecord):
         return InwardPointingHeadings(sample.numTheta)
 
 
-def makeEtsp2Dtsp(type: Etsp2DtspType):
+def makeEtsp2Dtsp(type: Etsp2DtspType, numTheta: int = 8, numPhi: int = 1):
     '''
     factory method for creating method to convert 3D ETSP to a 3D DTSP
 
@@ -143,6 +162,10 @@ def makeEtsp2Dtsp(type: Etsp2DtspType):
     ----------
     type; Etsp2DtspType
         enum for selecting method
+    numTheta: int
+        number of headings per vertex for dynamic programming
+    numPhi: int
+        number of pitch angles per vertex for dynamic programming
     '''
     if type == Etsp2DtspType.UNKNOWN:
         return Etsp2Dtsp()
@@ -152,6 +175,8 @@ def makeEtsp2Dtsp(type: Etsp2DtspType):
         return AlternatingBisector()
     elif type == Etsp2DtspType.BISECTOR:
         return AngleBisector()
+    elif type == Etsp2DtspType.DYNAMIC_PROGRAMMING:
+        return DynamicProgramming(RustVanaAirplane(), numTheta, numPhi)
 
 
 def makeVerificationStrategy(type: VerificationType):
@@ -200,7 +225,11 @@ def makeEdgeSolver(edgeRecord: EdgeStrategyRecord, sampleRecord: SampleStrategyR
             edgeRecord.flightAngleBounds[1],
             edgeRecord.radius,
             RustVanaAirplane(),
-            makeEtsp2Dtsp(edgeRecord.etsp2DTSPType)
+            makeEtsp2Dtsp(
+                edgeRecord.etsp2DTSPType,
+                edgeRecord.headingResolution,
+                edgeRecord.pitchResolution
+            )
         )
 
     if edgeRecord.modification == EdgeModification.DWELL:
@@ -1,4 +1,10 @@
 from .collectionStore import CollectionStore, CollectionStoreFactory
 from .readObj import readObj
+from .meshSidecar import readSidecar, writeSidecar, readSidecarMeta, sidecarFolder
 from .environmentStore import MeshStore
-from .intersectionStore import IntersectionStore, DriveIntersectionStore
+from .sharedMeshes import SharedMesh, SharedMeshes
+from .meshGeometry import MeshGeometry
+from .regionCache import RegionCache
+from .intersectionStore import IntersectionStore, DriveIntersectionStore, SliceIntersectionStore
+from .intersectionPool import IntersectionPool, MeshRef
+from .intersectionCache import IntersectionCache
@@ -5,6 +5,7 @@ import json
 from typing import TypeVar, Generic, Iterable, Callable
 from pymongo.collection import Collection
 from pymongo.mongo_client import MongoClient
+from pymongo import UpdateOne
 import numpy as np
 import uuid
 from functools import cmp_to_key
@@ -129,6 +130,18 @@ class CollectionStore(Generic[T]):
         '''
         raise NotImplementedError()
 
+    def updateFields(self, updates: 'dict'):
+        '''
+        set fields on many items in one operation. updates maps an _id to a dict of fields to set
+        {id: {'verified': 1}} sets the verified field of the item with _id id
+
+        Parameters
+        ----------
+        updates: dict[Any, dict]
+            fields to set keyed by _id
+        '''
+        raise NotImplementedError()
+
     def removeItem(self, id):
         '''
         remove an item with the _id
@@ -149,7 +162,7 @@ class CollectionStore(Generic[T]):
 class MongoCollectionStore(CollectionStore[T]):
     def __init__(self, name, factory: Callable[[dict], T]):
         super().__init__(name, factory)
-        self.client: MongoClient = MongoFactory.getDatabase()
+        self.client: MongoClient = MongoFactory.getMongoClient()
         self.collection: Collection = self.client.get_collection(name)
 
     def getItems(self) -> 'list[T]':
@@ -236,6 +249,14 @@ class MongoCollectionStore(CollectionStore[T]):
     def updateItem(self, item):
         self.collection.replace_one({'_id': item._id}, asdict(item))
 
+    def updateFields(self, updates: 'dict'):
+        if len(updates) == 0:
+            return
+        self.collection.bulk_write(
+            [UpdateOne({'_id': id}, {'$set': fields}) for id, fields in updates.items()],
+            ordered=False
+        )
+
     def removeItem(self, id):
         return self.collection.delete_one({'_id': id})
 
@@ -304,7 +325,21 @@ class FileCollectionStore(CollectionStore[T]):
                     return value * (1 if ap < bp else -1)
             return 0
 
-        return map(self.factory, sorted(self.items, key=cmp_to_key(compare)))
+        def matches(item):
+            for keys, value in (search or {}).items():
+                if value is None:
+                    # unset search terms match everything
+                    continue
+                field = item
+                for key in keys.split('.'):
+                    if not isinstance(field, dict) or key not in field:
+                        return False
+                    field = field[key]
+                if field != value:
+                    return False
+            return True
+
+        return map(self.factory, sorted(filter(matches, self.items), key=cmp_to_key(compare)))
 
     def getItemById(self, id):
         item = [self.factory(item) for item in self.items if item.get('_id') == str(id)]
@@ -320,6 +355,13 @@ class FileCollectionStore(CollectionStore[T]):
             if item._id == self.items[i]['_id']:
                 self.items[i].update(asdict(item, dict_factory=dict_factory_json))
 
+    def updateFields(self, updates: 'dict'):
+        updates = {str(id): fields for id, fields in updates.items()}
+        for item in self.items:
+            fields = updates.get(item.get('_id'))
+            if fields is not None:
+                item.update(fields)
+
     def hasId(self, id):
         for item in self.items:
             if item['_id'] == id:
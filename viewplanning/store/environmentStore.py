@@ -2,13 +2,20 @@ import pyvista as pv
 import numpy as np
 import os
 import logging
+from collections import OrderedDict
+from viewplanning.configuration import ConfigurationFactory
+from .readObj import readObj
+from .regionCache import RegionCache
 
 
-CACHE_SIZE = 50
+# 1 GiB
+BUDGET = 2 ** 30
+
 
 class MeshStore:
     '''
-    store meshes in a memory cache
+    least recently used cache of meshes read from files. Meshes are keyed by the path and modification time of the file
+    and the rotation, and the least recently used meshes are dropped when the meshes take more than the byte budget.
     '''
     __instance: 'dict[int, MeshStore]' = {}
 
@@ -17,16 +24,66 @@ class MeshStore:
         '''get a mesh store for the current process'''
         pid = os.getpid()
         if pid not in MeshStore.__instance:
-            MeshStore.__instance[pid] = MeshStore()
+            config = ConfigurationFactory.getInstance()
+            config = {} if config is None else config.get('meshes', {})
+            MeshStore.__instance[pid] = MeshStore(config.get('bytes', BUDGET), RegionCache.getInstance())
+            # processes forked from a worker use the meshes it was given in shared memory
+            parent = MeshStore.__instance.get(os.getppid())
+            if parent is not None:
+                MeshStore.__instance[pid].useShared(parent.shared)
         return MeshStore.__instance[pid]
 
-    def __init__(self) -> None:
+    def __init__(self, budget: int = BUDGET, regions: RegionCache = None) -> None:
+        '''
+        This class is designed as a singleton use getInstance
+
+        Parameters
+        ----------
+        budget: int
+            bytes the meshes can take before the least recently used are dropped
+        regions: RegionCache | None
+            precomputed artifacts the meshes are read from when they are current
         '''
-        This class is designed as a singleton don't call this
+        self.budget = budget
+        self.regions = regions
+        self.items: 'OrderedDict[tuple, tuple[pv.PolyData, int]]' = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # meshes in shared memory by key, they are attached when first used and never evicted
+        self.shared: 'dict[tuple, SharedMesh]' = {}
+        self.attached: 'dict[tuple, pv.PolyData]' = {}
+        self.blocks = []
+
+    @staticmethod
+    def key(file, rotationMatrix) -> tuple:
         '''
-        self.items = {}
-        self.queue = []
+        key of a mesh, the same file can be loaded with different rotations
 
+        Parameters
+        ----------
+        file: str
+            path to mesh file
+        rotationMatrix: np.ndarray
+            SO(3) to rotate the mesh with
+
+        Returns
+        -------
+        tuple
+        '''
+        return (os.path.abspath(file), os.path.getmtime(file), tuple(np.asarray(rotationMatrix, dtype=float).ravel()))
+
+    def useShared(self, meshes: 'dict[tuple, SharedMesh]'):
+        '''
+        use meshes published in shared memory instead of reading them
+
+        Parameters
+        ----------
+        meshes: dict[tuple, SharedMesh]
+            shared meshes by key
+        '''
+        self.shared = dict(meshes)
 
     def getMesh(self, file, rotationMatrix):
         '''
@@ -41,26 +98,71 @@ class MeshStore:
         '''
         if not os.path.exists(file):
             raise FileNotFoundError()
-        if file in self.items.keys():
-            return self.items[file]
-        if len(self.queue) >= CACHE_SIZE:
+        key = MeshStore.key(file, rotationMatrix)
+        if key in self.shared:
+            if key not in self.attached:
+                self.misses += 1
+                self.attached[key], block = self.shared[key].attach()
+                if block is not None:
+                    self.blocks.append(block)
+            else:
+                self.hits += 1
+            return self.attached[key]
+        item = self.items.get(key)
+        if item is not None:
+            self.hits += 1
+            self.items.move_to_end(key)
+            return item[0]
+        self.misses += 1
+
+        environment = self.regions.getMesh(file, rotationMatrix) if self.regions is not None else None
+        if environment is None:
+            environment = readObj(file, rotationMatrix)
+        # vtk reports KiB
+        size = environment.actual_memory_size * 1024
+        self.items[key] = (environment, size)
+        self.bytes += size
+        # the newest mesh is kept even when it is over the budget alone
+        while self.bytes > self.budget and len(self.items) > 1:
             logging.debug('popping mesh cache')
-            key = self.queue.pop()
-            self.items.pop(key)
-
-        reader = pv.get_reader(file)
-        environment: pv.PolyData = reader.read()
-        transform = np.eye(4)
-        transform[:3, :3] = rotationMatrix
-        environment.transform(transform)
-        environment = environment.triangulate()
-        self.items[file] = environment
-        self.queue.append(file)
+            _, (_, evicted) = self.items.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
         return environment
 
     def clearCache(self):
         '''
         empty the store's cache of meshes
         '''
-        self.queue.clear()
         self.items.clear()
+        self.bytes = 0
+
+    def stats(self) -> 'dict[str, float]':
+        '''
+        usage of the cache
+
+        Returns
+        -------
+        dict[str, float]
+            hits, misses, hit rate, evictions, number of meshes, bytes of the meshes and number of attached shared meshes
+        '''
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': self.hits / total if total > 0 else 0.0,
+            'evictions': self.evictions,
+            'items': len(self.items),
+            'bytes': self.bytes,
+            'shared': len(self.attached)
+        }
+
+    def logStats(self):
+        '''
+        log the usage of the cache
+        '''
+        stats = self.stats()
+        logging.info(
+            f'mesh store pid {os.getpid()} {stats["hits"]} hits {stats["misses"]} misses hit rate {stats["hitRate"]:.2%} '
+            f'{stats["items"]} meshes {stats["bytes"] / 2 ** 20:.1f}MiB {stats["evictions"]} evictions '
+            f'{stats["shared"]} shared meshes')
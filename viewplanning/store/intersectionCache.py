@@ -0,0 +1,364 @@
+import pyvista as pv
+import hashlib
+import logging
+import fcntl
+import os
+from typing import Callable
+from contextlib import ExitStack
+from viewplanning.configuration import ConfigurationFactory
+from .meshGeometry import MeshGeometry
+
+
+# 2 GiB
+BUDGET = 2 ** 31
+# written for pairs that don't intersect
+EMPTY = '.none'
+MESH = '.vtp'
+# bytes counted for every entry so empty markers use part of the budget too
+ENTRY_OVERHEAD = 512
+# file in the lock folder with the running number of bytes of the entries
+SIZE = 'size'
+
+
+class IntersectionCache:
+    '''
+    folder of mesh intersections shared by every process. Entries are keyed by the content of the intersected meshes so
+    the same volumes hit no matter which experiment, id or process asks. Files are written beside the cache and moved
+    in so a reader never sees part of one, a key is computed by one process at a time, and the least recently used
+    entries are deleted when the folder grows past its byte budget. The size of the folder is kept in a file so a write
+    doesn't scan the folder, only an eviction does.
+    '''
+
+    @staticmethod
+    def fromConfig() -> 'IntersectionCache':
+        '''
+        cache in the folder of the intersection cache configuration
+
+        Returns
+        -------
+        IntersectionCache | None
+            None when no folder is configured
+        '''
+        config = ConfigurationFactory.getInstance()
+        config = {} if config is None else config.get('intersection', {}).get('cache', {})
+        folder = config.get('folder', '')
+        if not folder:
+            return None
+        return IntersectionCache(folder, config.get('bytes', BUDGET))
+
+    def __init__(self, folder: str, budget: int = BUDGET):
+        '''
+        Parameters
+        ----------
+        folder: str
+            directory of the cached intersections
+        budget: int
+            bytes the intersections can take before the least recently used are deleted
+        '''
+        self.folder = folder
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.join(folder, 'locks'), exist_ok=True)
+
+    @staticmethod
+    def key(meshes: 'list[pv.PolyData]', method: str = 'boolean') -> str:
+        '''
+        key of the intersection of meshes, intersecting is commutative so the order of the meshes doesn't matter
+
+        Parameters
+        ----------
+        meshes: list[pv.PolyData]
+            meshes that are intersected
+        method: str
+            how the meshes are intersected, methods don't share intersections
+
+        Returns
+        -------
+        str
+        '''
+        digests = sorted(MeshGeometry.of(mesh).digest for mesh in meshes)
+        return hashlib.sha1('-'.join([method] + digests).encode()).hexdigest()
+
+    def get(self, key: str) -> 'tuple[bool, pv.PolyData]':
+        '''
+        read an intersection
+
+        Parameters
+        ----------
+        key: str
+            key of the intersection
+
+        Returns
+        -------
+        tuple[bool, pv.PolyData | None]
+            if the key is cached and the intersection, None for meshes that don't intersect
+        '''
+        found, intersection = self._read(key)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found, intersection
+
+    def put(self, key: str, intersection: pv.PolyData):
+        '''
+        write an intersection and evict old entries when the cache is over budget
+
+        Parameters
+        ----------
+        key: str
+            key of the intersection
+        intersection: pv.PolyData | None
+            the intersection, None for meshes that don't intersect
+        '''
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        extension = MESH if intersection is not None else EMPTY
+        temp = f'{path}.{os.getpid()}.tmp{extension}'
+        if intersection is None:
+            open(temp, 'wb').close()
+        else:
+            intersection.save(temp)
+        size = max(os.path.getsize(temp), ENTRY_OVERHEAD)
+        try:
+            # an entry that is written again replaces its bytes
+            size -= max(os.path.getsize(path + extension), ENTRY_OVERHEAD)
+        except FileNotFoundError:
+            pass
+        os.replace(temp, path + extension)
+        self._grow(size)
+
+    def getOrCompute(self, key: str, compute: 'Callable[[], tuple[pv.PolyData, bool]]') -> pv.PolyData:
+        '''
+        read an intersection or compute and write it. Processes asking for the same key wait for the first one.
+        Intersections that failed aren't written so a crash or timeout isn't taken for meshes that don't intersect.
+
+        Parameters
+        ----------
+        key: str
+            key of the intersection
+        compute: () -> tuple[pv.PolyData | None, bool]
+            computes the intersection on a miss and if computing it failed
+
+        Returns
+        -------
+        pv.PolyData | None
+        '''
+        found, intersection = self._read(key)
+        if not found:
+            with self._claim(key):
+                found, intersection = self._read(key)
+                if not found:
+                    self.misses += 1
+                    intersection, failed = compute()
+                    if not failed:
+                        self.put(key, intersection)
+                    return intersection
+        self.hits += 1
+        return intersection
+
+    def getOrComputeMany(self, keys: 'list[str]', compute: 'Callable[[list[int]], tuple[list[pv.PolyData], list[int]]]') -> 'list[pv.PolyData]':
+        '''
+        the batched form of getOrCompute, the missing keys are computed together while this process claims them. Keys
+        claimed by other processes are waited for after the rest are computed.
+
+        Parameters
+        ----------
+        keys: list[str]
+            keys of the intersections
+        compute: (list[int]) -> tuple[list[pv.PolyData | None], list[int]]
+            computes the intersections of the keys at the indices on a miss, and the positions in the list of indices
+            that failed
+
+        Returns
+        -------
+        list[pv.PolyData | None]
+        '''
+        results = [None] * len(keys)
+        todo = []
+        for k, key in enumerate(keys):
+            found, results[k] = self._read(key)
+            if found:
+                self.hits += 1
+            else:
+                todo.append(k)
+        if len(todo) == 0:
+            return results
+        waiting = []
+        with ExitStack() as stack:
+            claimed = {}
+            for k in todo:
+                if keys[k] not in claimed:
+                    claimed[keys[k]] = self._claim(keys[k], block=False)
+                    if claimed[keys[k]] is not None:
+                        stack.enter_context(claimed[keys[k]])
+                if claimed[keys[k]] is None:
+                    waiting.append(k)
+            self._computeClaimed(keys, [k for k in todo if claimed[keys[k]] is not None], compute, results)
+        if len(waiting) > 0:
+            # claims are taken in order so processes waiting for overlapping keys can't deadlock
+            with ExitStack() as stack:
+                for key in sorted({keys[k] for k in waiting}):
+                    stack.enter_context(self._claim(key))
+                self._computeClaimed(keys, waiting, compute, results)
+        return results
+
+    def _computeClaimed(self, keys: 'list[str]', todo: 'list[int]', compute, results: list):
+        '''
+        read claimed keys again, another process may have written them, and compute the ones that are still missing
+        '''
+        missing = []
+        for k in todo:
+            found, results[k] = self._read(keys[k])
+            if found:
+                self.hits += 1
+            else:
+                missing.append(k)
+        self.misses += len(missing)
+        if len(missing) > 0:
+            intersections, failed = compute(missing)
+            failed = set(failed)
+            for m, (k, intersection) in enumerate(zip(missing, intersections)):
+                results[k] = intersection
+                if m not in failed:
+                    self.put(keys[k], intersection)
+
+    def stats(self) -> 'dict[str, float]':
+        '''
+        usage of the cache by this process and size of the folder
+
+        Returns
+        -------
+        dict[str, float]
+            hits, misses, hit rate, evictions, number of intersections and bytes of the folder
+        '''
+        entries = self._entries()
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': self.hits / total if total > 0 else 0.0,
+            'evictions': self.evictions,
+            'items': len(entries),
+            'bytes': sum(size for _, size, _ in entries)
+        }
+
+    def logStats(self):
+        '''
+        log the usage of the cache
+        '''
+        stats = self.stats()
+        logging.info(
+            f'intersection cache pid {os.getpid()} {stats["hits"]} hits {stats["misses"]} misses hit rate '
+            f'{stats["hitRate"]:.2%} {stats["items"]} intersections {stats["bytes"] / 2 ** 20:.1f}MiB '
+            f'{stats["evictions"]} evictions')
+
+    def _read(self, key: str) -> 'tuple[bool, pv.PolyData]':
+        path = self._path(key)
+        for extension in (MESH, EMPTY):
+            try:
+                # the modification time orders entries for eviction
+                os.utime(path + extension)
+            except FileNotFoundError:
+                continue
+            try:
+                return True, pv.read(path + MESH) if extension == MESH else None
+            except (OSError, ValueError) as e:
+                logging.warning(f'failed to read cached intersection {path + extension}: {e}')
+        return False, None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.folder, key[:2], key)
+
+    def _claim(self, key: str, block: bool = True):
+        '''
+        lock of a key so one process at a time computes it, the lock is released when the file is closed
+
+        Parameters
+        ----------
+        key: str
+            key of the intersection
+        block: bool
+            wait for another process that holds the lock
+
+        Returns
+        -------
+        file | None
+            open lock file, None when another process holds the lock and block is False
+        '''
+        path = self._claimPath(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(path, 'a')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if block else fcntl.LOCK_NB))
+        except BlockingIOError:
+            f.close()
+            return None
+        return f
+
+    def _claimPath(self, key: str) -> str:
+        return os.path.join(self.folder, 'locks', key[:2], f'{key}.lock')
+
+    def _entries(self) -> 'list[tuple[float, int, str]]':
+        entries = []
+        for directory in os.scandir(self.folder):
+            if not directory.is_dir() or directory.name == 'locks':
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith(MESH) or entry.name.endswith(EMPTY):
+                    if '.tmp' in entry.name:
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, max(stat.st_size, ENTRY_OVERHEAD), entry.path))
+        return entries
+
+    def _grow(self, delta: int):
+        '''
+        add to the running size of the folder and evict old entries when it is over budget
+        '''
+        with open(os.path.join(self.folder, 'locks', 'evict.lock'), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                path = os.path.join(self.folder, 'locks', SIZE)
+                try:
+                    with open(path) as sizeFile:
+                        size = int(sizeFile.read()) + delta
+                except (FileNotFoundError, ValueError):
+                    # the first write or a size file that was cut short, the scan already counts the new entry
+                    size = sum(entrySize for _, entrySize, _ in self._entries())
+                if size > self.budget:
+                    size = self._evict()
+                with open(path, 'w') as sizeFile:
+                    sizeFile.write(str(size))
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _evict(self) -> int:
+        '''
+        delete the least recently used entries until the folder is within budget, the caller holds the evict lock
+
+        Returns
+        -------
+        int
+            bytes of the entries that are left
+        '''
+        entries = self._entries()
+        # the scan also corrects the running size for entries other processes were killed before counting
+        size = sum(size for _, size, _ in entries)
+        for _, entrySize, path in sorted(entries):
+            if size <= self.budget:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+                # a process that still holds the claim only computes the key again
+                os.remove(self._claimPath(os.path.basename(path).split('.')[0]))
+            except FileNotFoundError:
+                pass
+            size -= entrySize
+        return size
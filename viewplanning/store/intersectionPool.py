@@ -0,0 +1,288 @@
+import pyvista as pv
+import numpy as np
+import os
+import time
+import logging
+import pymeshfix as mf
+import multiprocessing
+from multiprocessing.connection import wait
+from dataclasses import dataclass
+from viewplanning.configuration import ConfigurationFactory
+from .environmentStore import MeshStore
+
+
+APPROX_ZERO = 1e-2
+# seconds a worker gets for one job before it is restarted
+TIMEOUT = 10
+WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+@dataclass(frozen=True)
+class MeshRef:
+    '''a mesh workers load from their own MeshStore instead of receiving it through a pipe'''
+    file: str
+    # row major rotation matrix
+    rotation: tuple
+
+    @staticmethod
+    def fromRegion(region) -> 'MeshRef':
+        '''
+        reference to the mesh of a region
+
+        Parameters
+        ----------
+        region: Region
+            region with a mesh file
+
+        Returns
+        -------
+        MeshRef
+        '''
+        return MeshRef(region.file, tuple(np.asarray(region.rotationMatrix, dtype=float).ravel()))
+
+    def load(self) -> pv.PolyData:
+        '''
+        read the mesh from the mesh store of the current process
+
+        Returns
+        -------
+        pv.PolyData
+        '''
+        return MeshStore.getInstance().getMesh(self.file, np.reshape(self.rotation, [3, 3]))
+
+
+@dataclass(frozen=True)
+class WorkerError:
+    '''sent back by a worker whose job raised, so it isn't mistaken for meshes that don't intersect'''
+    message: str
+
+
+class IntersectionPool:
+    '''
+    long lived worker processes that intersect meshes. Booleans sometimes crash or hang without an exception, so they
+    run outside the calling process. A worker is only restarted when it dies or runs over the timeout.
+    '''
+    __instance: 'dict[int, IntersectionPool]' = {}
+
+    @staticmethod
+    def getInstance() -> 'IntersectionPool':
+        '''get an intersection pool for the current process'''
+        pid = os.getpid()
+        if pid not in IntersectionPool.__instance:
+            config = ConfigurationFactory.getInstance()
+            config = {} if config is None else config.get('intersection', {})
+            IntersectionPool.__instance[pid] = IntersectionPool(
+                config.get('workers', WORKERS),
+                config.get('timeout', TIMEOUT)
+            )
+        return IntersectionPool.__instance[pid]
+
+    def __init__(self, workers: int = WORKERS, timeout: float = TIMEOUT):
+        '''
+        This class is designed as a singleton use getInstance
+
+        Parameters
+        ----------
+        workers: int
+            number of worker processes, they are started when the first job is submitted
+        timeout: float
+            seconds a job can run before its worker is restarted and the job fails
+        '''
+        self.timeout = timeout
+        self.processes: 'list[multiprocessing.Process]' = [None] * max(1, workers)
+        self.connections: 'list[multiprocessing.connection.Connection]' = [None] * max(1, workers)
+        self.restarts = 0
+        # jobs of the last map that raised or whose worker crashed or timed out
+        self.failed: 'list[int]' = []
+
+    def intersect(self, a: 'pv.PolyData | MeshRef', b: 'pv.PolyData | MeshRef') -> pv.PolyData:
+        '''
+        intersect two meshes
+
+        Parameters
+        ----------
+        a: pv.PolyData | MeshRef
+            mesh a
+        b: pv.PolyData | MeshRef
+            mesh b
+
+        Returns
+        -------
+        pv.PolyData | None
+            mesh intersection
+        '''
+        return self.map([[a, b]])[0]
+
+    def map(self, jobs: 'list[list[pv.PolyData | MeshRef]]') -> 'list[pv.PolyData]':
+        '''
+        intersect groups of meshes in parallel. Each group is intersected in order, a failed step fails the group.
+
+        Parameters
+        ----------
+        jobs: list[list[pv.PolyData | MeshRef]]
+            groups of meshes, references are cheaper to send than meshes
+
+        Returns
+        -------
+        list[pv.PolyData | None]
+            intersection of every group, None where the meshes don't intersect or the intersection failed. The jobs
+            that raised or whose worker crashed or timed out are in failed.
+        '''
+        self.failed = []
+        results = [None] * len(jobs)
+        pending = list(range(len(jobs)))[::-1]
+        # worker index to job index and start time
+        running: 'dict[int, tuple[int, float]]' = {}
+        while pending or running:
+            for w in range(len(self.processes)):
+                if w in running or not pending:
+                    continue
+                i = pending.pop()
+                self._ensureWorker(w)
+                self.connections[w].send(jobs[i])
+                running[w] = (i, time.monotonic())
+            ready = wait([self.connections[w] for w in running], timeout=min(1.0, self.timeout))
+            for w in list(running):
+                i, start = running[w]
+                if self.connections[w] in ready:
+                    try:
+                        results[i] = self.connections[w].recv()
+                        if isinstance(results[i], WorkerError):
+                            logging.warning(f'intersection failed: {results[i].message}')
+                            results[i] = None
+                            self.failed.append(i)
+                    except (EOFError, OSError):
+                        logging.warning(f'intersection worker {self.processes[w].pid} crashed')
+                        self.failed.append(i)
+                        self._restart(w)
+                    running.pop(w)
+                elif time.monotonic() - start > self.timeout:
+                    logging.warning(f'intersection timed out after {self.timeout}s')
+                    self.failed.append(i)
+                    self._restart(w)
+                    running.pop(w)
+        return results
+
+    def close(self):
+        '''
+        stop the workers
+        '''
+        for w in range(len(self.processes)):
+            if self.processes[w] is None:
+                continue
+            try:
+                self.connections[w].send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.processes[w].join(timeout=1)
+            if self.processes[w].is_alive():
+                self.processes[w].terminate()
+            self.connections[w].close()
+            self.processes[w] = None
+            self.connections[w] = None
+
+    def _ensureWorker(self, w: int):
+        if self.processes[w] is not None and self.processes[w].is_alive():
+            return
+        if self.processes[w] is not None:
+            self._restart(w)
+            return
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_work, args=[child], name=f'intersect_{w}', daemon=True)
+        process.start()
+        child.close()
+        self.processes[w] = process
+        self.connections[w] = parent
+
+    def _restart(self, w: int):
+        self.processes[w].terminate()
+        self.processes[w].join()
+        self.connections[w].close()
+        self.processes[w] = None
+        self.connections[w] = None
+        self.restarts += 1
+        self._ensureWorker(w)
+
+
+def _work(connection):
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        try:
+            result = intersectGroup([m.load() if isinstance(m, MeshRef) else m for m in job])
+        except Exception as e:
+            logging.exception('intersection failed')
+            result = WorkerError(repr(e))
+        connection.send(result)
+
+
+def intersectGroup(meshes: 'list[pv.PolyData]') -> pv.PolyData:
+    '''
+    intersect meshes one after the other in the current process
+
+    Parameters
+    ----------
+    meshes: list[pv.PolyData]
+        meshes to intersect
+
+    Returns
+    -------
+    pv.PolyData | None
+        mesh intersection
+    '''
+    result = meshes[0]
+    for b in meshes[1:]:
+        _, _, _, _, az0, _ = result.bounds
+        _, _, _, _, bz0, _ = b.bounds
+        if abs(bz0 - az0) < APPROX_ZERO:
+            b: pv.PolyData = b.transform(np.array([
+                [1, 0, 0, 0],
+                [0, 1, 0, 0],
+                [0, 0, 1, APPROX_ZERO],
+                [0, 0, 0, 1]
+            ]), inplace=False)
+        _, numCollisions = result.collision(b, contact_mode=1)
+        if numCollisions <= 0:
+            return None
+        result = booleanIntersection(result, b)
+        if result is None or result.n_cells <= 0:
+            return None
+    return result
+
+
+def booleanIntersection(a: pv.PolyData, b: pv.PolyData) -> pv.PolyData:
+    '''
+    intersect two meshes with pyvista and repair the result
+
+    Parameters
+    ----------
+    a: pv.PolyData
+        mesh a
+    b: pv.PolyData
+        mesh b
+
+    Returns
+    -------
+    pv.PolyData | None
+        mesh intersection
+    '''
+    intersection = a.boolean_intersection(b)
+    if intersection.number_of_cells <= 0:
+        b: pv.PolyData = b.transform(np.array([
+            [1, 0, 0, 0],
+            [0, 1, 0, 0],
+            [0, 0, 1, APPROX_ZERO * 10],
+            [0, 0, 0, 1]
+        ]), inplace=False)
+        intersection = b.boolean_intersection(a)
+    intersection = intersection.triangulate()
+    if not intersection.is_all_triangles:
+        logging.warn('failed to triangulate two meshes')
+        return None
+    meshfix = mf.MeshFix(intersection)
+    meshfix.repair()
+    return meshfix.mesh
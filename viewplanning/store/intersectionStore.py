@@ -2,10 +2,12 @@ import pyvista as pv
 import numpy as np
 import os
 import logging
-import pymeshfix as mf
 from viewplanning.configuration import ConfigurationFactory
+from .intersectionPool import IntersectionPool, MeshRef
+from .intersectionCache import IntersectionCache
+from viewplanning.sampling.polygonStack import PolygonStack, LEVELS
+from collections import OrderedDict
 import subprocess
-import multiprocessing
 
 
 
@@ -15,13 +17,22 @@ APPROX_ZERO = 1e-2
 
 class IntersectionStore:
     '''
-    intersect meshes with pyvista and store the results
+    intersect meshes with pyvista and store the results, the most recent in memory and all of them in the intersection
+    cache when one is configured
     '''
     __instance: 'dict[int, IntersectionStore]' = {}
 
-    def __init__(self):
-        self.lookup: dict[(str, str), pv.PolyData] = {}
-        self.queue = []
+    def __init__(self, cache: IntersectionCache = None):
+        '''
+        Parameters
+        ----------
+        cache: IntersectionCache = None
+            cache shared with other processes
+        '''
+        self.lookup: 'OrderedDict[tuple[str, str], pv.PolyData]' = OrderedDict()
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
 
     def intersect(self, a: pv.PolyData, b: pv.PolyData, aId: str, bId: str):
         '''
@@ -42,41 +53,113 @@ class IntersectionStore:
         -------
         mehs intersection of a and b
         '''
-        if (aId, bId) in self.lookup:
-            return self.lookup[(aId, bId)]
-        if (bId, aId) in self.lookup:
-            return self.lookup[(aId, bId)]
-        _, _, _, _, az0, _ = a.bounds
-        _, _, _, _, bz0, _ = b.bounds
-        if abs(bz0 - az0) < APPROX_ZERO:
-            b: pv.PolyData = b.transform(np.array([
-                [1, 0, 0, 0],
-                [0, 1, 0, 0],
-                [0, 0, 1, APPROX_ZERO],
-                [0, 0, 0, 1]
-            ]))
-        _, numCollisions = a.collision(b, contact_mode=1)
-        if numCollisions <= 0:
+        for key in ((aId, bId), (bId, aId)):
+            if key in self.lookup:
+                self.hits += 1
+                self.lookup.move_to_end(key)
+                return self.lookup[key]
+        self.misses += 1
+        # the worker moves b up when the bottoms line up and checks for a collision before the boolean
+        if self.cache is not None:
+            def compute():
+                intersections, failed = self._compute([[a, b]])
+                return intersections[0], len(failed) > 0
+            intersection = self.cache.getOrCompute(self._key([a, b]), compute)
+        else:
+            intersections, _ = self._compute([[a, b]])
+            intersection = intersections[0]
+        if intersection is None:
             return None
-        
-        if len(self.queue) >= CACHE_SIZE:
-            logging.debug('popping intersection cache')
-            key = self.queue.pop()
-            self.lookup.pop(key)
+        self._insert((aId, bId), intersection)
+        return intersection
 
-        intersection = pyVistaIntersection(a, b)
+    def intersectPairs(self, pairs: 'list[tuple[pv.PolyData, pv.PolyData]]', ids: 'list[tuple[str, str]]', jobs: 'list[list[pv.PolyData | MeshRef]]' = None) -> 'list[pv.PolyData]':
+        '''
+        intersect pairs of meshes in parallel with the intersection pool
 
-        self.lookup[(aId, bId)] = intersection
-        self.queue.append((aId, bId))
-        return intersection
+        Parameters
+        ----------
+        pairs: list[tuple[pv.PolyData, pv.PolyData]]
+            meshes to intersect
+        ids: list[tuple[str, str]]
+            ids of the meshes of every pair
+        jobs: list[list[pv.PolyData | MeshRef]] = None
+            what to send to the workers for every pair, references are cheaper to send than meshes. The pairs by
+            default.
+
+        Returns
+        -------
+        list[pv.PolyData | None]
+            intersection of every pair
+        '''
+        jobs = [list(pair) for pair in pairs] if jobs is None else jobs
+        results = [None] * len(pairs)
+        todo = []
+        for k, (aId, bId) in enumerate(ids):
+            key = next((key for key in ((aId, bId), (bId, aId)) if key in self.lookup), None)
+            if key is not None:
+                self.hits += 1
+                self.lookup.move_to_end(key)
+                results[k] = self.lookup[key]
+                continue
+            self.misses += 1
+            todo.append(k)
+        if self.cache is not None:
+            # like intersect, a key is computed by one process and the others wait for it
+            computed = self.cache.getOrComputeMany(
+                [self._key(pairs[k]) for k in todo],
+                lambda missing: self._compute([jobs[todo[m]] for m in missing])
+            )
+        else:
+            computed, _ = self._compute([jobs[k] for k in todo])
+        for k, intersection in zip(todo, computed):
+            results[k] = intersection
+            if intersection is not None:
+                self._insert(ids[k], intersection)
+        return results
+
+    @staticmethod
+    def groupKey(group: 'list[int]', regions: 'list') -> 'tuple[str, str]':
+        '''
+        ids of a group of regions in the cache, the ids of all but the last mesh joined with - and the id of the last
+        '''
+        names = [os.path.basename(regions[i].file) for i in group]
+        return '-'.join(names[:-1]), names[-1]
+
+    def _compute(self, jobs: 'list[list[pv.PolyData | MeshRef]]') -> 'tuple[list[pv.PolyData], list[int]]':
+        '''
+        intersect groups of meshes with booleans in the intersection pool, and the indices of the groups that failed
+        '''
+        pool = IntersectionPool.getInstance()
+        return pool.map(jobs), list(pool.failed)
+
+    def _key(self, meshes: 'list[pv.PolyData]') -> str:
+        return IntersectionCache.key(meshes, 'boolean')
+
+    def _insert(self, key: 'tuple[str, str]', intersection: pv.PolyData):
+        self.lookup[key] = intersection
+        self.lookup.move_to_end(key)
+        while len(self.lookup) > CACHE_SIZE:
+            logging.debug('popping intersection cache')
+            self.lookup.popitem(last=False)
 
     def clearCache(self):
         '''
         clear in memory cache of intersections
         '''
-        self.queue.clear()
         self.lookup.clear()
 
+    def logStats(self):
+        '''
+        log the usage of the in memory cache and the shared cache
+        '''
+        total = self.hits + self.misses
+        logging.info(
+            f'intersection store pid {os.getpid()} {self.hits} hits {self.misses} misses hit rate '
+            f'{self.hits / total if total > 0 else 0.0:.2%} {len(self.lookup)} intersections')
+        if self.cache is not None:
+            self.cache.logStats()
+
     @ staticmethod
     def getInstance():
         '''get an intersection store for the current process id'''
@@ -87,10 +170,43 @@ class IntersectionStore:
             if config['intersection']['type'] == 'drive':
                 IntersectionStore.__instance[pid] = DriveIntersectionStore(config['intersection']['folder'])
             elif config['intersection']['type'] == 'memory':
-                IntersectionStore.__instance[pid] = IntersectionStore()
+                IntersectionStore.__instance[pid] = IntersectionStore(IntersectionCache.fromConfig())
+            elif config['intersection']['type'] == 'slices':
+                IntersectionStore.__instance[pid] = SliceIntersectionStore(
+                    IntersectionCache.fromConfig(),
+                    config['intersection'].get('levels', LEVELS)
+                )
         return IntersectionStore.__instance[pid]
 
 
+class SliceIntersectionStore(IntersectionStore):
+    '''
+    approximate intersections of visibility volumes from the intersection of their slices, see PolygonStack. It runs
+    in the calling process since shapely doesn't crash like mesh booleans.
+    '''
+    def __init__(self, cache: IntersectionCache = None, levels: int = LEVELS):
+        '''
+        Parameters
+        ----------
+        cache: IntersectionCache = None
+            cache shared with other processes
+        levels: int
+            number of slabs of an intersection
+        '''
+        super().__init__(cache)
+        self.levels = levels
+
+    def _compute(self, jobs: 'list[list[pv.PolyData | MeshRef]]') -> 'tuple[list[pv.PolyData], list[int]]':
+        results = []
+        for job in jobs:
+            stack = PolygonStack.intersect([m.load() if isinstance(m, MeshRef) else m for m in job], self.levels)
+            results.append(stack.toMesh() if stack is not None else None)
+        return results, []
+
+    def _key(self, meshes: 'list[pv.PolyData]') -> str:
+        return IntersectionCache.key(meshes, f'slices{self.levels}')
+
+
 class DriveIntersectionStore(IntersectionStore):
     '''get intersections stored in a folder'''
     def __init__(self, folder=None, write=False, blender=False):
@@ -104,16 +220,14 @@ class DriveIntersectionStore(IntersectionStore):
         blender: bool
             use blender isntead of pyvista to calculate intersections
         '''
+        super().__init__()
         self.folder = folder
         self.write = write
         self.blender = blender
 
     def intersect(self, a: pv.PolyData, b: pv.PolyData, aId: str, bId: str):
-        if os.path.exists(self.folder + self.transformIds(aId, bId)):
-            file = self.folder + self.transformIds(aId, bId)
-        elif os.path.exists(self.folder + self.transformIds(bId, aId)):
-            file = self.folder + self.transformIds(bId, aId)
-        else:
+        file = self.path(aId, bId)
+        if file is None:
             if self.write and not self.blender:
                 return self.store(a, b, aId, bId)
             elif self.write and self.blender:
@@ -132,12 +246,13 @@ class DriveIntersectionStore(IntersectionStore):
 
 
         if abs(bz0 - az0) < APPROX_ZERO:
+            # copy so the caller's mesh, which may be shared through MeshStore, isn't moved
             b: pv.PolyData = b.transform(np.array([
                 [1, 0, 0, 0],
                 [0, 1, 0, 0],
                 [0, 0, 1, APPROX_ZERO],
                 [0, 0, 0, 1]
-            ]))
+            ]), inplace=False)
         # bounding box intersection
         if bx0 > ax1 or bx1 < ax0 or by0 > ay1 or by1 < ay0 or bz0 > az1 or bz1 < az0:
             return None
@@ -149,6 +264,50 @@ class DriveIntersectionStore(IntersectionStore):
         intersection.save(file)
         return intersection
     
+    def intersectPairs(self, pairs: 'list[tuple[pv.PolyData, pv.PolyData]]', ids: 'list[tuple[str, str]]', jobs: 'list[list[pv.PolyData | MeshRef]]' = None) -> 'list[pv.PolyData]':
+        return [self.intersect(a, b, aId, bId) for (a, b), (aId, bId) in zip(pairs, ids)]
+
+    def path(self, aId: str, bId: str) -> str:
+        '''
+        file of the intersection of a and b in the folder
+
+        Parameters
+        ----------
+        aId: str
+            id of mesh a
+        bId: str
+            id of mesh b
+
+        Returns
+        -------
+        str | None
+            None when the folder doesn't have the intersection
+        '''
+        for file in (self.transformIds(aId, bId), self.transformIds(bId, aId)):
+            if os.path.exists(self.folder + file):
+                return self.folder + file
+        return None
+
+    def put(self, aId: str, bId: str, intersection: pv.PolyData):
+        '''
+        write the intersection of a and b to the folder
+
+        Parameters
+        ----------
+        aId: str
+            id of mesh a
+        bId: str
+            id of mesh b
+        intersection: pv.PolyData
+            intersection of the meshes
+        '''
+        file = self.folder + self.transformIds(aId, bId)
+        os.makedirs(os.path.dirname(file) or '.', exist_ok=True)
+        # written beside the file and moved in so a reader never sees part of one
+        temp = f'{file[:-len(".ply")]}.{os.getpid()}.tmp.ply'
+        intersection.save(temp)
+        os.replace(temp, file)
+
     def transformIds(self, aId, bId):
         return aId.replace('.ply', '') + '--' + bId.replace('.ply', '') + '.ply'
     
@@ -194,7 +353,7 @@ def blenderIntersection(a, b, out):
 
 def pyVistaIntersection(a, b):
     '''
-    use pyvista to intersect meshes
+    use pyvista to intersect meshes in a worker of the intersection pool
 
     Parameters
     ----------
@@ -208,33 +367,4 @@ def pyVistaIntersection(a, b):
     pv.PolyData | None
         mesh intersection
     '''
-    # use seperate process because sometimes intersecion crashes without exception
-    q = multiprocessing.Queue()
-    p = multiprocessing.Process(target=_boolean_intersection, args=[a, b, q])
-    p.start()
-    p.join(timeout=10)
-    if p.exitcode is None:
-        p.terminate()
-        logging.warn('intersection failed')
-        return None
-    intersection = q.get()
-    q.close()
-    return intersection
-
-def _boolean_intersection(a: pv.PolyData, b: pv.PolyData, queue: multiprocessing.Queue):
-    intersection = a.boolean_intersection(b)
-    if intersection.number_of_cells <= 0:
-        b: pv.PolyData = b.transform(np.array([
-            [1, 0, 0, 0],
-            [0, 1, 0, 0],
-            [0, 0, 1, APPROX_ZERO * 10],
-            [0, 0, 0, 1]
-        ]))
-        intersection = b.boolean_intersection(a)
-    intersection = intersection.triangulate()
-    if not intersection.is_all_triangles:
-        logging.warn('failed to triangulate two meshes')
-        return None
-    meshfix = mf.MeshFix(intersection)
-    meshfix.repair()
-    queue.put(meshfix.mesh)
\ No newline at end of file
+    return IntersectionPool.getInstance().intersect(a, b)
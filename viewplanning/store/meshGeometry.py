@@ -0,0 +1,156 @@
+import numpy as np
+import pyvista as pv
+import weakref
+import hashlib
+from dataclasses import dataclass, field
+
+
+@dataclass(eq=False)
+class MeshGeometry:
+    '''
+    Per face geometry of a triangle mesh, computed once and shared by everything that samples the mesh. Get it with
+    MeshGeometry.of(mesh). An entry lives as long as its mesh, so meshes must not be changed in place after.
+    '''
+    # [F, 3, 3] corners of every triangle
+    triangles: np.ndarray
+    # [F] area of every triangle
+    areas: np.ndarray
+    # [F, 3] unit normal of every triangle
+    normals: np.ndarray
+    # [F] cumulative fraction of the surface area, the last entry is 1
+    cdf: np.ndarray
+    # xmin, xmax, ymin, ymax, zmin, zmax like pv.PolyData.bounds
+    aabb: np.ndarray
+    # enclosed volume, only meaningful for closed meshes
+    volume: float
+    # sha1 of the triangles, equal for meshes with the same triangles
+    digest: str = ''
+    # precomputed slices by z levels and cutoff, the largest polygon, perimeter and area of every level
+    slices: 'dict[tuple, tuple[list, np.ndarray, np.ndarray]]' = field(default_factory=dict)
+
+    @property
+    def area(self) -> float:
+        '''total surface area'''
+        return float(np.sum(self.areas))
+
+    def sampleSurface(self, numPoints: int, rng=np.random) -> 'tuple[np.ndarray, np.ndarray]':
+        '''
+        uniformly random points on the surface. Faces are picked by area with searchsorted on the cdf and points are
+        placed in the faces with barycentric coordinates.
+
+        Parameters
+        ----------
+        numPoints: int
+            number of points
+        rng: np.random.Generator
+            source of the uniform draws, the global numpy state by default
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            [numPoints, 3] points and [numPoints] index of the face each point is on
+        '''
+        faces = np.minimum(np.searchsorted(self.cdf, rng.random(numPoints), side='right'), len(self.cdf) - 1)
+        points = self.triangles[faces]
+        r1 = np.sqrt(rng.random([numPoints, 1]))
+        r2 = rng.random([numPoints, 1])
+        return points[:, 0, :] * (1 - r1) + points[:, 1, :] * r1 * (1 - r2) + points[:, 2, :] * r1 * r2, faces
+
+    @staticmethod
+    def fromMesh(mesh: pv.PolyData) -> 'MeshGeometry':
+        '''
+        compute the geometry of a triangle mesh
+
+        Parameters
+        ----------
+        mesh: pv.PolyData
+            triangulated mesh
+
+        Returns
+        -------
+        MeshGeometry
+        '''
+        points = np.asarray(mesh.points, dtype=float)
+        triangles = points[mesh.faces.reshape(-1, 4)[:, 1:]]
+        a = triangles[:, 1] - triangles[:, 0]
+        b = triangles[:, 2] - triangles[:, 0]
+        cross = np.stack([
+            a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1],
+            a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2],
+            a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+        ], axis=1)
+        doubleAreas = np.linalg.norm(cross, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            normals = np.nan_to_num(cross / doubleAreas[:, None])
+        areas = doubleAreas / 2
+        cdf = np.cumsum(areas)
+        if len(cdf) > 0 and cdf[-1] > 0:
+            cdf /= cdf[-1]
+        # divergence theorem over tetrahedra from the origin
+        volume = abs(np.sum(np.einsum('ij, ij -> i', triangles[:, 0], cross)) / 6)
+        digest = hashlib.sha1(np.ascontiguousarray(triangles).tobytes()).hexdigest()
+        return MeshGeometry(triangles, areas, normals, cdf, np.array(mesh.bounds), float(volume), digest)
+
+    @staticmethod
+    def of(mesh: pv.PolyData) -> 'MeshGeometry':
+        '''
+        geometry of a mesh, computed the first time the mesh is seen
+
+        Parameters
+        ----------
+        mesh: pv.PolyData
+            triangulated mesh
+
+        Returns
+        -------
+        MeshGeometry
+        '''
+        geometry = MeshGeometry.registered(mesh)
+        if geometry is None:
+            geometry = MeshGeometry.fromMesh(mesh)
+            MeshGeometry.register(mesh, geometry)
+        return geometry
+
+    @staticmethod
+    def registered(mesh: pv.PolyData) -> 'MeshGeometry':
+        '''
+        geometry of a mesh if it was already computed or registered
+
+        Parameters
+        ----------
+        mesh: pv.PolyData
+            triangulated mesh
+
+        Returns
+        -------
+        MeshGeometry | None
+        '''
+        item = _geometries.get(id(mesh))
+        if item is not None and item[0]() is mesh:
+            return item[1]
+        return None
+
+    @staticmethod
+    def register(mesh: pv.PolyData, geometry: 'MeshGeometry'):
+        '''
+        use geometry computed elsewhere for a mesh
+
+        Parameters
+        ----------
+        mesh: pv.PolyData
+            triangulated mesh
+        geometry: MeshGeometry
+            geometry of the mesh
+        '''
+        key = id(mesh)
+        _geometries[key] = (weakref.ref(mesh, lambda ref, key=key: _forget(key, ref)), geometry)
+
+
+# id of a mesh to a weak reference of the mesh and its geometry
+_geometries: 'dict[int, tuple[weakref.ref, MeshGeometry]]' = {}
+
+
+def _forget(key: int, ref: weakref.ref):
+    item = _geometries.get(key)
+    if item is not None and item[0] is ref:
+        _geometries.pop(key)
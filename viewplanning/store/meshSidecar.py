@@ -0,0 +1,180 @@
+import pyvista as pv
+import numpy as np
+import hashlib
+import json
+import os
+from vtkmodules.vtkCommonCore import VTK_TYPE_INT64, vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray
+from vtkmodules.util.numpy_support import numpy_to_vtk
+
+
+# bump when the layout of the sidecar changes so old sidecars are ignored
+VERSION = 1
+POINTS = 'points.npy'
+FACES = 'faces.npy'
+META = 'meta.json'
+
+
+def sidecarFolder(file: str, rotationMatrix=np.eye(3)) -> str:
+    '''
+    folder of the sidecar of a mesh rotated by a rotation matrix, every rotation of a file has its own sidecar
+
+    Parameters
+    ----------
+    file: str
+        path to the mesh
+    rotationMatrix: np.ndarray
+        SO(3) the mesh is rotated with
+
+    Returns
+    -------
+    str
+    '''
+    rotation = np.ascontiguousarray(rotationMatrix, dtype=float)
+    return os.path.join(f'{file}.mesh', hashlib.sha1(rotation.tobytes()).hexdigest()[:16])
+
+
+def writeSidecar(file: str, rotationMatrix, mesh: pv.PolyData, folder: str = None) -> str:
+    '''
+    write the rotated and triangulated mesh of a file as numpy arrays the loaders memory map
+
+    Parameters
+    ----------
+    file: str
+        path to the mesh
+    rotationMatrix: np.ndarray
+        SO(3) to rotate the mesh with
+    mesh: pv.PolyData
+        the mesh of the file rotated and triangulated
+    folder: str
+        folder to write the sidecar to, beside the file by default
+
+    Returns
+    -------
+    str
+        folder of the sidecar
+    '''
+    if not mesh.is_all_triangles:
+        raise ValueError(f'{file} is not triangulated')
+    folder = sidecarFolder(file, rotationMatrix) if folder is None else folder
+    os.makedirs(folder, exist_ok=True)
+    stat = os.stat(file)
+    meta = {
+        'version': VERSION,
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'rotation': np.asarray(rotationMatrix, dtype=float).tolist(),
+        'points': int(mesh.n_points),
+        'faces': int(mesh.n_cells),
+        'bounds': list(mesh.bounds),
+        'volume': float(mesh.volume)
+    }
+    # the meta data is moved in last so a sidecar is only valid once its arrays are written
+    for name, array in [
+        (POINTS, np.asarray(mesh.points)),
+        (FACES, np.asarray(mesh.faces, dtype=np.int64).reshape(-1, 4)[:, 1:])
+    ]:
+        temp = os.path.join(folder, f'{os.getpid()}.tmp.{name}')
+        np.save(temp, np.ascontiguousarray(array))
+        os.replace(temp, os.path.join(folder, name))
+    temp = os.path.join(folder, f'{os.getpid()}.tmp.{META}')
+    with open(temp, 'w') as f:
+        json.dump(meta, f)
+    os.replace(temp, os.path.join(folder, META))
+    return folder
+
+
+def readSidecarMeta(file: str, rotationMatrix=np.eye(3), folder: str = None) -> dict:
+    '''
+    meta data of the sidecar of a mesh if the sidecar matches the current file
+
+    Parameters
+    ----------
+    file: str
+        path to the mesh
+    rotationMatrix: np.ndarray
+        SO(3) the mesh is rotated with
+    folder: str
+        folder of the sidecar, beside the file by default
+
+    Returns
+    -------
+    dict | None
+        version, modification time and size of the file, rotation, number of points and faces, bounds and volume.
+        None when there is no sidecar or the file changed since it was written
+    '''
+    folder = sidecarFolder(file, rotationMatrix) if folder is None else folder
+    try:
+        with open(os.path.join(folder, META)) as f:
+            meta = json.load(f)
+        stat = os.stat(file)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != VERSION or meta.get('mtime') != stat.st_mtime_ns or meta.get('size') != stat.st_size:
+        return None
+    if not np.array_equal(meta.get('rotation'), np.asarray(rotationMatrix, dtype=float)):
+        return None
+    return meta
+
+
+def readSidecar(file: str, rotationMatrix=np.eye(3), folder: str = None) -> pv.PolyData:
+    '''
+    memory map the sidecar of a mesh. The points and faces of the mesh use the mapped arrays without copies.
+
+    Parameters
+    ----------
+    file: str
+        path to the mesh
+    rotationMatrix: np.ndarray
+        SO(3) the mesh is rotated with
+    folder: str
+        folder of the sidecar, beside the file by default
+
+    Returns
+    -------
+    pv.PolyData | None
+        the rotated and triangulated mesh, None when there is no valid sidecar
+    '''
+    folder = sidecarFolder(file, rotationMatrix) if folder is None else folder
+    meta = readSidecarMeta(file, rotationMatrix, folder)
+    if meta is None:
+        return None
+    try:
+        # copy on write so a mesh changed in place never writes to the sidecar
+        points = np.load(os.path.join(folder, POINTS), mmap_mode='c')
+        faces = np.load(os.path.join(folder, FACES), mmap_mode='c')
+    except (OSError, ValueError):
+        return None
+    if points.shape != (meta['points'], 3) or faces.shape != (meta['faces'], 3) or faces.dtype != np.int64:
+        return None
+    return meshFromArrays(points, faces)
+
+
+def meshFromArrays(points: np.ndarray, faces: np.ndarray) -> pv.PolyData:
+    '''
+    triangle mesh that uses the memory of its arrays instead of copying them. The arrays must live as long as the mesh,
+    vtk keeps a reference to them.
+
+    Parameters
+    ----------
+    points: np.ndarray
+        [N, 3] points
+    faces: np.ndarray
+        [F, 3] int64 indices of the corners of every triangle
+
+    Returns
+    -------
+    pv.PolyData
+    '''
+    # vtk keeps 64 bit cell arrays as they are, other id arrays are copied and lose the reference to the arrays
+    connectivity = numpy_to_vtk(faces.reshape(-1), deep=False, array_type=VTK_TYPE_INT64)
+    offsets = numpy_to_vtk(np.arange(0, 3 * len(faces) + 1, 3, dtype=np.int64), deep=False, array_type=VTK_TYPE_INT64)
+    cells = vtkCellArray()
+    cells.SetData(offsets, connectivity)
+    vertices = vtkPoints()
+    vertices.SetData(numpy_to_vtk(points, deep=False))
+    # built empty so pyvista doesn't add a vertex cell for every point
+    mesh = pv.PolyData()
+    mesh.SetPoints(vertices)
+    mesh.SetPolys(cells)
+    return mesh
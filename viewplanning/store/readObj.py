@@ -1,10 +1,12 @@
 import numpy as np
 import pyvista as pv
+from .meshSidecar import readSidecar
 
 
-def readObj(fileName, rotationMatrix=np.eye(3)) -> pv.PolyData:
+def readObj(fileName, rotationMatrix=np.eye(3), sidecar=True) -> pv.PolyData:
     '''
-    read meshes from a file and rotate them
+    read meshes from a file and rotate them. A sidecar written for the file and rotation is memory mapped instead of
+    parsing the file.
 
     Parameters
     ----------
@@ -12,12 +14,18 @@ def readObj(fileName, rotationMatrix=np.eye(3)) -> pv.PolyData:
         path to the mesh
     rotationMatrix: np.ndarray
         SO(3) to rotate the mesh with
+    sidecar: bool
+        use the sidecar of the mesh if it has a valid one
     
     Returns
     -------
     pv.PolyData
         mesh
     '''
+    if sidecar:
+        obj = readSidecar(fileName, rotationMatrix)
+        if obj is not None:
+            return obj
     reader = pv.get_reader(fileName)
     obj: pv.PolyData = reader.read()
     transform = np.eye(4)
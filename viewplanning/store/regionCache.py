@@ -0,0 +1,289 @@
+import pyvista as pv
+import numpy as np
+import hashlib
+import logging
+import json
+import glob
+import os
+from shapely import wkb
+from shapely.geometry import Polygon
+from viewplanning.configuration import ConfigurationFactory
+from .meshSidecar import writeSidecar, readSidecar, readSidecarMeta
+from .meshGeometry import MeshGeometry
+
+
+# change when the artifacts change so old ones are ignored
+CACHE_VERSION = 1
+GEOMETRY = 'geometry.npz'
+SLICES = 'slices_{}.npz'
+
+
+class RegionCache:
+    '''
+    versioned folder of the artifacts create precompute writes for regions: the rotated and triangulated mesh, its
+    geometry and slices, and the overlap estimates of the pairs of regions in a group. Regions are keyed by their file
+    and rotation and checked against the modification time and size of the file, so only regions that changed are
+    computed again.
+    '''
+    __instance: 'dict[int, RegionCache]' = {}
+
+    @staticmethod
+    def getInstance() -> 'RegionCache':
+        '''
+        get the region cache in the folder of the configuration for the current process
+
+        Returns
+        -------
+        RegionCache | None
+            None when no folder is configured
+        '''
+        pid = os.getpid()
+        if pid not in RegionCache.__instance:
+            config = ConfigurationFactory.getInstance()
+            config = {} if config is None else config.get('regions', {})
+            folder = config.get('cache', '')
+            RegionCache.__instance[pid] = RegionCache(folder) if folder else None
+        return RegionCache.__instance[pid]
+
+    def __init__(self, folder: str):
+        '''
+        Parameters
+        ----------
+        folder: str
+            directory of the artifacts, every version has its own folder in it
+        '''
+        self.root = folder
+        self.folder = os.path.join(folder, f'v{CACHE_VERSION}')
+        self.hits = 0
+        self.misses = 0
+        # overlap extent by number of levels and the digests of the two meshes, loaded when first used
+        self.extents: 'dict[tuple[int, str, str], float]' = None
+
+    def entry(self, file: str, rotationMatrix) -> str:
+        '''
+        folder of the artifacts of a region
+
+        Parameters
+        ----------
+        file: str
+            path to the mesh of the region
+        rotationMatrix: np.ndarray
+            SO(3) the mesh is rotated with
+
+        Returns
+        -------
+        str
+        '''
+        rotation = np.ascontiguousarray(rotationMatrix, dtype=float)
+        key = hashlib.sha1(os.path.abspath(file).encode() + rotation.tobytes()).hexdigest()
+        return os.path.join(self.folder, 'regions', key)
+
+    def isCurrent(self, file: str, rotationMatrix) -> bool:
+        '''
+        are the artifacts of a region written for the current file
+
+        Parameters
+        ----------
+        file: str
+            path to the mesh of the region
+        rotationMatrix: np.ndarray
+            SO(3) the mesh is rotated with
+
+        Returns
+        -------
+        bool
+        '''
+        return readSidecarMeta(file, rotationMatrix, self.entry(file, rotationMatrix)) is not None
+
+    def put(self, file: str, rotationMatrix, mesh: pv.PolyData, geometry: MeshGeometry):
+        '''
+        write the artifacts of a region
+
+        Parameters
+        ----------
+        file: str
+            path to the mesh of the region
+        rotationMatrix: np.ndarray
+            SO(3) the mesh is rotated with
+        mesh: pv.PolyData
+            the rotated and triangulated mesh
+        geometry: MeshGeometry
+            geometry of the mesh with the slices to keep
+        '''
+        folder = self.entry(file, rotationMatrix)
+        os.makedirs(folder, exist_ok=True)
+        _save(os.path.join(folder, GEOMETRY), {
+            'areas': geometry.areas,
+            'normals': geometry.normals,
+            'cdf': geometry.cdf,
+            'aabb': geometry.aabb,
+            'volume': np.array(geometry.volume),
+            'digest': np.array(geometry.digest)
+        })
+        for path in glob.glob(os.path.join(folder, SLICES.format('*'))):
+            os.remove(path)
+        for i, ((levels, cutoff), (polygons, perimeters, areas)) in enumerate(geometry.slices.items()):
+            data, offsets = _packPolygons(polygons)
+            _save(os.path.join(folder, SLICES.format(i)), {
+                'levels': np.array(levels),
+                'cutoff': np.array(cutoff),
+                'data': data,
+                'offsets': offsets,
+                'perimeters': perimeters,
+                'areas': areas
+            })
+        # the mesh is written last, its meta data makes the entry current
+        writeSidecar(file, rotationMatrix, mesh, folder)
+
+    def getMesh(self, file: str, rotationMatrix) -> pv.PolyData:
+        '''
+        memory map the mesh of a region and register its geometry and slices
+
+        Parameters
+        ----------
+        file: str
+            path to the mesh of the region
+        rotationMatrix: np.ndarray
+            SO(3) the mesh is rotated with
+
+        Returns
+        -------
+        pv.PolyData | None
+            None when the region has no current artifacts
+        '''
+        folder = self.entry(file, rotationMatrix)
+        mesh = readSidecar(file, rotationMatrix, folder)
+        if mesh is None:
+            self.misses += 1
+            return None
+        try:
+            with np.load(os.path.join(folder, GEOMETRY)) as data:
+                triangles = np.asarray(mesh.points, dtype=float)[mesh.faces.reshape(-1, 4)[:, 1:]]
+                geometry = MeshGeometry(triangles, data['areas'], data['normals'], data['cdf'], data['aabb'],
+                                        float(data['volume']), str(data['digest']))
+            for path in sorted(glob.glob(os.path.join(folder, SLICES.format('*')))):
+                with np.load(path) as data:
+                    key = (tuple(data['levels'].tolist()), float(data['cutoff']))
+                    geometry.slices[key] = (_unpackPolygons(data['data'], data['offsets']), data['perimeters'], data['areas'])
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f'failed to read artifacts of {file} from {folder}: {e}')
+            self.misses += 1
+            return None
+        MeshGeometry.register(mesh, geometry)
+        self.hits += 1
+        return mesh
+
+    def putExtents(self, group: str, digests: np.ndarray, extents: np.ndarray, levels: int):
+        '''
+        write the overlap extents of the pairs of regions of a group
+
+        Parameters
+        ----------
+        group: str
+            name of the region group
+        digests: np.ndarray
+            [k, 2] digests of the meshes of the pairs
+        extents: np.ndarray
+            [k] overlap extent of the pairs
+        levels: int
+            number of levels the extents were estimated at
+        '''
+        digests = np.sort(np.asarray(digests, dtype=str).reshape(-1, 2), axis=1)
+        _save(self._groupPath(group, '.npz'), {
+            'a': digests[:, 0],
+            'b': digests[:, 1],
+            'extents': np.asarray(extents, dtype=float),
+            'levels': np.array(levels)
+        })
+        self.extents = None
+
+    def extent(self, a: str, b: str, levels: int) -> float:
+        '''
+        precomputed overlap extent of two meshes
+
+        Parameters
+        ----------
+        a: str
+            digest of mesh a
+        b: str
+            digest of mesh b
+        levels: int
+            number of levels the extent is estimated at
+
+        Returns
+        -------
+        float | None
+            None when the pair wasn't precomputed
+        '''
+        if self.extents is None:
+            self.extents = {}
+            for path in glob.glob(os.path.join(self.folder, 'groups', '*.npz')):
+                try:
+                    with np.load(path) as data:
+                        n = int(data['levels'])
+                        self.extents.update(zip(
+                            zip([n] * len(data['a']), data['a'].tolist(), data['b'].tolist()),
+                            data['extents'].tolist()
+                        ))
+                except (OSError, ValueError, KeyError) as e:
+                    logging.warning(f'failed to read overlap extents {path}: {e}')
+        a, b = min(a, b), max(a, b)
+        return self.extents.get((levels, a, b))
+
+    def putManifest(self, group: str, manifest: dict):
+        '''
+        write the manifest of a region group
+
+        Parameters
+        ----------
+        group: str
+            name of the region group
+        manifest: dict
+            what was computed for the group
+        '''
+        path = self._groupPath(group, '.json')
+        temp = f'{path}.{os.getpid()}.tmp'
+        with open(temp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp, path)
+
+    def manifest(self, group: str) -> dict:
+        '''
+        read the manifest of a region group
+
+        Parameters
+        ----------
+        group: str
+            name of the region group
+
+        Returns
+        -------
+        dict | None
+        '''
+        try:
+            with open(self._groupPath(group, '.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _groupPath(self, group: str, extension: str) -> str:
+        folder = os.path.join(self.folder, 'groups')
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, group.replace(os.sep, '_') + extension)
+
+
+def _save(path: str, arrays: 'dict[str, np.ndarray]'):
+    # written beside the file and moved in so a reader never sees part of one
+    temp = f'{path}.{os.getpid()}.tmp.npz'
+    np.savez(temp, **arrays)
+    os.replace(temp, path)
+
+
+def _packPolygons(polygons: 'list[Polygon]') -> 'tuple[np.ndarray, np.ndarray]':
+    blobs = [b'' if polygon is None else wkb.dumps(polygon) for polygon in polygons]
+    offsets = np.cumsum([0] + [len(blob) for blob in blobs])
+    return np.frombuffer(b''.join(blobs), dtype=np.uint8), offsets
+
+
+def _unpackPolygons(data: np.ndarray, offsets: np.ndarray) -> 'list[Polygon]':
+    return [None if a == b else wkb.loads(data[a:b].tobytes()) for a, b in zip(offsets[:-1], offsets[1:])]
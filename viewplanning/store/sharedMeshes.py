@@ -0,0 +1,118 @@
+import pyvista as pv
+import numpy as np
+import logging
+import os
+from multiprocessing import shared_memory
+from dataclasses import dataclass
+from .readObj import readObj
+from .meshSidecar import meshFromArrays
+from .environmentStore import MeshStore
+
+
+# where linux keeps shared memory blocks as files
+SHM = '/dev/shm'
+
+
+@dataclass(frozen=True)
+class SharedMesh:
+    '''a triangle mesh in a block of shared memory, its points are followed by its faces'''
+    # name of the shared memory block
+    name: str
+    # number of points
+    points: int
+    # number of triangles
+    faces: int
+    # dtype of the points
+    dtype: str
+
+    @property
+    def facesOffset(self) -> int:
+        '''byte offset of the faces, aligned for the 64 bit indices'''
+        return -(-self.points * 3 * np.dtype(self.dtype).itemsize // 8) * 8
+
+    @property
+    def size(self) -> int:
+        '''bytes of the block'''
+        return self.facesOffset + self.faces * 3 * 8
+
+    def attach(self) -> 'tuple[pv.PolyData, shared_memory.SharedMemory]':
+        '''
+        mesh on the shared memory of the block. Where the block is a file in /dev/shm it is mapped copy on write so a
+        mesh changed in place never changes the meshes of other processes.
+
+        Returns
+        -------
+        tuple[pv.PolyData, shared_memory.SharedMemory | None]
+            the mesh and the block when it was attached with shared_memory, which must be kept open as long as the mesh
+            is used
+        '''
+        path = os.path.join(SHM, self.name.lstrip('/'))
+        if os.path.exists(path):
+            # a private map of the file doesn't register the block with the resource tracker either
+            points = np.memmap(path, dtype=self.dtype, mode='c', shape=(self.points, 3))
+            faces = np.memmap(path, dtype=np.int64, mode='c', offset=self.facesOffset, shape=(self.faces, 3))
+            return meshFromArrays(points, faces), None
+        # workers share the resource tracker of the runner so attaching doesn't unlink the block when they exit
+        block = shared_memory.SharedMemory(self.name)
+        points = np.ndarray([self.points, 3], dtype=self.dtype, buffer=block.buf)
+        faces = np.ndarray([self.faces, 3], dtype=np.int64, buffer=block.buf, offset=self.facesOffset)
+        return meshFromArrays(points, faces), block
+
+
+class SharedMeshes:
+    '''
+    meshes published in shared memory by a parent process so its workers don't each keep a copy. Workers look them up
+    with MeshStore.useShared.
+    '''
+
+    def __init__(self):
+        self.meshes: 'dict[tuple, SharedMesh]' = {}
+        self.blocks: 'list[shared_memory.SharedMemory]' = []
+
+    @property
+    def size(self) -> int:
+        '''bytes of shared memory used'''
+        return sum(mesh.size for mesh in self.meshes.values())
+
+    def publish(self, file: str, rotationMatrix) -> SharedMesh:
+        '''
+        read a mesh and copy it into shared memory
+
+        Parameters
+        ----------
+        file: str
+            path to the mesh
+        rotationMatrix: np.ndarray
+            SO(3) to rotate the mesh with
+
+        Returns
+        -------
+        SharedMesh
+        '''
+        key = MeshStore.key(file, rotationMatrix)
+        if key in self.meshes:
+            return self.meshes[key]
+        mesh = readObj(file, rotationMatrix)
+        points = np.asarray(mesh.points)
+        faces = np.asarray(mesh.faces, dtype=np.int64).reshape(-1, 4)[:, 1:]
+        shared = SharedMesh('', len(points), len(faces), points.dtype.str)
+        block = shared_memory.SharedMemory(create=True, size=max(1, shared.size))
+        shared = SharedMesh(block.name, shared.points, shared.faces, shared.dtype)
+        np.ndarray(points.shape, dtype=points.dtype, buffer=block.buf)[:] = points
+        np.ndarray(faces.shape, dtype=np.int64, buffer=block.buf, offset=shared.facesOffset)[:] = faces
+        self.blocks.append(block)
+        self.meshes[key] = shared
+        return shared
+
+    def close(self):
+        '''
+        free the shared memory, workers using it must have exited
+        '''
+        for block in self.blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                logging.warning(f'shared mesh {block.name} was already unlinked')
+        self.blocks = []
+        self.meshes = {}
@@ -0,0 +1,34 @@
+from viewplanning.dubins import RustVanaAirplane
+from viewplanning.edgeSolver.etsp2dtsp import DynamicProgramming
+from viewplanning.models import Vertex3D
+import numpy as np
+import itertools
+
+
+def cycleCost(dubins, vertices, radius, faMin, faMax):
+    cost = 0
+    for i in range(len(vertices)):
+        a = vertices[i - 1]
+        b = vertices[i]
+        cost += dubins.calculatePath(a.x, a.y, a.z, a.theta, a.phi, b.x, b.y, b.z, b.theta, b.phi, radius, faMin, faMax).cost
+    return cost
+
+
+def testDynamicProgrammingOptimal():
+    dubins = RustVanaAirplane()
+    radius = 40
+    faMin = -.3
+    faMax = .3
+    points = [[-200, 100, 20], [150, 220, -30], [250, -180, 10], [-120, -200, 0]]
+    vertices = [Vertex3D(x=p[0], y=p[1], z=p[2]) for p in points]
+    dp = DynamicProgramming(dubins, 4, 2)
+    dp.findHeadings(vertices, faMin, faMax, radius)
+    cost = cycleCost(dubins, vertices, radius, faMin, faMax)
+
+    states = dp._states(faMin, faMax)
+    best = np.inf
+    for combination in itertools.product(range(len(states)), repeat=len(vertices)):
+        for vertex, state in zip(vertices, combination):
+            vertex.theta, vertex.phi = states[state]
+        best = min(best, cycleCost(dubins, vertices, radius, faMin, faMax))
+    assert np.isclose(cost, best)
@@ -0,0 +1,66 @@
+from viewplanning.models import Solution, Edge, Edge3D, DwellStraightEdge, Vertex3DMulti, DubinsPathType
+from viewplanning.store.collectionStore import dict_factory_json
+from dataclasses import asdict
+import numpy as np
+import pytest
+import copy
+import json
+
+
+def toDict(item):
+    return json.loads(json.dumps(asdict(item, dict_factory=dict_factory_json)))
+
+
+def makeEdges(vertices):
+    edges = []
+    for i in range(len(vertices)):
+        a = vertices[i - 1]
+        b = vertices[i]
+        dwellVector = np.array([np.cos(a.theta), np.sin(a.theta), 0]) * 10
+        # the edge solvers start the transition at a copy of the vertex moved by the dwell vector
+        start = copy.deepcopy(a)
+        start.x += dwellVector[0]
+        start.y += dwellVector[1]
+        end = b
+        transition = Edge3D(start=start, end=end, cost=100 + i, aParam=1, bParam=2 + i, cParam=3,
+                            pathType=DubinsPathType.LSR, radius=40, dParam=4, eParam=5, fParam=6,
+                            radiusSZ=50, pathTypeSZ=DubinsPathType.RSL)
+        edges.append(DwellStraightEdge(start=a, end=b, cost=110 + i, dwellVector=dwellVector, transitionEdge=transition))
+    return edges
+
+
+def testCompactTour():
+    samples = [Vertex3DMulti(x=i * 10.0, y=i * 5.0, z=i, theta=i / 10, group=str(i), id=i, visits={str(i)}) for i in range(8)]
+    edges = makeEdges(samples[::2])
+    solution = Solution(cost=1, samples=samples)
+    solution.edges = edges
+    assert solution.tour.vertices == [0, 2, 4, 6]
+
+    stored = toDict(solution)
+    assert 'edges' not in stored
+    loaded = Solution.from_dict(stored)
+    assert [toDict(e) for e in loaded.edges] == [toDict(Edge.from_dict(toDict(e))) for e in edges]
+    transition = loaded.edges[1].transitionEdge
+    assert isinstance(transition.start, Vertex3DMulti) and isinstance(transition.end, Vertex3DMulti)
+    assert (transition.start.group, transition.start.id, transition.start.visits) == ('0', 0, {'0'})
+    assert transition.start.x == samples[0].x + edges[1].dwellVector[0]
+    assert toDict(transition.end) == toDict(samples[2])
+
+
+def testTourOfMissingVertex():
+    samples = [Vertex3DMulti(x=i * 10.0, y=i * 5.0, z=i, theta=i / 10, group=str(i), id=i, visits={str(i)}) for i in range(4)]
+    edges = makeEdges(samples)
+    with pytest.raises(ValueError):
+        Solution(cost=1, samples=samples[:3]).edges = edges
+    assert len(samples) == 4
+
+
+def testLegacySolution():
+    samples = [Vertex3DMulti(x=i * 10.0, y=i * 5.0, z=i, theta=i / 10, group=str(i), id=i, visits={str(i)}) for i in range(8)]
+    edges = makeEdges(samples[::2])
+    stored = toDict(Solution(cost=1, samples=samples))
+    stored.pop('tour')
+    stored['edges'] = [toDict(e) for e in edges]
+    loaded = Solution.from_dict(stored)
+    assert loaded.tour.vertices == [0, 2, 4, 6]
+    assert len(loaded.samples) == len(samples)
@@ -0,0 +1,61 @@
+from viewplanning.models import VertexBatch, Vertex3D, Vertex3DMulti, VertexType
+import numpy as np
+
+
+def testFromSamplesOrder():
+    points = np.array([[0, 0, 0], [1, 1, 1]])
+    batch = VertexBatch.fromSamples(points, [[0, 1], [2]], [0, .5], 3)
+    assert len(batch) == 6
+    assert batch.type == VertexType.THREE_D
+    assert batch.theta.tolist() == [0, 0, 1, 1, 2, 2]
+    assert batch.phi.tolist() == [0, .5, 0, .5, 0, .5]
+    assert batch[4] == Vertex3D(group='3', x=1, y=1, z=1, theta=2, phi=0)
+    assert batch[4] is batch[4]
+    assert np.shares_memory(batch[1:3].data, batch.data)
+
+
+def testDuplicateVisits():
+    batch = VertexBatch.fromSamples([[0, 0, 0], [1, 0, 0]], [[0], [0]], [0], 0, visits=['0'])
+    batch.id[:] = [7, 8]
+    batch.addVisits(np.array([[True, False], [False, True]]), ['2', str(70)])
+    copies = batch.duplicateVisits()
+    assert copies.groupLabels().tolist() == ['0', '0', '2', '70']
+    assert copies.id.tolist() == [7, 8, 7, 8]
+    assert copies[3] == Vertex3DMulti(group='70', id=8, visits={'0', '70'}, x=1)
+
+
+def testFromVerticesRoundTrip():
+    vertices = [
+        Vertex3DMulti(group='1', id=0, visits={'1', '2'}, x=1, theta=.5),
+        Vertex3DMulti(group='2', id=0, visits={'1', '2'}, x=1, theta=.5),
+        Vertex3DMulti(group='0', id=1, visits={'0'}, y=2, phi=.1)
+    ]
+    batch = VertexBatch.fromVertices(vertices)
+    assert batch[0] is vertices[0]
+    joined = VertexBatch.concatenate([VertexBatch.fromSamples([[5, 5, 5]], [[1]], [0], 2, visits=['2']), batch])
+    assert joined.labels == ['2', '1', '0']
+    assert joined.toVertices()[1:] == vertices
+
+
+def testSaveLoad(tmp_path):
+    batch = VertexBatch.fromSamples([[0, 1, 2], [3, 4, 5]], [[0], [1, 2]], [0], 4, visits=['4', '9'])
+    batch.id[:] = [1, 1, 2]
+    batch.save(str(tmp_path / 'batch.npz'))
+    loaded = VertexBatch.load(str(tmp_path / 'batch.npz'))
+    assert loaded.toVertices() == batch.toVertices()
+    assert loaded.type == VertexType.THREE_D_MULTI
+
+
+def testRelabel():
+    vertices = [
+        Vertex3DMulti(group='1', id=0, visits={'1', '2'}, x=1),
+        Vertex3DMulti(group='2', id=0, visits={'1', '2'}, x=1),
+        Vertex3DMulti(group='3', id=1, visits={'3', '1'}, y=2)
+    ]
+    batch = VertexBatch.fromVertices(vertices)
+    relabeled = batch[np.array([0, 2])].relabel({'1': '0', '3': '1'})
+    assert relabeled.toVertices() == [
+        Vertex3DMulti(group='0', id=0, visits={'0'}, x=1),
+        Vertex3DMulti(group='1', id=1, visits={'1', '0'}, y=2)
+    ]
+    assert vertices[0].group == '1' and batch.labels == ['1', '2', '3']
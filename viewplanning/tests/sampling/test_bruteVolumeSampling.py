@@ -0,0 +1,48 @@
+from viewplanning.models import Region, RegionType
+from viewplanning.sampling.multi import bruteVolumeSampling
+from viewplanning.sampling.multi.bruteVolumeSampling import intersectCliques
+from viewplanning.store import IntersectionStore
+from networkx.algorithms import enumerate_all_cliques
+import networkx as nx
+import pyvista as pv
+import numpy as np
+
+
+class BoxStore(IntersectionStore):
+    '''intersects boxes by their bounds'''
+    def intersectPairs(self, pairs, ids, jobs=None):
+        self.calls.append(len(pairs))
+        return [overlap([a, b]) for a, b in pairs]
+
+
+def overlap(boxes):
+    bounds = np.array([box.bounds for box in boxes])
+    lower, upper = bounds[:, 0::2].max(axis=0), bounds[:, 1::2].min(axis=0)
+    if np.any(lower >= upper):
+        return None
+    return pv.Box(np.stack([lower, upper], axis=1).ravel())
+
+
+def testPrefixIntersections(monkeypatch):
+    store = BoxStore()
+    store.calls = []
+    monkeypatch.setattr(bruteVolumeSampling.IntersectionStore, 'getInstance', lambda: store)
+    meshes = [pv.Box([i, i + 2.5, 0, 1, 0, 1]) for i in range(10)]
+    regions = [Region(type=RegionType.WAVEFRONT, file='', points=[[i, 0, 0]]) for i in range(10)]
+    cliques = [clique for clique in enumerate_all_cliques(nx.complete_graph(10)) if len(clique) <= 4]
+    results, operations = intersectCliques(cliques, meshes, regions)
+    for clique in cliques[10:]:
+        expected = overlap([meshes[i] for i in clique])
+        if expected is None:
+            assert results[tuple(clique)] is None
+        else:
+            assert np.allclose(results[tuple(clique)].bounds, expected.bounds)
+    # one batch per clique size and booleans only extend non empty prefixes
+    extended = [
+        sum(1 for clique in cliques if len(clique) == size and overlap([meshes[i] for i in clique[:-1]]) is not None)
+        for size in (2, 3, 4)
+    ]
+    assert store.calls == extended == [45, 64, 28]
+    assert operations == sum(extended)
+    # from scratch every clique takes one boolean per extra mesh
+    assert sum(len(clique) - 1 for clique in cliques[10:]) - operations == 45 + 120 * 2 + 210 * 3 - 137
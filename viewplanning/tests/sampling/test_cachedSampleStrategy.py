@@ -0,0 +1,55 @@
+from viewplanning.models import Region, RegionType, SampleStrategyRecord, SampleStrategyType, VertexType
+from viewplanning.models import SampleStrategyIntersection
+from viewplanning.models.sampleStrategyRecord import IntersectionStrategyRecord
+from viewplanning.sampling import CachedSampleStrategy, cachedSampleStrategy
+from viewplanning.sampling.single import FaceSampleStrategy
+from viewplanning.sampling.heading import UniformHeadings
+import numpy as np
+
+
+def makeStrategy(seed):
+    strategy = FaceSampleStrategy(20, 1, [0, 0], UniformHeadings(2, [0, 2 * np.pi]))
+    return strategy.setRng(np.random.default_rng(seed))
+
+
+def testSeededSamplesAreCached(tmp_path):
+    regions = [Region(type=RegionType.WAVEFRONT, file='data/viewRegions/sphere.obj',
+                      rotationMatrix=[[1, 0, 0], [0, 1, 0], [0, 0, 1]])]
+    record = SampleStrategyRecord(type=SampleStrategyType.FACE, numSamples=20, numTheta=2, seed=3)
+    cached = CachedSampleStrategy(makeStrategy(3), record, str(tmp_path))
+    first = cached.getSamples(regions)
+    assert cached.misses == 1 and len(list(tmp_path.glob('*.npz'))) == 1
+    again = CachedSampleStrategy(makeStrategy(3), record, str(tmp_path)).getSamples(regions)
+    assert np.array_equal(again.data, first.data)
+    assert again.labels == first.labels and again.type == VertexType.THREE_D
+    # the same seed gives the same samples without the cache and another seed doesn't
+    assert np.array_equal(makeStrategy(3).getSamples(regions).data, first.data)
+    assert not np.array_equal(makeStrategy(4).getSamples(regions).data, first.data)
+    other = CachedSampleStrategy(makeStrategy(4), SampleStrategyRecord(type=SampleStrategyType.FACE, numSamples=20, numTheta=2, seed=4), str(tmp_path))
+    assert other.key(regions) != cached.key(regions)
+
+
+def testIntersectionSettingsChangeKey(monkeypatch):
+    regions = [Region(type=RegionType.WAVEFRONT, file='data/viewRegions/sphere.obj')]
+    record = SampleStrategyRecord(type=SampleStrategyType.FACE, seed=3, intersection=IntersectionStrategyRecord(
+        type=SampleStrategyIntersection.BRUTE_INTERSECTION))
+    cached = CachedSampleStrategy(makeStrategy(3), record, '')
+    single = CachedSampleStrategy(makeStrategy(3), SampleStrategyRecord(type=SampleStrategyType.FACE, seed=3), '')
+    keys = {}
+    singleKeys = set()
+    for name, intersection in [
+        ('memory', {'type': 'memory', 'levels': 16}),
+        ('memory levels', {'type': 'memory', 'levels': 8}),
+        ('slices', {'type': 'slices', 'levels': 16}),
+        ('slices levels', {'type': 'slices', 'levels': 8}),
+        ('drive', {'type': 'drive', 'folder': 'a'}),
+        ('drive folder', {'type': 'drive', 'folder': 'b'})
+    ]:
+        monkeypatch.setattr(cachedSampleStrategy.ConfigurationFactory, 'getInstance', lambda: {'intersection': intersection})
+        keys[name] = cached.key(regions)
+        singleKeys.add(single.key(regions))
+    # levels only matter to sliced intersections
+    assert keys['memory'] == keys['memory levels']
+    assert len({keys[name] for name in keys if name != 'memory levels'}) == 5
+    # samples of a single volume don't depend on intersections
+    assert len(singleKeys) == 1
@@ -0,0 +1,34 @@
+from viewplanning.sampling.heading import InwardPointingHeadings, UniformHeadings, StraightDwellHeadings, intersectRaysMany
+from shapely.geometry import Polygon
+import numpy as np
+
+
+def testHeadingsNearUniform():
+    headings = UniformHeadings(8, [0, 2 * np.pi]).getHeadingsNear(np.array([0, 0, 0]), 1, 5, .5)
+    assert np.allclose(headings, [.5, .75, 1, 1.25, 1.5])
+
+
+def testHeadingsNearInward():
+    square = Polygon([[0, 0, 0], [10, 0, 0], [10, 10, 0], [0, 10, 0]])
+    # on the bottom edge only headings pointing up are inward
+    headings = InwardPointingHeadings(8).getHeadingsNear(np.array([5, 0, 0]), 0, 5, 1, polygon=square)
+    assert len(headings) == 3
+    assert (np.sin(headings) >= 0).all()
+
+
+def testIntersectRaysMany():
+    square = Polygon([[0, 0, 0], [10, 0, 0], [10, 10, 0], [0, 10, 0]])
+    distances = intersectRaysMany([square], np.array([[5, 5], [2, 5]]), np.array([[1, 0], [0, -2], [-1, 0]]), 4)
+    assert np.allclose(distances, [[4, 4, 4], [4, 4, 2]])
+
+
+def testDwellHeadingsBatch():
+    square = Polygon([[0, 0, 0], [10, 0, 0], [10, 10, 0], [0, 10, 0]])
+    points = np.array([[5, 0, 0], [0, 3, 0], [9, 10, 0]], dtype=float)
+    strategy = StraightDwellHeadings(3, 32, 6)
+    batch = strategy.getHeadingsBatch(points, polygon=square)
+    assert points.tolist() == [[5, 0, 0], [0, 3, 0], [9, 10, 0]]
+    for point, headings in zip(points, batch):
+        assert np.allclose(headings, strategy.getHeadings(point.copy(), polygon=square))
+    # from the middle of the bottom edge only headings close to straight up travel 6
+    assert len(batch[0]) == 3 and (np.sin(batch[0]) > .5).all()
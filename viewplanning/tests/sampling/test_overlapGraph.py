@@ -0,0 +1,68 @@
+from viewplanning.models import Region, RegionType
+from viewplanning.sampling.multi import helpers
+from viewplanning.sampling.multi.helpers import candidatePairs, overlapExtents, makeGraph, xyExtent
+from viewplanning.store import IntersectionStore
+from shapely.geometry import Polygon
+import pyvista as pv
+import numpy as np
+
+
+class BaseStore(IntersectionStore):
+    '''intersects cones by their bases, where they overlap the most'''
+    def intersectPairs(self, pairs, ids, jobs=None):
+        self.calls += len(pairs)
+        results = []
+        for a, b in pairs:
+            x0, y0, x1, y1 = (base(a) & base(b)).bounds
+            results.append(pv.Box([x0, x1, y0, y1, 0, 1]))
+        return results
+
+
+def base(cone):
+    points = np.asarray(cone.points)
+    points = points[np.isclose(points[:, 2], cone.bounds[4])]
+    return Polygon(points[:, :2]).convex_hull
+
+
+def makeBoxes(centers):
+    regions = [Region(type=RegionType.WAVEFRONT, points=[list(c)]) for c in centers]
+    meshes = [pv.Box([x - 5, x + 5, y - 5, y + 5, z - 5, z + 5]).triangulate() for x, y, z in centers]
+    return regions, meshes
+
+
+def testCandidatePairs():
+    regions, meshes = makeBoxes([[0, 0, 0], [8, 0, 0], [16, 0, 0], [0, 0, 30], [100, 0, 0]])
+    pairs = candidatePairs(regions, 10, 0, meshes)
+    # boxes 0 and 3 are close enough to be seen together but their boxes don't overlap
+    assert pairs.tolist() == [[0, 1], [1, 2]]
+    assert candidatePairs(regions, 10, 19, meshes).tolist() == []
+
+
+def testOverlapGraph():
+    regions, meshes = makeBoxes([[0, 0, 0], [8, 0, 0], [16, 0, 0]])
+    extents = overlapExtents(np.array([[0, 1], [0, 2]]), meshes)
+    assert np.isclose(extents[0], np.sqrt(2 ** 2 + 10 ** 2))
+    assert extents[1] == 0
+    assert list(makeGraph(regions, 10, 4, meshes=meshes).edges) == [(0, 1), (1, 2)]
+    assert list(makeGraph(regions, 10, 6, meshes=meshes).edges) == []
+
+
+def testOverlapGraphChecksEstimatesNearDwell(monkeypatch):
+    store = BaseStore()
+    store.calls = 0
+    monkeypatch.setattr(helpers.IntersectionStore, 'getInstance', lambda: store)
+    regions = [Region(type=RegionType.WAVEFRONT, file=f'{i}.ply', points=[[x, 0, 10]]) for i, x in enumerate([0, 10])]
+    meshes = [
+        pv.Cone(center=(x, 0, 10), direction=(0, 0, 1), height=20, radius=10, resolution=64).triangulate() for x in [0, 10]
+    ]
+    # the cones overlap the most at their bases, below the lowest height the overlap is estimated at
+    estimate = overlapExtents(np.array([[0, 1]]), meshes)[0]
+    exact = xyExtent(store.intersectPairs([meshes], [('0.ply', '1.ply')])[0])
+    dwell = (estimate + exact) / 2
+    assert estimate < dwell < exact
+    assert list(makeGraph(regions, 30, dwell, multDwell=False, meshes=meshes).edges) == [(0, 1)]
+    assert list(makeGraph(regions, 30, exact + 1e-3, multDwell=False, meshes=meshes).edges) == []
+    # estimates longer than the dwell distance don't need the exact intersection
+    store.calls = 0
+    assert list(makeGraph(regions, 30, estimate * .99, multDwell=False, meshes=meshes).edges) == [(0, 1)]
+    assert store.calls == 0
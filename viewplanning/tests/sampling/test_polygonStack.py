@@ -0,0 +1,39 @@
+from viewplanning.sampling import PolygonStack, SliceCache
+from viewplanning.store import SliceIntersectionStore, MeshGeometry
+from shapely.geometry import Polygon
+import pyvista as pv
+import numpy as np
+
+
+def testBoxIntersection():
+    a = pv.Box([0, 2, 0, 2, 0, 2]).triangulate()
+    b = pv.Box([1, 3, .5, 2.5, 1, 4]).triangulate()
+    stack = PolygonStack.intersect([a, b], 4)
+    mesh = stack.toMesh()
+    assert np.allclose(mesh.bounds, [1, 2, .5, 2, 1, 2])
+    assert np.isclose(MeshGeometry.of(mesh).volume, 1.5)
+    assert mesh.is_manifold
+    assert PolygonStack.of(mesh) is stack
+    assert np.isclose(SliceCache().getPolygon(1.5, mesh).area, 1.5)
+    assert PolygonStack.intersect([a, pv.Box([5, 6, 0, 1, 0, 1]).triangulate()]) is None
+
+
+def testMeshKeepsHoles():
+    square = Polygon([[0, 0], [4, 0], [4, 4], [0, 4]], [[[1, 1], [3, 1], [3, 3], [1, 3]]])
+    stack = PolygonStack(np.array([0, 1, 2]), [square, square])
+    mesh = stack.toMesh()
+    assert mesh.is_manifold
+    assert np.isclose(MeshGeometry.of(mesh).volume, 2 * 12)
+    inside = pv.PolyData(np.array([[.5, .5, .5], [2, 2, .5], [2, 2, 1.5], [3.5, 2, 1.5]])).select_enclosed_points(mesh)
+    assert inside['SelectedPoints'].tolist() == [1, 0, 0, 1]
+
+
+def testSliceStoreChains():
+    store = SliceIntersectionStore(levels=8)
+    cone = pv.Cone(center=(0, 0, 1), direction=(0, 0, -1), height=2, radius=2, resolution=64).triangulate()
+    shifted = cone.translate((1, 0, 0), inplace=False)
+    first = store.intersect(cone, shifted, 'a', 'b')
+    second = store.intersectPairs([(first, cone.translate((0, 1, 0), inplace=False))], [('a-b', 'c')])[0]
+    assert store.intersect(shifted, cone, 'b', 'a') is first
+    assert 0 < MeshGeometry.of(second).volume < MeshGeometry.of(first).volume < MeshGeometry.of(cone).volume
+    assert PolygonStack.of(second).edges[0] >= first.bounds[4]
@@ -1,7 +1,8 @@
-from viewplanning.sampling.sampleHelpers import containsPoint2d
+from viewplanning.sampling.sampleHelpers import containsPoint2d, containsPoints2d, containsPoints3d, getAngles, getPointsOnEdge
 from shapely.geometry import Polygon
 from shapely.geometry.polygon import orient
 import numpy as np
+import pyvista as pv
 
 
 def testPointInTriangle():
@@ -22,3 +23,37 @@ def testPointInCircle():
     assert not containsPoint2d([2, 0], polygon)
     assert not containsPoint2d([-2, 0], polygon)
     assert not containsPoint2d([.9, .9], polygon)
+
+
+def testPointsInVolumes():
+    sphere = pv.Sphere(radius=1, theta_resolution=40, phi_resolution=20).triangulate()
+    # points on the grid lie on shared edges and vertices of the projected faces
+    box = pv.Box([0, 2, 0, 2, 0, 2], level=2).triangulate()
+    points = [[0, 0, 0], [.5, .5, .5], [1, 1, 1], [1.5, .5, 1.5], [3, 0, 0], [0, 0, .9], [.9, .9, .9]]
+    inside = containsPoints3d(points, [sphere, box])
+    assert inside.shape == (7, 2)
+    assert inside[:, 0].tolist() == [True, True, False, False, False, True, False]
+    assert inside[:, 1].tolist() == [False, True, True, True, False, False, True]
+    assert containsPoints3d(np.zeros([0, 3]), [sphere]).shape == (0, 1)
+
+
+def testAngleSequence():
+    assert getAngles(0, 8).tolist() == [0, 1, .5, 1.5, .25, .75, 1.25, 1.75]
+    assert getAngles(13, 3).tolist() == [11 / 8, 13 / 8, 15 / 8]
+    assert getAngles(16, 1).tolist() == [1 / 16]
+
+
+def testPointsOnEdge():
+    square = Polygon(shell=[[0, 0, 1], [2, 0, 1], [2, 2, 1], [0, 2, 1]])
+    points = getPointsOnEdge(0, 5, square)
+    assert np.allclose(points, [[0, 0, 1], [1, 0, 1], [2, 0, 1], [2, 2, 1], [0, 2, 1]])
+
+
+def testPointsInPolygon():
+    t = np.linspace(0, 2 * np.pi, 100, endpoint=False)
+    r = 5 + 2 * np.sin(5 * t)
+    star = Polygon(shell=np.column_stack([r * np.cos(t), r * np.sin(t)]))
+    points = np.random.default_rng(0).uniform(-8, 8, [2000, 2])
+    inside = containsPoints2d(points, star)
+    assert inside.tolist() == [containsPoint2d(point, star) for point in points]
+    assert 0 < np.sum(inside) < len(points)
@@ -0,0 +1,27 @@
+from viewplanning.models import Region, RegionType
+from viewplanning.sampling.single import BodySampleStrategy, FaceSampleStrategy, GlobalPerimeterWeightedFaceSampleStrategy, Edge3dSampleStrategy
+from viewplanning.sampling.heading import StraightDwellHeadings, InwardPointingHeadings
+import numpy as np
+import random
+
+
+def samplePositions(strategy):
+    np.random.seed(3)
+    random.seed(3)
+    viewVol = [Region(type=RegionType.WAVEFRONT, file='data/viewRegions/vv_g_000_t_005_v_000.obj',
+                      rotationMatrix=[[1, 0, 0], [0, 0, 1], [0, 1, 0]])]
+    return np.array([vertex.asPoint()[0] for vertex in strategy.getSamples(viewVol)])
+
+
+def testDwellHeadingsDontMoveSamples():
+    # dwell headings are found at a point moved into the slice, the sample stays where it was placed
+    for make in [
+        lambda headings: BodySampleStrategy(20, 1, [0, 0], headings),
+        lambda headings: FaceSampleStrategy(20, 1, [0, 0], headings),
+        lambda headings: GlobalPerimeterWeightedFaceSampleStrategy(20, 1, [0, 0], 4, headings),
+        lambda headings: Edge3dSampleStrategy(20, 1, [0, 0], headings)
+    ]:
+        dwell = samplePositions(make(StraightDwellHeadings(4, 32, 0)))
+        inward = samplePositions(make(InwardPointingHeadings(4)))
+        assert len(dwell) > 0
+        assert np.array_equal(dwell, inward)
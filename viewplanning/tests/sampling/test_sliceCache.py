@@ -0,0 +1,39 @@
+from viewplanning.sampling import SliceCache, containsPoint3d
+import numpy as np
+import pyvista as pv
+
+
+def testNearbyHeightsShareSlice():
+    cache = SliceCache(size=10, tolerance=.01)
+    box = pv.Box([0, 2, 0, 1, 0, 1]).triangulate()
+    polygon = cache.getPolygon(.5, box)
+    assert np.isclose(polygon.area, 2)
+    assert cache.getPolygon(.502, box) is polygon
+    assert cache.getPolygon(.52, box) is not polygon
+    assert cache.getPolygon(2, box) is None
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 3
+    assert stats['items'] == 3 and stats['bytes'] > 0
+
+
+def testEviction():
+    cache = SliceCache(size=2, tolerance=.1)
+    box = pv.Box([0, 1, 0, 1, 0, 1]).triangulate()
+    other = pv.Box([0, 1, 0, 1, 0, 1]).triangulate()
+    first = cache.getPolygon(.2, box)
+    cache.getPolygon(.2, other)
+    cache.getPolygon(.5, box)
+    assert cache.stats()['evictions'] == 1
+    assert cache.getPolygon(.2, box) is not first
+    cache.clearCache()
+    assert cache.stats()['items'] == 0 and cache.stats()['bytes'] == 0
+
+
+def testContainsPoint3dUsesCache():
+    box = pv.Box([0, 1, 0, 1, 0, 1]).triangulate()
+    cache = SliceCache.getInstance()
+    hits = cache.stats()['hits']
+    assert containsPoint3d([.5, .5, .5], box)
+    assert containsPoint3d([.2, .7, .5], box)
+    assert not containsPoint3d([1.5, .5, .5], box)
+    assert cache.stats()['hits'] == hits + 1
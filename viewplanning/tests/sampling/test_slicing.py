@@ -0,0 +1,33 @@
+from viewplanning.sampling.slicing import sliceMesh, sliceMany
+import numpy as np
+import pyvista as pv
+
+
+def testSliceSphere():
+    sphere = pv.Sphere(radius=10, theta_resolution=200, phi_resolution=100).triangulate()
+    polygons = sliceMesh(0, sphere)
+    assert len(polygons) == 1
+    assert np.isclose(polygons[0].area, np.pi * 100, rtol=1e-2)
+    assert polygons[0].exterior.is_ccw
+
+
+def testSliceDisjointBoxes():
+    boxes = pv.Box([0, 1, 0, 1, 0, 1]).triangulate() + pv.Box([3, 5, 0, 1, 0, 1]).triangulate()
+    polygons = sorted(sliceMesh(.5, boxes), key=lambda p: p.area)
+    assert len(polygons) == 2
+    assert np.allclose([p.area for p in polygons], [1, 2])
+    assert sliceMesh(2, boxes) == []
+
+
+def testSliceMany():
+    sphere = pv.Sphere(radius=10, theta_resolution=60, phi_resolution=30).triangulate()
+    zLevels = [5, -20, 0, 9]
+    polygons, perimeters, areas = sliceMany(sphere, zLevels)
+    assert polygons[1] is None and perimeters[1] == 0 and areas[1] == 0
+    for z, polygon, perimeter, area in zip(zLevels, polygons, perimeters, areas):
+        if polygon is None:
+            continue
+        single = max(sliceMesh(z, sphere), key=lambda p: p.area)
+        assert single.equals_exact(polygon, 0)
+        assert np.isclose(perimeter, single.exterior.length)
+        assert np.isclose(area, single.area)
@@ -0,0 +1,79 @@
+from viewplanning.solvers import DubinsAdaptiveSolver
+from viewplanning.sampling import SampleStrategy, SliceCache
+from viewplanning.sampling.heading import UniformHeadings
+from viewplanning.tsp import TspSolver
+from viewplanning.store import MeshStore
+from viewplanning.models import Region, RegionType, Vertex3D, VertexBatch, RefinementStrategyRecord
+from .test_replan import DistanceEdges
+import numpy as np
+import uuid
+
+
+HEIGHT = 300
+FILES = [f'data/viewRegions/vv_g_000_t_005_v_00{i}.obj' for i in range(3)]
+ROTATION = [[1, 0, 0], [0, 0, 1], [0, 1, 0]]
+
+
+class SlicePointSampler(SampleStrategy):
+    '''one sample inside the slice of every region at the same height'''
+    def __init__(self):
+        super().__init__(UniformHeadings(4, [0, 2 * np.pi]))
+
+    def getSamples(self, regions):
+        samples = []
+        for i, region in enumerate(regions):
+            mesh = MeshStore.getInstance().getMesh(region.file, region.rotationMatrix)
+            point = SliceCache.getInstance().getPolygon(HEIGHT, mesh, cutoff=.05).representative_point()
+            samples.append(Vertex3D(group=str(i), x=point.x, y=point.y, z=HEIGHT))
+        return samples
+
+
+class DescentTsp(TspSolver):
+    '''starts from the initial tour, or the first vertex of every group, and swaps each vertex for the cheapest vertex
+    of its group between its neighbours'''
+    def writeMatrix(self, id, vertices, costs, initialTour=None):
+        self.weights = self.tspCosts(vertices, costs)
+        self.labels = VertexBatch.fromVertices(vertices).groupLabels()
+        self.initialTour = initialTour
+
+    def solve(self, id, vertices):
+        if self.initialTour:
+            tour = list(self.initialTour)
+        else:
+            tour = [int(np.flatnonzero(self.labels == label)[0]) for label in dict.fromkeys(self.labels)]
+        for k in range(len(tour)):
+            before, after = tour[k - 1], tour[(k + 1) % len(tour)]
+            candidates = np.flatnonzero(self.labels == self.labels[tour[k]])
+            tour[k] = int(candidates[np.argmin(self.weights[before, candidates] + self.weights[candidates, after])])
+        self.tour = tour
+        return [vertices[i] for i in tour]
+
+
+def makeSolver(seed):
+    regions = [Region(type=RegionType.WAVEFRONT, file=file, rotationMatrix=ROTATION) for file in FILES]
+    refinement = RefinementStrategyRecord(numSamples=4, distance=100, maxIterations=3, tolerance=0)
+    return DubinsAdaptiveSolver(regions, None, None, SlicePointSampler(), DistanceEdges(), DescentTsp(), uuid.uuid4(),
+                                refinement, rng=np.random.default_rng(seed))
+
+
+def testRefinementNeverIncreasesTourCost():
+    solver = makeSolver(5)
+    solver.solve()
+
+    assert len(solver.history) == solver.refinement.maxIterations + 1
+    assert all(later <= earlier for earlier, later in zip(solver.history, solver.history[1:]))
+    assert solver.history[-1] < solver.history[0]
+    assert np.isclose(solver.history[-1], solver._tourCost(solver.vertices, solver.tour))
+    assert len(solver.vertices) > len(solver.regions)
+    assert sorted(solver.vertices[i].group for i in solver.tour) == ['0', '1', '2']
+
+
+def testSeededRefinementIsRepeatable():
+    first = makeSolver(5)
+    first.solve()
+    second = makeSolver(5)
+    second.solve()
+
+    assert first.history == second.history
+    assert [vertex.toList() for vertex in first.vertices] == [vertex.toList() for vertex in second.vertices]
+    assert first.tour == second.tour
@@ -0,0 +1,105 @@
+from viewplanning.solvers.dubinsHighAltitudeSolver import DubinsHighAltitudeSolver
+from viewplanning.sampling import SampleStrategy
+from viewplanning.edgeSolver import EdgeSolver
+from viewplanning.tsp import TspSolver
+from viewplanning.models import Region, Edge, VertexBatch
+import numpy as np
+import uuid
+
+
+class GridSampler(SampleStrategy):
+    '''two positions with two headings around the point of every region, returned as one batch'''
+    def __init__(self):
+        super().__init__(None)
+
+    def getSamples(self, regions):
+        batches = []
+        for i, region in enumerate(regions):
+            points = np.asarray(region.points[0], dtype=float) + np.array([[-1, 0, 0], [1, 0, 0]])
+            batches.append(VertexBatch.fromSamples(points, [np.array([0, np.pi])] * 2, [0], str(i)))
+        return VertexBatch.concatenate(batches)
+
+
+class DistanceEdges(EdgeSolver):
+    def __init__(self):
+        self.calls = 0
+
+    def getEdge(self, a, b):
+        self.calls += 1
+        return Edge(start=a, end=b, cost=float(np.linalg.norm(a.asPoint() - b.asPoint())))
+
+
+class InitialTourTsp(TspSolver):
+    '''returns the initial tour it is given, or the first vertex of every group'''
+    def writeMatrix(self, id, vertices, costs, initialTour=None):
+        self.costs = costs
+        self.initialTour = initialTour
+
+    def solve(self, id, vertices):
+        if self.initialTour:
+            self.tour = list(self.initialTour)
+        else:
+            labels = VertexBatch.fromVertices(vertices).groupLabels()
+            self.tour = [int(np.flatnonzero(labels == label)[0]) for label in dict.fromkeys(labels)]
+        return [vertices[i] for i in self.tour]
+
+
+def makeSolver(points):
+    regions = [Region(points=[point]) for point in points]
+    return DubinsHighAltitudeSolver(regions, None, None, GridSampler(), DistanceEdges(), InitialTourTsp(), uuid.uuid4())
+
+
+def testReplanAddsRegionsWithBatchSampler():
+    solver = makeSolver([[0, 0, 0], [100, 0, 0], [100, 100, 0]])
+    solver.solve()
+    costs = solver.costs
+    edges = solver.replan(added=[Region(points=[[50, 50, 0]])])
+
+    assert len(solver.regions) == 4
+    assert isinstance(solver.vertices, VertexBatch)
+    assert solver.vertices.groupLabels().tolist() == ['0'] * 4 + ['1'] * 4 + ['2'] * 4 + ['3'] * 4
+    assert np.allclose(solver.vertices.points[12:, :2], [[49, 50]] * 2 + [[51, 50]] * 2)
+    assert np.array_equal(solver.costs[:12, :12], costs)
+    assert sorted(int(solver.vertices[i].group) for i in solver.tour) == [0, 1, 2, 3]
+    assert len(edges) == 4
+
+
+def testReplanOnlyComputesEdgesOfNewVertices():
+    solver = makeSolver([[0, 0, 0], [100, 0, 0], [100, 100, 0]])
+    solver.solve()
+    calls = solver.edgeSolver.calls
+    edges = solver.replan(added=[Region(points=[[50, 50, 0]])])
+
+    # edges between the 4 new vertices and the 12 kept vertices both ways, and the edges of the tour
+    assert solver.edgeSolver.calls - calls == 2 * 4 * 12 + len(edges)
+
+
+def testReplanRemovesRegions():
+    solver = makeSolver([[0, 0, 0], [100, 0, 0], [100, 100, 0], [0, 100, 0]])
+    solver.solve()
+    costs = solver.costs
+    tour = list(solver.tour)
+    calls = solver.edgeSolver.calls
+    edges = solver.replan(removed=[1])
+
+    keep = [0, 1, 2, 3] + list(range(8, 16))
+    assert len(solver.regions) == 3
+    assert solver.vertices.groupLabels().tolist() == ['0'] * 4 + ['1'] * 4 + ['2'] * 4
+    assert np.allclose(solver.vertices.points[4:, :2], [[99, 100]] * 2 + [[101, 100]] * 2 + [[-1, 100]] * 2 + [[1, 100]] * 2)
+    assert np.array_equal(solver.costs, costs[np.ix_(keep, keep)])
+    # only the edges of the tour are solved
+    assert solver.edgeSolver.calls - calls == len(edges)
+    # the previous tour without the removed group is where the search starts
+    assert solver.tspSolver.initialTour == [keep.index(i) for i in tour if i in keep]
+    assert sorted(int(solver.vertices[i].group) for i in solver.tour) == [0, 1, 2]
+    assert len(edges) == 3
+
+
+def testInsertGroupsAtCheapestPosition():
+    solver = makeSolver([[0, 0, 0], [100, 0, 0], [100, 100, 0]])
+    solver.solve()
+    solver.replan(added=[Region(points=[[50, -50, 0]])])
+
+    # between (-1, 0) and (99, 0) is the cheapest detour, the sample at (49, -50) is the closest to both
+    assert solver.tspSolver.initialTour == [0, 12, 4, 8]
+    assert solver._insertGroups([], solver.vertices, [1, 3]) == [4, 12]
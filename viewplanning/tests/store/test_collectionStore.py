@@ -0,0 +1,19 @@
+from viewplanning.store.collectionStore import FileCollectionStore
+import json
+
+
+def testSearchMatchesEveryTerm(tmp_path):
+    name = str(tmp_path / 'items.json')
+    with open(name, 'w') as f:
+        json.dump([
+            {'_id': '0', 'group': 'a', 'sampleStrategy': {'seed': 1}},
+            {'_id': '1', 'group': 'a', 'sampleStrategy': {'seed': 2}},
+            {'_id': '2', 'group': 'b', 'sampleStrategy': {'seed': 1}}
+        ], f)
+    store = FileCollectionStore(name, lambda item: item['_id'])
+    try:
+        assert list(store.getItemsIterator(search={'group': 'a', 'sampleStrategy.seed': 1})) == ['0']
+        assert list(store.getItemsIterator(search={'sampleStrategy.seed': 1, 'group': 'b'})) == ['2']
+        assert list(store.getItemsIterator(search={'group': 'a', 'sampleStrategy.seed': None})) == ['0', '1']
+    finally:
+        store.close()
@@ -0,0 +1,15 @@
+from viewplanning.store import DriveIntersectionStore
+import pyvista as pv
+import numpy as np
+
+
+def testPutIsReadInEitherOrder(tmp_path):
+    store = DriveIntersectionStore(str(tmp_path) + '/')
+    box = pv.Box([0, 1, 0, 1, 0, 1]).triangulate()
+    assert store.path('a.ply-b.ply', 'c.ply') is None
+    store.put('a.ply-b.ply', 'c.ply', box)
+    assert store.path('a.ply-b.ply', 'c.ply') == str(tmp_path) + '/a-b--c.ply'
+    assert store.path('c.ply', 'a.ply-b.ply') == store.path('a.ply-b.ply', 'c.ply')
+    intersection = store.intersect(None, None, 'c.ply', 'a.ply-b.ply')
+    assert np.allclose(intersection.bounds, box.bounds)
+    assert list(tmp_path.iterdir()) == [tmp_path / 'a-b--c.ply']
@@ -0,0 +1,141 @@
+from viewplanning.store import IntersectionCache, IntersectionStore
+from viewplanning.store import intersectionStore
+import pyvista as pv
+import numpy as np
+import threading
+import time
+import os
+
+
+def makeBox(x):
+    return pv.Box([x, x + 2, 0, 2, 0, 2]).triangulate()
+
+
+def testContentKeys(tmp_path):
+    cache = IntersectionCache(str(tmp_path))
+    a, b = makeBox(0), makeBox(1)
+    assert IntersectionCache.key([a, b]) == IntersectionCache.key([b, makeBox(0)])
+    assert IntersectionCache.key([a, b]) != IntersectionCache.key([a, makeBox(2)])
+    calls = []
+    compute = lambda: (calls.append(1) or makeBox(5), False)
+    first = cache.getOrCompute(IntersectionCache.key([a, b]), compute)
+    second = IntersectionCache(str(tmp_path)).getOrCompute(IntersectionCache.key([b, a]), compute)
+    assert len(calls) == 1
+    assert np.allclose(first.bounds, second.bounds)
+    assert cache.getOrCompute(IntersectionCache.key([a, makeBox(9)]), lambda: (None, False)) is None
+    assert cache.get(IntersectionCache.key([a, makeBox(9)])) == (True, None)
+    assert cache.stats()['items'] == 2
+
+
+def testEvictsLeastRecentlyUsed(tmp_path):
+    cache = IntersectionCache(str(tmp_path))
+    cache.put('a' * 40, makeBox(0))
+    cache.put('b' * 40, makeBox(0))
+    os.utime(os.path.join(str(tmp_path), 'aa', 'a' * 40 + '.vtp'), (0, 0))
+    os.utime(os.path.join(str(tmp_path), 'bb', 'b' * 40 + '.vtp'), (1, 1))
+    cache.budget = cache.stats()['bytes']
+    cache.get('a' * 40)
+    cache.put('c' * 40, makeBox(0))
+    assert cache.get('b' * 40) == (False, None)
+    assert cache.get('a' * 40)[0] and cache.get('c' * 40)[0]
+    assert cache.evictions == 1
+
+
+def testFailuresArentCached(tmp_path):
+    cache = IntersectionCache(str(tmp_path))
+    keys = ['a' * 40, 'b' * 40, 'c' * 40]
+    # the second job crashed or timed out
+    results = cache.getOrComputeMany(keys, lambda missing: ([makeBox(0), None, None], [1]))
+    assert results[1] is None and results[2] is None
+    assert [cache.get(key)[0] for key in keys] == [True, False, True]
+    assert cache.getOrCompute('d' * 40, lambda: (None, True)) is None
+    assert cache.get('d' * 40) == (False, None)
+
+
+def testPutKeepsRunningSize(tmp_path, monkeypatch):
+    cache = IntersectionCache(str(tmp_path))
+    cache.put('a' * 40, makeBox(0))
+
+    def scan():
+        raise AssertionError('the folder was scanned')
+    monkeypatch.setattr(cache, '_entries', scan)
+    cache.put('b' * 40, makeBox(0))
+    cache.put('b' * 40, makeBox(1).subdivide(1))
+    cache.put('c' * 40, None)
+    monkeypatch.undo()
+    with open(os.path.join(str(tmp_path), 'locks', 'size')) as f:
+        assert int(f.read()) == cache.stats()['bytes']
+
+
+def testBatchWaitsForKeysBeingComputed(tmp_path):
+    keys = ['a' * 40, 'b' * 40]
+    locked = threading.Event()
+
+    def computeFirst():
+        # another process computing the first key
+        other = IntersectionCache(str(tmp_path))
+        with other._claim(keys[0]):
+            locked.set()
+            time.sleep(.2)
+            other.put(keys[0], makeBox(0))
+    thread = threading.Thread(target=computeFirst)
+    thread.start()
+    locked.wait()
+    calls = []
+    results = IntersectionCache(str(tmp_path)).getOrComputeMany(
+        keys, lambda missing: (calls.append(missing) or [makeBox(1) for _ in missing], []))
+    thread.join()
+    assert calls == [[1]]
+    assert np.allclose(results[0].bounds, makeBox(0).bounds)
+    assert np.allclose(results[1].bounds, makeBox(1).bounds)
+
+
+def testClaimedKeyDoesntBlockOthers(tmp_path):
+    claimed = threading.Event()
+    release = threading.Event()
+
+    def holdClaim():
+        with IntersectionCache(str(tmp_path))._claim('a' * 40):
+            claimed.set()
+            release.wait()
+    holder = threading.Thread(target=holdClaim)
+    holder.start()
+    claimed.wait()
+    # 0x2a is the stripe of 'a' * 40 when keys shared 64 lock files
+    other = '0000002a' + 'b' * 32
+    batch = threading.Thread(target=IntersectionCache(str(tmp_path)).getOrComputeMany,
+                             args=([other], lambda missing: ([makeBox(0)], [])))
+    batch.start()
+    batch.join(5)
+    finished = not batch.is_alive()
+    release.set()
+    holder.join()
+    batch.join()
+    assert finished
+    assert IntersectionCache(str(tmp_path)).get(other)[0]
+
+
+def testStorePairsShareCache(tmp_path):
+    class BoxStore(IntersectionStore):
+        def _compute(self, jobs):
+            self.computed += len(jobs)
+            return [makeBox(len(job)) for job in jobs], []
+    stores = [BoxStore(IntersectionCache(str(tmp_path))) for _ in range(2)]
+    for store in stores:
+        store.computed = 0
+    pairs = [(makeBox(0), makeBox(1)), (makeBox(0), makeBox(2))]
+    stores[0].intersectPairs(pairs[:1], [('0', '1')])
+    results = stores[1].intersectPairs(pairs, [('0', '1'), ('0', '2')])
+    assert (stores[0].computed, stores[1].computed) == (1, 1)
+    assert all(result is not None for result in results)
+
+
+def testStoreLookup(monkeypatch):
+    monkeypatch.setattr(intersectionStore, 'CACHE_SIZE', 2)
+    store = IntersectionStore()
+    boxes = [makeBox(i) for i in range(3)]
+    store._insert(('a', 'b'), boxes[0])
+    store._insert(('a', 'c'), boxes[1])
+    assert store.intersect(None, None, 'b', 'a') is boxes[0]
+    store._insert(('b', 'c'), boxes[2])
+    assert list(store.lookup) == [('a', 'b'), ('b', 'c')]
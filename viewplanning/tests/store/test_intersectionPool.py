@@ -0,0 +1,61 @@
+from viewplanning.store import IntersectionPool, MeshRef
+import pyvista as pv
+import numpy as np
+import time
+import os
+
+
+class CrashingRef(MeshRef):
+    def load(self):
+        os._exit(1)
+
+
+class RaisingRef(MeshRef):
+    def load(self):
+        raise ValueError('broken mesh')
+
+
+class SlowRef(MeshRef):
+    def load(self):
+        time.sleep(60)
+
+
+def makeBox(x):
+    return pv.Box([x, x + 2, 0, 2, 0, 2]).triangulate()
+
+
+def testPoolLoadsReferences():
+    pool = IntersectionPool(2, timeout=30)
+    try:
+        ref = MeshRef('data/viewRegions/sphere.obj', tuple(np.eye(3).ravel()))
+        results = pool.map([[ref], [makeBox(0), makeBox(5)], [makeBox(3)]])
+        assert np.allclose(results[0].bounds, ref.load().bounds)
+        assert results[1] is None
+        assert np.allclose(results[2].bounds, [3, 5, 0, 2, 0, 2])
+        assert pool.restarts == 0
+    finally:
+        pool.close()
+
+
+def testPoolRestartsWorkers():
+    pool = IntersectionPool(1, timeout=1)
+    try:
+        results = pool.map([[CrashingRef('', ()), makeBox(0)], [SlowRef('', ()), makeBox(0)], [makeBox(0)]])
+        assert results[0] is None and results[1] is None
+        assert results[2] is not None
+        assert pool.restarts == 2
+        assert sorted(pool.failed) == [0, 1]
+    finally:
+        pool.close()
+
+
+def testPoolFailsJobsThatRaise():
+    pool = IntersectionPool(1, timeout=30)
+    try:
+        results = pool.map([[makeBox(0), makeBox(5)], [RaisingRef('', ()), makeBox(0)], [makeBox(0)]])
+        assert results[0] is None and results[1] is None
+        assert results[2] is not None
+        assert pool.failed == [1]
+        assert pool.restarts == 0
+    finally:
+        pool.close()
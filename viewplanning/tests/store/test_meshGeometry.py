@@ -0,0 +1,30 @@
+from viewplanning.store import MeshGeometry, MeshStore
+from viewplanning.sampling import iterateRegions
+from viewplanning.models import Region, RegionType
+import numpy as np
+import pyvista as pv
+
+
+def testBoxGeometry():
+    box = pv.Box([0, 2, 0, 1, 0, 3]).triangulate()
+    geometry = MeshGeometry.of(box)
+    assert MeshGeometry.of(box) is geometry
+    assert np.isclose(geometry.area, 2 * (2 + 6 + 3))
+    assert np.isclose(geometry.volume, 6)
+    assert np.allclose(geometry.aabb, box.bounds)
+    assert np.isclose(geometry.cdf[-1], 1)
+    assert np.allclose(np.linalg.norm(geometry.normals, axis=1), 1)
+    points, faces = geometry.sampleSurface(500, np.random.default_rng(0))
+    # every point is on the plane of its face
+    assert np.allclose(np.einsum('ij, ij -> i', points - geometry.triangles[faces, 0], geometry.normals[faces]), 0)
+
+
+def testRegionsShareMeshes():
+    region = Region(type=RegionType.WAVEFRONT, file='data/viewRegions/sphere.obj', rotationMatrix=[[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+    rotated = Region(type=RegionType.WAVEFRONT, file='data/viewRegions/sphere.obj', rotationMatrix=[[1, 0, 0], [0, 0, 1], [0, 1, 0]])
+    first, = iterateRegions([region])
+    second, = iterateRegions([region])
+    other, = iterateRegions([rotated])
+    assert first is second
+    assert other is not first
+    MeshStore.getInstance().clearCache()
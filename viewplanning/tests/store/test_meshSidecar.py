@@ -0,0 +1,48 @@
+from viewplanning.store import readObj, writeSidecar, readSidecar, readSidecarMeta
+import numpy as np
+import pyvista as pv
+import os
+
+
+def testSidecarRoundTrip(tmp_path):
+    file = str(tmp_path / 'sphere.ply')
+    pv.Sphere().save(file)
+    rotation = np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0]])
+    parsed = readObj(file, rotation)
+    writeSidecar(file, rotation, parsed)
+    meta = readSidecarMeta(file, rotation)
+    assert np.allclose(meta['bounds'], parsed.bounds)
+    assert np.isclose(meta['volume'], parsed.volume)
+    mesh = readSidecar(file, rotation)
+    assert np.array_equal(mesh.points, parsed.points)
+    assert np.array_equal(mesh.faces, parsed.faces)
+    assert mesh.n_cells == parsed.n_cells
+    assert mesh.is_all_triangles
+    assert np.isclose(mesh.volume, parsed.volume)
+    # other rotations have their own sidecar
+    assert readSidecar(file, np.eye(3)) is None
+
+
+def testSidecarInvalidated(tmp_path):
+    file = str(tmp_path / 'box.ply')
+    pv.Box().triangulate().save(file)
+    writeSidecar(file, np.eye(3), readObj(file))
+    assert readSidecar(file) is not None
+    pv.Box([0, 2, 0, 2, 0, 2]).triangulate().save(file)
+    os.utime(file, ns=(0, 1))
+    assert readSidecar(file) is None
+    assert np.allclose(readObj(file).bounds, [0, 2, 0, 2, 0, 2])
+
+
+def testSidecarMeshesIntersect(tmp_path):
+    meshes = []
+    for i, center in enumerate([(0, 0, 0), (.5, 0, 0)]):
+        file = str(tmp_path / f'sphere{i}.ply')
+        pv.Sphere(center=center).save(file)
+        writeSidecar(file, np.eye(3), readObj(file, sidecar=False))
+        meshes.append(readSidecar(file))
+    intersection = meshes[0].boolean_intersection(meshes[1])
+    assert intersection.n_cells > 0
+    assert np.allclose(intersection.bounds[:2], [0, .5], atol=.05)
+    # a sidecar mesh can be written again
+    writeSidecar(file, np.eye(3), meshes[1])
@@ -0,0 +1,39 @@
+from viewplanning.store import MeshStore
+import numpy as np
+import pyvista as pv
+import os
+
+
+def testLeastRecentlyUsedByBytes(tmp_path):
+    files = []
+    for i in range(3):
+        files.append(str(tmp_path / f'box{i}.vtp'))
+        pv.Box([0, 1 + i, 0, 1, 0, 1]).save(files[-1])
+    store = MeshStore()
+    size = store.getMesh(files[0], np.eye(3)).actual_memory_size * 1024
+    # room for two meshes
+    store.budget = 2 * size + size // 2
+    store.getMesh(files[1], np.eye(3))
+    store.getMesh(files[0], np.eye(3))
+    store.getMesh(files[2], np.eye(3))
+    assert store.stats()['evictions'] == 1
+    assert store.stats()['items'] == 2
+    store.getMesh(files[0], np.eye(3))
+    assert (store.hits, store.misses) == (2, 3)
+    # box 1 was the least recently used
+    store.getMesh(files[1], np.eye(3))
+    assert store.misses == 4
+
+
+def testRotationAndModificationKeys(tmp_path):
+    file = str(tmp_path / 'box.vtp')
+    pv.Box([0, 2, 0, 1, 0, 1]).save(file)
+    store = MeshStore()
+    mesh = store.getMesh(file, np.eye(3))
+    assert store.getMesh(file, np.eye(3)) is mesh
+    rotated = store.getMesh(file, [[0, 1, 0], [1, 0, 0], [0, 0, 1]])
+    assert np.allclose(rotated.bounds, [0, 1, 0, 2, 0, 1])
+    pv.Box([0, 3, 0, 1, 0, 1]).save(file)
+    os.utime(file, (0, 1))
+    assert np.allclose(store.getMesh(file, np.eye(3)).bounds, [0, 3, 0, 1, 0, 1])
+    assert store.stats()['hits'] == 1
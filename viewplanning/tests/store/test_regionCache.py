@@ -0,0 +1,34 @@
+from viewplanning.store import RegionCache, MeshGeometry, readObj
+from viewplanning.sampling.slicing import sliceMany
+import numpy as np
+import pyvista as pv
+import os
+
+
+def testRegionArtifactsRoundTrip(tmp_path):
+    file = str(tmp_path / 'sphere.ply')
+    pv.Sphere(radius=10).save(file)
+    cache = RegionCache(str(tmp_path / 'cache'))
+    assert cache.getMesh(file, np.eye(3)) is None
+    mesh = readObj(file)
+    geometry = MeshGeometry.fromMesh(mesh)
+    levels = np.linspace(-5, 5, 4)
+    geometry.slices[(tuple(levels.tolist()), 1e-4)] = sliceMany(mesh, levels)
+    cache.put(file, np.eye(3), mesh, geometry)
+    assert cache.isCurrent(file, np.eye(3))
+
+    loaded = cache.getMesh(file, np.eye(3))
+    assert MeshGeometry.registered(loaded).digest == geometry.digest
+    assert MeshGeometry.of(loaded).volume == geometry.volume
+    assert np.allclose(MeshGeometry.of(loaded).triangles, geometry.triangles)
+    polygons, _, areas = sliceMany(loaded, levels)
+    assert polygons[1].equals(geometry.slices[(tuple(levels.tolist()), 1e-4)][0][1])
+    assert np.allclose(areas, sliceMany(mesh, levels)[2])
+
+    cache.putExtents('g', [[geometry.digest, 'b']], [3.5], 8)
+    assert cache.extent('b', geometry.digest, 8) == 3.5
+    assert cache.extent('b', geometry.digest, 4) is None
+
+    os.utime(file, ns=(0, 1))
+    assert not cache.isCurrent(file, np.eye(3))
+    assert cache.getMesh(file, np.eye(3)) is None
@@ -0,0 +1,40 @@
+from viewplanning.store import MeshStore, SharedMeshes, readObj
+from multiprocessing import Process, Queue
+import numpy as np
+import pyvista as pv
+
+
+def _volume(file, shared, queue):
+    store = MeshStore()
+    store.useShared(shared)
+    mesh = store.getMesh(file, np.eye(3))
+    queue.put((mesh.volume, store.stats()['shared'], store.stats()['items']))
+
+
+def testWorkersAttachSharedMeshes(tmp_path):
+    file = str(tmp_path / 'sphere.ply')
+    pv.Sphere().save(file)
+    shared = SharedMeshes()
+    try:
+        published = shared.publish(file, np.eye(3))
+        assert shared.publish(file, np.eye(3)) is published
+        store = MeshStore()
+        store.useShared(shared.meshes)
+        mesh = store.getMesh(file, np.eye(3))
+        assert store.getMesh(file, np.eye(3)) is mesh
+        # changes in place stay in the process
+        mesh.points[0] = [7, 7, 7]
+        assert not np.allclose(published.attach()[0].points[0], 7)
+        assert np.array_equal(mesh.faces, readObj(file).faces)
+        assert mesh.n_cells == readObj(file).n_cells
+        assert mesh.is_all_triangles
+        assert mesh.boolean_intersection(published.attach()[0].translate((.5, 0, 0), inplace=False)).n_cells > 0
+        queue = Queue()
+        process = Process(target=_volume, args=[file, shared.meshes, queue])
+        process.start()
+        volume, attached, items = queue.get(timeout=30)
+        process.join()
+        assert np.isclose(volume, readObj(file).volume)
+        assert (attached, items) == (1, 0)
+    finally:
+        shared.close()
@@ -0,0 +1,88 @@
+from viewplanning.tsp import MatrixTspSubprocess, OverlappingTspSubprocess
+from viewplanning.models import Vertex3D, Vertex3DMulti
+import numpy as np
+import os
+
+
+GOLDEN = os.path.join(os.path.dirname(__file__), 'golden')
+ID = 'golden'
+
+
+def matrixVertices():
+    points = [[0, 0, 10, 0], [0, 50, 10, np.pi], [100, 0, 10, 0], [100, 40, 10, np.pi / 2], [120, 20, 10, np.pi],
+              [300, 0, 10, 0], [310, 30, 10, np.pi]]
+    groups = ['0', '0', '1', '1', '1', '2', '2']
+    return [Vertex3D(group=group, x=x, y=y, z=z, theta=theta) for group, (x, y, z, theta) in zip(groups, points)]
+
+
+def overlappingVertices():
+    # ids 1 and 4 are samples that see two groups and are listed once for each of them
+    items = [
+        (0, '0', {'0'}, [0, 0, 10, 0]),
+        (1, '0', {'0', '1'}, [50, 10, 10, np.pi / 2]),
+        (2, '1', {'1'}, [100, 0, 10, 0]),
+        (1, '1', {'0', '1'}, [50, 10, 10, np.pi / 2]),
+        (3, '2', {'2'}, [300, 0, 10, np.pi]),
+        (4, '1', {'1', '2'}, [200, 30, 10, 0]),
+        (4, '2', {'1', '2'}, [200, 30, 10, 0]),
+        (5, '2', {'2'}, [320, 40, 10, np.pi / 2]),
+    ]
+    return [
+        Vertex3DMulti(id=id, group=group, visits=set(visits), x=x, y=y, z=z, theta=theta)
+        for id, group, visits, (x, y, z, theta) in items
+    ]
+
+
+def cost(a, b):
+    # edges back over a long distance fail like a dubins path that can't be found
+    if a.x > b.x + 250:
+        return np.inf
+    return float(np.linalg.norm(a.asPoint() - b.asPoint())) * 10 + abs(a.theta - b.theta)
+
+
+def read(folder, name):
+    with open(os.path.join(folder, name)) as f:
+        return f.read().replace(os.path.abspath(f'data/tmp/{ID}'), 'DIR')
+
+
+def golden(name):
+    with open(os.path.join(GOLDEN, name)) as f:
+        return f.read()
+
+
+def splitSets(text):
+    '''the problem up to the set section and the members of every set, the order of the sets isn\'t fixed'''
+    head, sets = text.split('GTSP_SET_SECTION\n')
+    return head, sorted(line.split()[1:] for line in sets.splitlines() if line != 'EOF')
+
+
+def testMatrixWriterMatchesPreRefactorOutput(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir('data')
+    MatrixTspSubprocess().writeFiles(ID, matrixVertices(), cost)
+
+    assert read(f'data/tmp/{ID}', 'gtsp.gtsp') == golden('matrix.gtsp')
+    assert read(f'data/tmp/{ID}', 'params.param') == golden('params.param')
+
+
+def testOverlappingWriterMatchesPreRefactorOutput(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir('data')
+    solver = OverlappingTspSubprocess()
+    solver.writeFiles(ID, overlappingVertices(), cost)
+
+    assert splitSets(read(f'data/tmp/{ID}', 'gtsp.gtsp')) == splitSets(golden('overlapping.gtsp'))
+    assert read(f'data/tmp/{ID}', 'params.param') == golden('params.param')
+    assert np.array_equal(solver.costs, np.load(os.path.join(GOLDEN, 'overlapping.npy')))
+
+
+def testWriteMatrixWritesInitialTour(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir('data')
+    vertices = matrixVertices()
+    solver = MatrixTspSubprocess()
+    solver.writeMatrix(ID, vertices, solver.costMatrix(vertices, cost), [0, 3, 6])
+
+    assert read(f'data/tmp/{ID}', 'gtsp.gtsp') == golden('matrix.gtsp')
+    assert read(f'data/tmp/{ID}', 'params.param') == golden('initial.param')
+    assert read(f'data/tmp/{ID}', 'initial.tour') == golden('initial.tour')
@@ -1,13 +1,19 @@
-from viewplanning.models import Vertex
+from viewplanning.models import Vertex, VertexBatch
 from typing import Callable
 import uuid
 import numpy as np
+import shutil
+import os
 
 
 class TspSolver:
     '''
     solve a tsp
     '''
+    def __init__(self):
+        # indices of the vertices in the last tour found by solve
+        self.tour: 'list[int]' = []
+
     def writeFiles(self, id: uuid.UUID, vertices: 'list[Vertex]', cost: Callable[[Vertex, Vertex], float]):
         '''
         write any necessary file to sovle the tsp
@@ -23,6 +29,108 @@ class TspSolver:
         '''
         pass
 
+    def skipEdge(self, a: Vertex, b: Vertex) -> bool:
+        '''
+        the tsp never uses the edge from a to b so its cost doesn\'t need to be computed
+
+        Parameters
+        ----------
+        a: Vertex
+            start of the edge
+        b: Vertex
+            end of the edge
+
+        Returns
+        -------
+        bool
+        '''
+        return a.group == b.group
+
+    def skipEdges(self, vertices: 'list[Vertex] | VertexBatch') -> np.ndarray:
+        '''
+        edges the tsp never uses, the batched form of skipEdge
+
+        Parameters
+        ----------
+        vertices: list[Vertex] | VertexBatch
+            vertices to consider for the tsp
+
+        Returns
+        -------
+        np.ndarray
+            [n, n] bool where [i, j] is True when the edge from vertex i to vertex j is skipped
+        '''
+        group = VertexBatch.fromVertices(vertices).group
+        return group[:, None] == group[None, :]
+
+    def costMatrix(self, vertices: 'list[Vertex] | VertexBatch', cost: Callable[[Vertex, Vertex], float], costs: np.ndarray = None) -> np.ndarray:
+        '''
+        cost of every edge used by the tsp, costs of edges that are never used are infinite. Costs of a previous
+        matrix are reused for the vertices at the start of the list.
+
+        Parameters
+        ----------
+        vertices: list[Vertex] | VertexBatch
+            list of vertices to consider for the tsp
+        cost: (Vertex, Vertex) -> float
+            cost function between to vertices
+        costs: np.ndarray
+            [k, k] costs of the first k vertices
+
+        Returns
+        -------
+        np.ndarray
+            [n, n] where [i, j] is the cost from vertex i to vertex j
+        '''
+        n = len(vertices)
+        matrix = np.full([n, n], np.inf)
+        known = 0
+        if costs is not None:
+            known = len(costs)
+            matrix[:known, :known] = costs
+        compute = ~self.skipEdges(vertices)
+        compute[:known, :known] = False
+        np.fill_diagonal(compute, False)
+        for y, x in zip(*np.nonzero(compute)):
+            matrix[y, x] = cost(vertices[y], vertices[x])
+        return matrix
+
+    def tspCosts(self, vertices: 'list[Vertex]', costs: np.ndarray) -> np.ndarray:
+        '''
+        edge weights given to the tsp solver
+
+        Parameters
+        ----------
+        vertices: list[Vertex]
+            list of vertices to consider for the tsp
+        costs: np.ndarray
+            [n, n] matrix from costMatrix
+
+        Returns
+        -------
+        np.ndarray
+            [n, n] weights
+        '''
+        return costs
+
+    def writeMatrix(self, id: uuid.UUID, vertices: 'list[Vertex]', costs: np.ndarray, initialTour: 'list[int]' = None):
+        '''
+        write the files to solve the tsp from a matrix of costs
+
+        Parameters
+        ----------
+        id: uuid.UUID
+            id to gaurentee that files don\'t get overwritten
+        vertices: list[Vertex]
+            list of vertices to consider for the tsp
+        costs: np.ndarray
+            [n, n] matrix from costMatrix
+        initialTour: list[int]
+            indices of the vertices of a tour to start the search from, ignored by solvers that can\'t use it
+        '''
+        index = _indexOf(vertices)
+        self.writeFiles(id, vertices, lambda a, b: costs[index(a), index(b)])
+
     def solve(self, id, vertices: 'list[Vertex]') -> 'list[Vertex]':
         '''
         solve the tsp
@@ -33,7 +141,7 @@ class TspSolver:
             id to gaurentee thet files don\'t get overwritten
         vertices: list[Vertex]
             list of vertices in the tsp
-        
+
         Returns
         -------
         list[Vertex]
@@ -51,3 +159,86 @@ class TspSolver:
             id to gaurentee that files don\'t get overwritten
         '''
         pass
+
+
+def _indexOf(vertices: 'list[Vertex]') -> Callable[[Vertex], int]:
+    '''
+    lookup of the position of a vertex in a list by identity
+    '''
+    index = {id(vertex): i for i, vertex in enumerate(vertices)}
+    return lambda vertex: index[id(vertex)]
+
+
+def neighbourhoods(vertices: 'list[Vertex] | VertexBatch') -> 'list[list[int]]':
+    '''
+    indices of the vertices in each group, in order of the first vertex of each group
+    '''
+    group = VertexBatch.fromVertices(vertices).group
+    labels, first, inverse = np.unique(group, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    members = np.argsort(inverse, kind='stable')
+    sets = np.split(members, np.cumsum(np.bincount(inverse, minlength=len(labels)))[:-1])
+    return [sets[i].tolist() for i in order]
+
+
+def writeGtsp(id: uuid.UUID, weights: np.ndarray, sets: 'list[list[int]]', initialTour: 'list[int]' = None):
+    '''
+    write the parameter and problem files for GLKH
+
+    Parameters
+    ----------
+    id: uuid.UUID
+        id to gaurentee that files don\'t get overwritten
+    weights: np.ndarray
+        [n, n] integer edge weights
+    sets: list[list[int]]
+        indices of the vertices in each set
+    initialTour: list[int]
+        indices of the vertices of a tour to start the search from
+    '''
+    numVertices = len(weights)
+    if not os.path.exists('data/tmp'):
+        os.mkdir('data/tmp')
+
+    if os.path.exists('data/tmp/{0}'.format(id)):
+        shutil.rmtree('data/tmp/{0}'.format(id))
+
+    os.mkdir('data/tmp/{0}'.format(id))
+    os.chmod('data/tmp/{0}'.format(id), 0o777)
+    problemFile = os.path.abspath('data/tmp/{0}/gtsp.gtsp'.format(id))
+    outputFile = os.path.abspath('data/tmp/{0}/tour.tour'.format(id))
+    initialFile = os.path.abspath('data/tmp/{0}/initial.tour'.format(id))
+    with open('data/tmp/{0}/params.param'.format(id), 'w') as f:
+        f.write('PROBLEM_FILE={0}\n'.format(problemFile))
+        f.write('OUTPUT_TOUR_FILE={0}\n'.format(outputFile))
+        if initialTour is not None and len(initialTour) > 0:
+            f.write('INITIAL_TOUR_FILE={0}\n'.format(initialFile))
+        f.write('EOF\n')
+    with open(problemFile, 'w') as f:
+        f.write('NAME : PathPlanning\n')
+        f.write('TYPE : AGTSP\n')
+        f.write('COMMENT : Dubins Path Planning\n')
+        f.write('DIMENSION : {0}\n'.format(numVertices))
+        f.write('GTSP_SETS : {0}\n'.format(len(sets)))
+        f.write('EDGE_WEIGHT_TYPE : EXPLICIT\n')
+        f.write('EDGE_WEIGHT_FORMAT : FULL_MATRIX\n')
+        f.write('EDGE_WEIGHT_SECTION\n ')
+        for row in weights:
+            f.write(''.join('{0:11d}'.format(weight) for weight in row))
+            f.write('\n ')
+        f.write('GTSP_SET_SECTION\n')
+        for i, members in enumerate(sets):
+            f.write(' {0}'.format(i + 1))
+            f.write(''.join('{0:11d}'.format(j + 1) for j in members))
+            f.write('   -1\n')
+        f.write('EOF\n')
+    if initialTour is not None and len(initialTour) > 0:
+        with open(initialFile, 'w') as f:
+            f.write('NAME : Initial\n')
+            f.write('TYPE : TOUR\n')
+            f.write('DIMENSION : {0}\n'.format(numVertices))
+            f.write('TOUR_SECTION\n')
+            for i in initialTour:
+                f.write('{0}\n'.format(i + 1))
+            f.write('-1\n')
+            f.write('EOF\n')
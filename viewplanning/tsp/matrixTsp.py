@@ -3,8 +3,8 @@ from typing import Callable
 import uuid
 import numpy as np
 import subprocess
-from .Tsp import TspSolver
-from viewplanning.models import Vertex
+from .Tsp import TspSolver, writeGtsp, neighbourhoods
+from viewplanning.models import Vertex, VertexBatch
 import time
 import logging
 
@@ -25,59 +25,19 @@ class MatrixTspSubprocess(TspSolver):
         self.timedout = False
 
     def writeFiles(self, id: uuid.UUID, vertices: 'list[Vertex]', edgeMatrix: Callable[[int, int], float]):
-        numVertices = len(vertices)
-        neighboorhoods = []
-        i = -1
-        for vertex in vertices:
-            if len(neighboorhoods) <= 0 or neighboorhoods[i] != vertex.group:
-                neighboorhoods.append(vertex.group)
-                i += 1
-        numNeighboorHoods = len(neighboorhoods)
+        self.writeMatrix(id, vertices, self.costMatrix(vertices, edgeMatrix))
 
-        if not os.path.exists('data/tmp'):
-            os.mkdir('data/tmp')
+    def tspCosts(self, vertices: 'list[Vertex] | VertexBatch', costs: np.ndarray) -> np.ndarray:
+        groups = VertexBatch.fromVertices(vertices).group
+        numNeighboorHoods = len(np.unique(groups))
+        weights = np.round(costs)
+        weights[(groups[:, None] == groups[None, :]) | np.isinf(costs)] = np.iinfo(np.int32).max // numNeighboorHoods
+        return weights
 
-        os.mkdir('data/tmp/{0}'.format(id))
-        os.chmod('data/tmp/{0}'.format(id), 0o777)
-        with open('data/tmp/{0}/params.param'.format(id), 'w') as f:
-            problemFile = os.path.abspath('data/tmp/{0}/gtsp.gtsp'.format(id))
-            outputFile = os.path.abspath('data/tmp/{0}/tour.tour'.format(id))
-            f.write('PROBLEM_FILE={0}\n'.format(problemFile))
-            f.write('OUTPUT_TOUR_FILE={0}\n'.format(outputFile))
-            f.write('EOF\n')
-            f.close()
-        with open(problemFile, 'w') as f:
-            f.write('NAME : PathPlanning\n')
-            f.write('TYPE : AGTSP\n')
-            f.write('COMMENT : Dubins Path Planning\n')
-            f.write('DIMENSION : {0}\n'.format(numVertices))
-            f.write('GTSP_SETS : {0}\n'.format(numNeighboorHoods))
-            f.write('EDGE_WEIGHT_TYPE : EXPLICIT\n')
-            f.write('EDGE_WEIGHT_FORMAT : FULL_MATRIX\n')
-            f.write('EDGE_WEIGHT_SECTION\n ')
-            for y in range(numVertices):
-                for x in range(numVertices):
-                    if vertices[x].group == vertices[y].group:
-                        f.write('{0:11d}'.format(np.iinfo(np.int32).max // numNeighboorHoods))
-                        continue
-                    cost = edgeMatrix(vertices[y], vertices[x])
-                    if np.isinf(cost):
-                        f.write('{0:11d}'.format(np.iinfo(np.int32).max // numNeighboorHoods))
-                    else:
-                        f.write('{0:11d}'.format(round(cost)))
-                f.write('\n ')
-            f.write('GTSP_SET_SECTION\n')
-            i = 1
-            j = 1
-            for neighboorhood in neighboorhoods:
-                f.write(' {0}'.format(i))
-                for vertex in filter(lambda x: x.group == neighboorhood, vertices):
-                    f.write('{0:11d}'.format(j))
-                    j += 1
-                f.write('   -1\n')
-                i += 1
-            f.write('EOF\n')
-            f.close()
+    def writeMatrix(self, id: uuid.UUID, vertices: 'list[Vertex] | VertexBatch', costs: np.ndarray, initialTour: 'list[int]' = None):
+        batch = VertexBatch.fromVertices(vertices)
+        weights = self.tspCosts(batch, costs).astype(int)
+        writeGtsp(id, weights, neighbourhoods(batch), initialTour)
 
     def solve(self, id, vertices: 'list[Vertex]') -> 'list[Vertex]':
         self.timedout = False
@@ -125,6 +85,7 @@ class MatrixTspSubprocess(TspSolver):
                         state = 2
                         continue
                     pathNodes.append(int(line) - 1)
+        self.tour = pathNodes
         return [vertices[i] for i in pathNodes]
 
     def cleanUp(self, id):
@@ -12,6 +12,7 @@ class NetworkXTsp(TspSolver):
     use networkX to solve a tsp with simulated annealing
     '''
     def __init__(self):
+        super().__init__()
         self.graph: nx.DiGraph = None
 
     def writeFiles(self, id: uuid.UUID, vertices: 'list[Vertex]', cost: Callable[[Vertex, Vertex], float]):
@@ -3,11 +3,10 @@ from typing import Callable
 import uuid
 import numpy as np
 import subprocess
-from .Tsp import TspSolver
-from viewplanning.models import VertexMulti
+from .Tsp import TspSolver, writeGtsp, neighbourhoods
+from viewplanning.models import VertexMulti, VertexBatch
 import logging
 import time
-import shutil
 
 
 TIMEOUT = 6 * 60 * 60
@@ -27,71 +26,35 @@ class OverlappingTspSubprocess(TspSolver):
         self.costs = None
 
     def writeFiles(self, id: uuid.UUID, vertices: 'list[VertexMulti]', edgeMatrix: Callable[[int, int], float]):
-        numVertices = len(vertices)
-        neighboorhoods = set()
-        for vertex in vertices:
-            neighboorhoods.add(vertex.group)
-        numNeighboorHoods = len(neighboorhoods)
+        self.writeMatrix(id, vertices, self.costMatrix(vertices, edgeMatrix))
 
-        if not os.path.exists('data/tmp'):
-            os.mkdir('data/tmp')
+    def skipEdge(self, a: VertexMulti, b: VertexMulti) -> bool:
+        # overlapping nodes or nodes in the same set
+        return a.id == b.id or a.group in b.visits or b.group in a.visits
 
-        if os.path.exists('data/tmp/{0}'.format(id)):
-            shutil.rmtree('data/tmp/{0}'.format(id))
+    def skipEdges(self, vertices: 'list[VertexMulti] | VertexBatch') -> np.ndarray:
+        batch = VertexBatch.fromVertices(vertices)
+        # [i, j] is True when vertex i visits the group of vertex j
+        visits = batch.visitMatrix()[:, batch.group]
+        return (batch.id[:, None] == batch.id[None, :]) | visits | visits.T
 
-        os.mkdir('data/tmp/{0}'.format(id))
-        os.chmod('data/tmp/{0}'.format(id), 0o777)
-        with open('data/tmp/{0}/params.param'.format(id), 'w') as f:
-            problemFile = os.path.abspath('data/tmp/{0}/gtsp.gtsp'.format(id))
-            outputFile = os.path.abspath('data/tmp/{0}/tour.tour'.format(id))
-            f.write('PROBLEM_FILE={0}\n'.format(problemFile))
-            f.write('OUTPUT_TOUR_FILE={0}\n'.format(outputFile))
-            f.write('EOF\n')
-            f.close()
-        costs = np.ones([numVertices, numVertices])
-        with open(problemFile, 'w') as f:
-            f.write('NAME : PathPlanning\n')
-            f.write('TYPE : AGTSP\n')
-            f.write('COMMENT : Dubins Path Planning\n')
-            f.write('DIMENSION : {0}\n'.format(numVertices))
-            f.write('GTSP_SETS : {0}\n'.format(numNeighboorHoods))
-            f.write('EDGE_WEIGHT_TYPE : EXPLICIT\n')
-            f.write('EDGE_WEIGHT_FORMAT : FULL_MATRIX\n')
-            f.write('EDGE_WEIGHT_SECTION\n ')
-            for y in range(numVertices):
-                for x in range(numVertices):
-                    # overlapping node
-                    if vertices[x].id == vertices[y].id and x != y:
-                        f.write('{0:11d}'.format(0))
-                        costs[y, x] = 0
-                        continue
-                    # node in same set
-                    if vertices[x].group in vertices[y].visits or vertices[y].group in vertices[x].visits:
-                        f.write('{0:11d}'.format(np.iinfo(np.int32).max // numNeighboorHoods))
-                        costs[y, x] = np.iinfo(np.int32).max // numNeighboorHoods
-                        continue
-                    cost = edgeMatrix(vertices[y], vertices[x])
-                    # fail to calculate dubins path
-                    if np.isinf(cost):
-                        f.write('{0:11d}'.format(np.iinfo(np.int32).max // numNeighboorHoods))
-                        costs[y, x] = np.iinfo(np.int32).max // numNeighboorHoods
-                        continue
-                    # write cost
-                    f.write('{0:11d}'.format(round(cost)))
-                    costs[y, x] = cost
-                f.write('\n ')
-            f.write('GTSP_SET_SECTION\n')
-            i = 1
-            for neighboorhood in neighboorhoods:
-                f.write(' {0}'.format(i))
-                for j in range(len(vertices)):
-                    if neighboorhood == vertices[j].group:
-                        f.write('{0:11d}'.format(j + 1))
-                f.write('   -1\n')
-                i += 1
-            f.write('EOF\n')
-            f.close()
-            self.costs = costs
+    def tspCosts(self, vertices: 'list[VertexMulti] | VertexBatch', costs: np.ndarray) -> np.ndarray:
+        batch = VertexBatch.fromVertices(vertices)
+        numNeighboorHoods = len(np.unique(batch.group))
+        ids = batch.id
+        weights = costs.copy()
+        # fail to calculate dubins path or node in same set
+        weights[np.isinf(costs)] = np.iinfo(np.int32).max // numNeighboorHoods
+        # overlapping node
+        overlapping = ids[:, None] == ids[None, :]
+        np.fill_diagonal(overlapping, False)
+        weights[overlapping] = 0
+        return weights
+
+    def writeMatrix(self, id: uuid.UUID, vertices: 'list[VertexMulti] | VertexBatch', costs: np.ndarray, initialTour: 'list[int]' = None):
+        batch = VertexBatch.fromVertices(vertices)
+        self.costs = self.tspCosts(batch, costs)
+        writeGtsp(id, np.round(self.costs).astype(int), neighbourhoods(batch), initialTour)
 
     def solve(self, id, vertices: 'list[VertexMulti]') -> 'list[VertexMulti]':
         self.timeout = False
@@ -142,6 +105,7 @@ class OverlappingTspSubprocess(TspSolver):
                         state = 2
                         continue
                     pathNodes.append(int(line) - 1)
+        self.tour = pathNodes
         path = [vertices[i] for i in pathNodes]
         i = 0
         while i < len(path) - 1:
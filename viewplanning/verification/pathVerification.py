@@ -1,9 +1,8 @@
 from viewplanning.verification.verificationStrategy import VerificationStrategy
-from viewplanning.models import RegionType, Region, Edge
-from viewplanning.store import readObj
-from viewplanning.sampling import polygonFromBody, containsPoint2d
+from viewplanning.models import Region, Edge
+from viewplanning.store import MeshStore
+from viewplanning.sampling import SliceCache, containsPoint2d
 from viewplanning.edgeSolver import makeCurve
-import numpy as np
 
 
 class PathVerification(VerificationStrategy):
@@ -11,29 +10,34 @@ class PathVerification(VerificationStrategy):
     checks paths to make sure they intersect with view volumes
     '''
 
+    def __init__(self, numPoints: int = 100):
+        '''
+        Parameters
+        ----------
+        numPoints: int
+            number of points each edge is discretized into
+        '''
+        self.numPoints = numPoints
+
     def verify(self, edges: 'list[Edge]', bodies: 'list[Region]', radius: float, **kwargs) -> bool:
         if not super().verify(edges, bodies, radius):
             return False
-        i = 0
         verified = [False] * len(bodies)
-        polygons = {}
-        for edge in edges:
+        # every edge is checked against every region so build the curves once
+        curves = [makeCurve(edge, self.numPoints) for edge in edges]
+        meshStore = MeshStore.getInstance()
+        # z-slices of verification meshes are shared with the samplers and kept between calls
+        slices = SliceCache.getInstance()
+        for points in curves:
             for i in range(len(bodies)):
                 region = bodies[i]
-                if region.type != RegionType.WAVEFRONT_VRIO or verified[i]:
+                if verified[i]:
                     continue
-                obj = readObj(region.verificationRegion, region.rotationMatrix)
-                x, y, z = makeCurve(edge)
-                points = np.stack([x, y, z], axis=1)
-                containedPoint = False
+                file = self.getVerificationRegion(region)
+                obj = meshStore.getMesh(file, region.rotationMatrix)
                 for point in points:
-                    z = np.round(point[2], 2)
-                    key = str(z) + '_' + str(i)
-                    if key not in polygons.keys():
-                        polygons[key] = polygonFromBody(z, obj)
-                    containedPoint = containedPoint or (
-                        polygons[key] is not None and containsPoint2d(point[:2], polygons[key]))
-                    if containedPoint:
+                    polygon = slices.getPolygon(point[2], obj)
+                    if polygon is not None and containsPoint2d(point[:2], polygon):
                         verified[i] = True
                         break
 
@@ -1,6 +1,5 @@
-from ssl import VerifyFlags
 from viewplanning.verification.verificationStrategy import VerificationStrategy
-from viewplanning.models import RegionType, Region, Edge
+from viewplanning.models import Region, Edge
 from viewplanning.store import readObj
 from viewplanning.sampling import containsPoint3d
 
@@ -10,17 +9,17 @@ class StartPointVerification(VerificationStrategy):
     Checks start points to see if they are contained by a view volume
     '''
 
-    def verify(self, edges: 'list[Edge]', bodies: 'list[Region]', **kwargs) -> bool:
-        if not super().verify(edges, bodies):
+    def verify(self, edges: 'list[Edge]', bodies: 'list[Region]', radius: float, **kwargs) -> bool:
+        if not super().verify(edges, bodies, radius):
             return False
         i = 0
         verified = [False] * len(bodies)
         for edge in edges:
             for i in range(len(bodies)):
                 region = bodies[i]
-                if region.type != RegionType.WAVEFRONT_VRIO or verified[i]:
+                if verified[i]:
                     continue
-                obj = readObj(region.verificationRegion, region.rotationMatrix)
+                obj = readObj(self.getVerificationRegion(region), region.rotationMatrix)
                 if containsPoint3d(edge.start.asPoint(), obj):
                     verified[i] = True
                     break
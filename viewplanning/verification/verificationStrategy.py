@@ -1,3 +1,6 @@
+from viewplanning.models import Region
+
+
 class VerificationStrategy(object):
     def verify(self, edges, bodies, radius, **kwargs) -> int:
         '''
@@ -18,3 +21,22 @@ class VerificationStrategy(object):
             True if solution solves view planning problem
         '''
         return len(edges)
+
+    def getVerificationRegion(self, region: Region) -> str:
+        '''
+        get the mesh a solution is checked against. Regions without a verification region are checked against the
+        view volume
+
+        Parameters
+        ----------
+        region: Region
+            region to verify
+
+        Returns
+        -------
+        str
+            path to the mesh
+        '''
+        if region.verificationRegion:
+            return region.verificationRegion
+        return region.file